@@ -5,31 +5,272 @@ DataCleanPro - 数据清洗专家
 简单兼容的桌面数据清洗工具
 """
 
+import time
+
+STARTUP_TIME = time.perf_counter()  # 启动剖析的零点 (开始导入本模块)
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import pandas as pd
-import numpy as np
 from pathlib import Path
-import chardet
-import json
-from datetime import datetime
+import codecs
 import threading
-import os
 import sys
+from collections import deque
+
+from datacleanpro.lazy import IMPORT_TIMES, LazyModule, optional_module, warm_up_imports
+from datacleanpro.tracing import StageTrace, TRACE_FILE_TYPES, TRACE_HISTORY_LIMIT, save_traces
+from datacleanpro.formats import JSON_LINES_EXTENSIONS, file_format
+from datacleanpro.encoding import ENCODING_AUTO, ENCODING_CHOICES, detect_encoding
+from datacleanpro.dedup import DEDUP_KEEP_OPTIONS, FINGERPRINT_BITS, NEAR_DUP_THRESHOLD, parse_column_list
+from datacleanpro.excel import SHEETS_ALL, SHEET_ALL_LABEL, SHEET_FIRST, excel_sheet_names, parse_sheet
+from datacleanpro.fileio import (CSV_ENGINES, DEFAULT_CHUNK_SIZE, DEFAULT_SAMPLE_ROWS,
+                                 SAMPLE_HEAD_PREVIEW_ROWS, SAMPLE_METHODS, SUPPORTED_EXTENSIONS, can_stream,
+                                 read_data_file, read_data_sample, resolve_csv_engine, sample_note_text,
+                                 write_data_file)
+from datacleanpro.jobs import JOB_POLL_MS, JOB_WORKERS, JobScheduler
+from datacleanpro.memory import describe_memory_report, optimize_dtypes
+from datacleanpro.cache import LoadCache
+from datacleanpro.outliers import OUTLIER_POLICIES
+from datacleanpro.sketches import SKETCH_RELATIVE_ERROR
+from datacleanpro.plan import (CleaningPlan, DEFAULT_CLEANING_CONFIG, DUPLICATE_ACTIONS, RECIPE_FILE_TYPES,
+                               clean_dataframe)
+from datacleanpro.streaming import ChunkedCleaner, IncrementalCleaner, profile_files
+from datacleanpro.history import SnapshotHistory
+from datacleanpro.dataprofile import DataProfile, quality_report_text
+from datacleanpro.cli import run_cli
+
+pd = LazyModule('pandas', 'pd', globals())
+
+# 可选依赖: pyarrow (列式缓存使用Feather格式，未安装时退回pickle；Parquet/Arrow输出和多线程CSV解析需要)
+pa_csv = optional_module('pyarrow.csv', 'pa_csv', globals())
+
+
+# ==================== 数据预览 ====================
+
+PREVIEW_PAGE_COLS = 8
+PREVIEW_CELL_WIDTH = 20
+PREVIEW_ROW_HEIGHT = 20
+PREVIEW_HEADER_HEIGHT = 25
+
+
+def format_cell(value, max_width=PREVIEW_CELL_WIDTH):
+    """格式化预览单元格: 缺失值显示为(空)，长文本截断"""
+    try:
+        if pd.isna(value):
+            return "(空)"
+    except (TypeError, ValueError):
+        pass
+    str_value = str(value)
+    if len(str_value) > max_width:
+        str_value = str_value[:max_width - 3] + "..."
+    return str_value
+
+
+class VirtualTreeview:
+    """ttk.Treeview之上的虚拟表格 - 只渲染可见窗口内的行和列
+
+    各列底层数组按位置缓存(零拷贝的ExtensionArray)，滚动时只切片可见窗口，
+    重绘耗时与数据总行数无关。
+    """
+
+    def __init__(self, tree, v_scrollbar, page_cols=PREVIEW_PAGE_COLS, on_change=None):
+        self.tree = tree
+        self.v_scrollbar = v_scrollbar
+        self.page_cols = page_cols
+        self.on_change = on_change
+
+        self.df = None
+        self._arrays = {}
+        self._items = []
+        self.row_offset = 0
+        self.col_offset = 0
+        self.page_rows = 1
+
+        v_scrollbar.configure(command=self._on_scrollbar)
+        tree.bind('<Configure>', self._on_resize)
+        tree.bind('<MouseWheel>', self._on_mousewheel)
+        tree.bind('<Button-4>', lambda e: self.scroll_rows(-3))
+        tree.bind('<Button-5>', lambda e: self.scroll_rows(3))
+        tree.bind('<Prior>', lambda e: self.scroll_rows(-self.page_rows))
+        tree.bind('<Next>', lambda e: self.scroll_rows(self.page_rows))
+
+    @property
+    def n_rows(self):
+        return 0 if self.df is None else len(self.df)
+
+    @property
+    def n_cols(self):
+        return 0 if self.df is None else len(self.df.columns)
+
+    def set_dataframe(self, df):
+        """切换数据源，清空列数组缓存"""
+        self.df = df
+        self._arrays = {}
+        self.row_offset = min(self.row_offset, max(self.n_rows - self.page_rows, 0))
+        self.col_offset = min(self.col_offset, max(self.n_cols - 1, 0))
+        self._configure_columns()
+        self.render()
+
+    def _column_array(self, position):
+        array = self._arrays.get(position)
+        if array is None:
+            array = self.df.iloc[:, position].array
+            self._arrays[position] = array
+        return array
+
+    def _visible_columns(self):
+        stop = min(self.col_offset + self.page_cols, self.n_cols)
+        return list(range(self.col_offset, stop))
+
+    def _configure_columns(self):
+        positions = self._visible_columns()
+        ids = [f"c{i}" for i in range(len(positions))]
+        self.tree["columns"] = ids
+        self.tree.heading("#0", text="行号")
+        self.tree.column("#0", width=70, minwidth=50, stretch=False)
+        for col_id, position in zip(ids, positions):
+            self.tree.heading(col_id, text=str(self.df.columns[position]))
+            self.tree.column(col_id, width=100, minwidth=60)
+
+    def render(self):
+        """按当前行/列偏移重绘可见窗口"""
+        start = self.row_offset
+        stop = min(start + self.page_rows, self.n_rows)
+        positions = self._visible_columns() if self.df is not None else []
+        window = [self._column_array(p)[start:stop] for p in positions]
+
+        count = stop - start
+        while len(self._items) < count:
+            self._items.append(self.tree.insert("", "end"))
+        while len(self._items) > count:
+            self.tree.delete(self._items.pop())
+
+        for i, item in enumerate(self._items):
+            values = [format_cell(column[i]) for column in window]
+            self.tree.item(item, text=str(start + i + 1), values=values)
+
+        if self.n_rows:
+            self.v_scrollbar.set(start / self.n_rows, stop / self.n_rows)
+        else:
+            self.v_scrollbar.set(0, 1)
+        if self.on_change:
+            self.on_change()
+
+    def scroll_to_row(self, row):
+        """将指定行(从0开始)滚动到窗口顶部"""
+        max_offset = max(self.n_rows - self.page_rows, 0)
+        row = max(0, min(int(row), max_offset))
+        if row != self.row_offset:
+            self.row_offset = row
+            self.render()
+
+    def scroll_rows(self, delta):
+        self.scroll_to_row(self.row_offset + delta)
+
+    def page_columns(self, delta):
+        """横向翻页，delta为翻页数(正数向右)"""
+        if self.df is None:
+            return
+        offset = max(0, self.col_offset + delta * self.page_cols)
+        if offset < self.n_cols and offset != self.col_offset:
+            self.col_offset = offset
+            self._configure_columns()
+            self.render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == 'moveto':
+            self.scroll_to_row(float(args[1]) * self.n_rows)
+        elif args[0] == 'scroll':
+            step = self.page_rows if args[2] == 'pages' else 1
+            self.scroll_rows(int(args[1]) * step)
+
+    def _on_mousewheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        page_rows = max(1, (event.height - PREVIEW_HEADER_HEIGHT) // PREVIEW_ROW_HEIGHT)
+        if page_rows != self.page_rows:
+            self.page_rows = page_rows
+            self.row_offset = min(self.row_offset, max(self.n_rows - page_rows, 0))
+            self.render()
+
+
+# ==================== 启动剖析 ====================
+
+WINDOW_SIZE = (1000, 700)
+WARM_UP_DELAY_MS = 500  # 未收到首次绘制事件时 (如最小化启动) 开始预热的兜底延迟
+
+
+class StartupProfile:
+    """--startup-profile: 记录启动各阶段的时间点 (相对STARTUP_TIME)，预热完成后与导入耗时一起报告"""
+
+    def __init__(self):
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - STARTUP_TIME))
+
+    def report(self):
+        lines = ["⏱ 启动剖析 (从开始导入app模块计时，不含解释器启动)", "-" * 50]
+        lines += [f"{elapsed * 1000:9.1f} ms  {name}" for name, elapsed in self.marks]
+        lines.append("延迟导入的模块 (按导入顺序):")
+        lines += [f"{seconds * 1000:9.1f} ms  {name} [{thread}]"
+                  for name, (seconds, thread) in IMPORT_TIMES.items()]
+        return "\n".join(lines)
+
 
 class DataCleanPro:
     """数据清洗专家主应用程序 - 简化版"""
     
-    def __init__(self):
+    def __init__(self, startup_profile=None):
+        self.startup_profile = startup_profile
         self.root = tk.Tk()
+        self.mark_startup("创建Tk窗口")
         self.setup_window()
         self.setup_variables()
         self.setup_ui()
+        self.mark_startup("界面构建完成")
+        self._poll_jobs()
+
+        # 数据栈 (pandas等) 在首次绘制后于后台线程导入，首次加载文件时通常已就绪
+        self._warm_up_started = False
+        self._first_paint = self.root.bind('<Expose>', self._on_first_paint, add='+')
+        self.root.after(WARM_UP_DELAY_MS, self.warm_up_data_stack)
+
+    def mark_startup(self, name):
+        """记录启动阶段 (仅启用--startup-profile时)"""
+        if self.startup_profile is not None:
+            self.startup_profile.mark(name)
+
+    def _on_first_paint(self, event=None):
+        if self._first_paint is None:
+            return
+        self.root.unbind('<Expose>', self._first_paint)
+        self._first_paint = None
+        self.mark_startup("首次绘制")
+        self.root.after_idle(self.warm_up_data_stack)
+
+    def warm_up_data_stack(self):
+        """在后台线程导入数据栈 (只执行一次)"""
+        if self._warm_up_started:
+            return
+        self._warm_up_started = True
+        threading.Thread(target=self._warm_up_job, name="warm-up", daemon=True).start()
+
+    def _warm_up_job(self):
+        """(后台线程) 导入全部延迟模块，启用启动剖析时完成后打印报告"""
+        try:
+            warm_up_imports()
+        except ImportError as e:
+            print(f"⚠️ 数据组件导入失败: {e}")
+            return
+        if self.startup_profile is not None:
+            self.startup_profile.mark("数据栈预热完成")
+            print(self.startup_profile.report())
         
     def setup_window(self):
         """设置主窗口"""
         self.root.title("DataCleanPro - 数据清洗专家")
-        self.root.geometry("1000x700")
         self.root.minsize(800, 500)
         
         # 居中显示
@@ -37,14 +278,14 @@ class DataCleanPro:
         
         # 键盘快捷键
         self.root.bind('<Control-o>', lambda e: self.select_file())
+        self.root.bind('<Control-z>', lambda e: self.undo_cleaning())
+        self.root.bind('<Control-y>', lambda e: self.redo_cleaning())
         
     def center_window(self):
-        """窗口居中显示"""
-        self.root.update_idletasks()
-        width = self.root.winfo_width()
-        height = self.root.winfo_height()
-        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.root.winfo_screenheight() // 2) - (height // 2)
+        """窗口居中显示 (按设定尺寸计算，无需先用update_idletasks完成布局)"""
+        width, height = WINDOW_SIZE
+        x = max(0, (self.root.winfo_screenwidth() - width) // 2)
+        y = max(0, (self.root.winfo_screenheight() - height) // 2)
         self.root.geometry(f'{width}x{height}+{x}+{y}')
     
     def setup_variables(self):
@@ -53,15 +294,61 @@ class DataCleanPro:
         self.df_current = None
         self.file_path = None
         self.cleaning_history = []
+        self.history = None
+        self.load_info = ""
+        self.data_version = 0
+        self._profile = None
+
+        # 文件编码 (自动检测或手动指定)
+        self.encoding_choice = tk.StringVar(value=ENCODING_AUTO)
+
+        # CSV解析引擎 (pandas 或 pyarrow多线程解析)
+        self.csv_engine = tk.StringVar(value=resolve_csv_engine())
+
+        # Excel工作表 (第一个、全部、或逗号分隔的多个名称)
+        self.sheet_choice = tk.StringVar(value=SHEET_FIRST)
+
+        # 加载缓存
+        self.use_load_cache = tk.BooleanVar(value=True)
+        self.load_cache = LoadCache()
+
+        # 加载后内存优化
+        self.optimize_memory = tk.BooleanVar(value=False)
+        self.memory_report = None
+
+        # 抽样加载: 当前数据为样本时记录抽样信息，以及在样本上依次应用的清洗计划 (与撤销历史的步骤对应)
+        self.sample_method = tk.StringVar(value="完整加载")
+        self.sample_rows = tk.IntVar(value=DEFAULT_SAMPLE_ROWS)
+        self.sample_info = None
+        self.sample_plans = []
         
         # 进度相关
         self.progress_var = tk.DoubleVar()
         self.status_var = tk.StringVar(value="就绪 - 请选择数据文件")
+        self.job_var = tk.StringVar(value="")
+
+        # 后台任务 (回调经 root.after 转回界面线程执行)
+        self.jobs = JobScheduler(JOB_WORKERS, dispatch=lambda fn, *args: self.root.after(0, fn, *args))
+
+        # 阶段计量: 每个任务一条记录；勾选深度剖析后仅对下一个任务启用cProfile/tracemalloc
+        self.stage_traces = deque(maxlen=TRACE_HISTORY_LIMIT)
+        self.deep_profile_next = tk.BooleanVar(value=False)
         
         # 清洗选项
         self.missing_action = tk.StringVar(value="无操作")
         self.duplicate_action = tk.StringVar(value="无操作")
+        self.dedup_keys = tk.StringVar(value="")
+        self.dedup_keep = tk.StringVar(value="保留首次出现")
+        self.fingerprint_bits = tk.StringVar(value="64")
+        self.near_threshold = tk.StringVar(value=str(NEAR_DUP_THRESHOLD))
         self.outlier_action = tk.StringVar(value="无操作")
+        self.outlier_policy = tk.StringVar(value=OUTLIER_POLICIES[0])
+
+        # 流式清洗选项
+        self.chunk_size = tk.IntVar(value=DEFAULT_CHUNK_SIZE)
+        self.stream_multi_files = tk.BooleanVar(value=False)
+        self.stream_approximate = tk.BooleanVar(value=False)
+        self.stream_incremental = tk.BooleanVar(value=False)
         
     def setup_ui(self):
         """设置用户界面"""
@@ -118,6 +405,45 @@ class DataCleanPro:
         tk.Button(file_frame, text="📂 选择数据文件", command=self.select_file,
                  bg='#2196F3', fg='white', font=('微软雅黑', 9)).pack(fill=tk.X, padx=5, pady=2)
         
+        encoding_frame = tk.Frame(file_frame)
+        encoding_frame.pack(fill=tk.X, padx=5, pady=2)
+        tk.Label(encoding_frame, text="CSV编码:", font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        ttk.Combobox(encoding_frame, textvariable=self.encoding_choice, values=ENCODING_CHOICES,
+                     width=10, font=('微软雅黑', 8)).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        engine_frame = tk.Frame(file_frame)
+        engine_frame.pack(fill=tk.X, padx=5, pady=2)
+        tk.Label(engine_frame, text="解析引擎:", font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        ttk.Combobox(engine_frame, textvariable=self.csv_engine, state='readonly',
+                     values=CSV_ENGINES if pa_csv is not None else ['pandas'],
+                     width=10, font=('微软雅黑', 8)).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        sheet_frame = tk.Frame(file_frame)
+        sheet_frame.pack(fill=tk.X, padx=5, pady=2)
+        tk.Label(sheet_frame, text="工作表:", font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        self.sheet_combo = ttk.Combobox(sheet_frame, textvariable=self.sheet_choice,
+                                        values=[SHEET_FIRST, SHEET_ALL_LABEL], width=10,
+                                        font=('微软雅黑', 8))
+        self.sheet_combo.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        cache_frame = tk.Frame(file_frame)
+        cache_frame.pack(fill=tk.X, padx=5, pady=2)
+        tk.Checkbutton(cache_frame, text="使用加载缓存", variable=self.use_load_cache,
+                      font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        tk.Button(cache_frame, text="🗑 清空缓存", command=self.purge_load_cache,
+                 font=('微软雅黑', 8)).pack(side=tk.RIGHT)
+        tk.Checkbutton(file_frame, text="加载后压缩内存 (向下转换/分类编码)", variable=self.optimize_memory,
+                      font=('微软雅黑', 8)).pack(anchor=tk.W, padx=5)
+
+        sample_frame = tk.Frame(file_frame)
+        sample_frame.pack(fill=tk.X, padx=5, pady=2)
+        tk.Label(sample_frame, text="加载方式:", font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        ttk.Combobox(sample_frame, textvariable=self.sample_method, values=list(SAMPLE_METHODS),
+                     state='readonly', width=8, font=('微软雅黑', 8)).pack(side=tk.LEFT, padx=5)
+        tk.Spinbox(sample_frame, from_=1000, to=10000000, increment=10000,
+                   textvariable=self.sample_rows, width=8, font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        tk.Label(sample_frame, text="行", font=('微软雅黑', 8)).pack(side=tk.LEFT)
+
         tk.Button(file_frame, text="⚡ 加载数据", command=self.load_data,
                  bg='#4CAF50', fg='white', font=('微软雅黑', 9)).pack(fill=tk.X, padx=5, pady=2)
         
@@ -139,19 +465,70 @@ class DataCleanPro:
         
         tk.Label(clean_frame, text="重复值处理:", font=('微软雅黑', 8)).pack(anchor=tk.W, padx=5, pady=2)
         duplicate_combo = ttk.Combobox(clean_frame, textvariable=self.duplicate_action,
-                                      values=["无操作", "删除重复行", "标记重复行"],
+                                      values=DUPLICATE_ACTIONS,
                                       state="readonly", font=('微软雅黑', 8))
         duplicate_combo.pack(fill=tk.X, padx=5, pady=2)
         
+        dedup_frame = tk.Frame(clean_frame)
+        dedup_frame.pack(fill=tk.X, padx=5, pady=2)
+        tk.Label(dedup_frame, text="键列:", font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        tk.Entry(dedup_frame, textvariable=self.dedup_keys, width=12,
+                font=('微软雅黑', 8)).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(2, 5))
+        ttk.Combobox(dedup_frame, textvariable=self.fingerprint_bits,
+                     values=[str(bits) for bits in FINGERPRINT_BITS], state="readonly",
+                     width=4, font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        tk.Label(dedup_frame, text="位", font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        ttk.Combobox(clean_frame, textvariable=self.dedup_keep, values=list(DEDUP_KEEP_OPTIONS),
+                     state="readonly", font=('微软雅黑', 8)).pack(fill=tk.X, padx=5, pady=2)
+        near_frame = tk.Frame(clean_frame)
+        near_frame.pack(fill=tk.X, padx=5, pady=2)
+        tk.Label(near_frame, text="近似重复相似度:", font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        tk.Spinbox(near_frame, textvariable=self.near_threshold, from_=0.5, to=1.0, increment=0.05,
+                   width=5, font=('微软雅黑', 8)).pack(side=tk.LEFT, padx=(2, 0))
+
         tk.Label(clean_frame, text="异常值处理:", font=('微软雅黑', 8)).pack(anchor=tk.W, padx=5, pady=2)
         outlier_combo = ttk.Combobox(clean_frame, textvariable=self.outlier_action,
                                     values=["无操作", "IQR方法", "Z-score方法"],
                                     state="readonly", font=('微软雅黑', 8))
         outlier_combo.pack(fill=tk.X, padx=5, pady=2)
         
+        tk.Label(clean_frame, text="异常值策略:", font=('微软雅黑', 8)).pack(anchor=tk.W, padx=5, pady=2)
+        ttk.Combobox(clean_frame, textvariable=self.outlier_policy, values=OUTLIER_POLICIES,
+                     state="readonly", font=('微软雅黑', 8)).pack(fill=tk.X, padx=5, pady=2)
+
         # 执行按钮
         tk.Button(clean_frame, text="🚀 执行清洗", command=self.execute_cleaning,
-                 bg='#F44336', fg='white', font=('微软雅黑', 9, 'bold')).pack(fill=tk.X, padx=5, pady=10)
+                 bg='#F44336', fg='white', font=('微软雅黑', 9, 'bold')).pack(fill=tk.X, padx=5, pady=(10, 2))
+
+        undo_frame = tk.Frame(clean_frame)
+        undo_frame.pack(fill=tk.X, padx=5, pady=2)
+        tk.Button(undo_frame, text="↶ 撤销", command=self.undo_cleaning,
+                 font=('微软雅黑', 8)).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(undo_frame, text="↷ 重做", command=self.redo_cleaning,
+                 font=('微软雅黑', 8)).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+
+        recipe_frame = tk.Frame(clean_frame)
+        recipe_frame.pack(fill=tk.X, padx=5, pady=(2, 10))
+        tk.Button(recipe_frame, text="📥 导入配方", command=self.import_recipe,
+                 font=('微软雅黑', 8)).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(recipe_frame, text="📤 导出配方", command=self.export_recipe,
+                 font=('微软雅黑', 8)).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+
+        # 流式清洗 (大文件)
+        chunk_frame = tk.Frame(clean_frame)
+        chunk_frame.pack(fill=tk.X, padx=5, pady=2)
+        tk.Label(chunk_frame, text="分块行数:", font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        tk.Spinbox(chunk_frame, from_=1000, to=10000000, increment=10000,
+                   textvariable=self.chunk_size, width=10, font=('微软雅黑', 8)).pack(side=tk.LEFT, padx=5)
+        tk.Checkbutton(chunk_frame, text="多文件", variable=self.stream_multi_files,
+                      font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        tk.Checkbutton(clean_frame, text="近似分位数 (KLL草图，内存恒定)", variable=self.stream_approximate,
+                      font=('微软雅黑', 8)).pack(anchor=tk.W, padx=5)
+        tk.Checkbutton(clean_frame, text="增量 (只清洗新追加的行并追加到输出)", variable=self.stream_incremental,
+                      font=('微软雅黑', 8)).pack(anchor=tk.W, padx=5)
+
+        tk.Button(clean_frame, text="🌊 流式清洗(大文件)", command=self.execute_streaming_cleaning,
+                 bg='#00897B', fg='white', font=('微软雅黑', 8)).pack(fill=tk.X, padx=5, pady=(2, 10))
         
         # 数据分析区域
         analysis_frame = tk.LabelFrame(control_frame, text="📊 数据分析", 
@@ -167,6 +544,12 @@ class DataCleanPro:
         tk.Button(analysis_frame, text="📜 清洗历史", command=self.show_cleaning_history,
                  font=('微软雅黑', 8)).pack(fill=tk.X, padx=5, pady=2)
         
+        tk.Button(analysis_frame, text="📏 大文件概况(近似)", command=self.profile_large_files,
+                 font=('微软雅黑', 8)).pack(fill=tk.X, padx=5, pady=2)
+
+        tk.Checkbutton(analysis_frame, text="深度剖析下一个任务 (cProfile/tracemalloc)",
+                       variable=self.deep_profile_next, font=('微软雅黑', 8)).pack(anchor='w', padx=5)
+
     def create_data_panel(self, parent):
         """创建右侧数据展示面板"""
         # 数据面板框架
@@ -188,23 +571,46 @@ class DataCleanPro:
         preview_frame = tk.Frame(self.notebook)
         self.notebook.add(preview_frame, text="📋 数据预览")
         
+        # 分页导航栏
+        nav_frame = tk.Frame(preview_frame)
+        nav_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+
+        tk.Button(nav_frame, text="◀ 上一页列", command=lambda: self.preview_grid.page_columns(-1),
+                 font=('微软雅黑', 8)).pack(side=tk.LEFT)
+        tk.Button(nav_frame, text="下一页列 ▶", command=lambda: self.preview_grid.page_columns(1),
+                 font=('微软雅黑', 8)).pack(side=tk.LEFT, padx=5)
+
+        self.preview_info_var = tk.StringVar(value="")
+        tk.Label(nav_frame, textvariable=self.preview_info_var, font=('微软雅黑', 8),
+                fg='#666666').pack(side=tk.LEFT, padx=10)
+
+        self.jump_row_var = tk.StringVar()
+        tk.Button(nav_frame, text="跳转", command=self.jump_to_row,
+                 font=('微软雅黑', 8)).pack(side=tk.RIGHT)
+        jump_entry = tk.Entry(nav_frame, textvariable=self.jump_row_var, width=10, font=('微软雅黑', 8))
+        jump_entry.pack(side=tk.RIGHT, padx=5)
+        jump_entry.bind('<Return>', lambda e: self.jump_to_row())
+        tk.Label(nav_frame, text="行号:", font=('微软雅黑', 8)).pack(side=tk.RIGHT)
+
         # 创建表格显示区域
         table_frame = tk.Frame(preview_frame)
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # 创建Treeview显示数据
-        columns = ["列1", "列2", "列3", "列4", "列5"]
-        self.data_tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=15)
+        # 创建Treeview显示数据 (虚拟表格，只渲染可见窗口)
+        self.data_tree = ttk.Treeview(table_frame, columns=[], show="tree headings", height=15)
         
-        # 添加滚动条
-        v_scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.data_tree.yview)
+        # 添加滚动条 (纵向滚动条由虚拟表格按行偏移驱动)
+        v_scrollbar = ttk.Scrollbar(table_frame, orient="vertical")
         h_scrollbar = ttk.Scrollbar(table_frame, orient="horizontal", command=self.data_tree.xview)
-        self.data_tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.data_tree.configure(xscrollcommand=h_scrollbar.set)
         
         # 布局
-        self.data_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.data_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.preview_grid = VirtualTreeview(self.data_tree, v_scrollbar,
+                                            on_change=self._update_preview_info)
         
     def create_stats_tab(self):
         """创建统计信息标签页"""
@@ -224,17 +630,81 @@ class DataCleanPro:
         self.progress_bar = ttk.Progressbar(status_frame, variable=self.progress_var, mode='determinate')
         self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=2)
         
+        # 任务进度 (吞吐量/剩余时间) 与取消按钮
+        tk.Button(status_frame, text="⏹ 取消", command=self.cancel_jobs,
+                  font=('微软雅黑', 8)).pack(side=tk.LEFT, padx=2, pady=2)
+        job_label = tk.Label(status_frame, textvariable=self.job_var, font=('微软雅黑', 8), fg='gray')
+        job_label.pack(side=tk.LEFT, padx=5, pady=2)
+
         # 状态标签
         status_label = tk.Label(status_frame, textvariable=self.status_var, font=('微软雅黑', 8))
         status_label.pack(side=tk.RIGHT, padx=5, pady=2)
         
+    def submit_job(self, name, func, *args, group='data', on_success=None, error_title="错误"):
+        """提交后台任务: func(job, *args) 在工作线程中执行，on_success在界面线程中接收结果
+
+        group相同的任务按提交顺序逐个执行 (默认'data': 读写当前数据的加载/清洗/撤销/保存)。
+        """
+        def on_error(error):
+            messagebox.showerror(error_title, f"{name}失败:\n{error}")
+            self.status_var.set(f"❌ {name}失败")
+
+        def on_cancel():
+            self.status_var.set(f"⏹ 已取消: {name}")
+
+        deep = self.deep_profile_next.get()
+        self.deep_profile_next.set(False)
+
+        def traced(job, *args):
+            # 每个任务的各阶段耗时/内存记录到一个StageTrace (失败或取消的任务也保留)
+            trace = StageTrace(name, deep=deep)
+            try:
+                with trace:
+                    return func(job, *args)
+            finally:
+                self.stage_traces.append(trace)
+
+        queued = bool(self.jobs.running())
+        job = self.jobs.submit(name, traced, *args, group=group, on_success=on_success,
+                               on_error=on_error, on_cancel=on_cancel)
+        self.status_var.set(f"⏳ 已加入队列: {name}" if queued else f"正在{name}...")
+        return job
+
+    def has_data_jobs(self):
+        """是否有排队或运行中的数据任务 (如尚未完成的加载)"""
+        return any(job.group == 'data' for job in self.jobs.pending() + self.jobs.running())
+
+    def cancel_jobs(self):
+        """取消全部排队和运行中的任务 (运行中的任务在下一个数据块边界停止)"""
+        if not self.jobs.pending() and not self.jobs.running():
+            self.status_var.set("没有运行中的任务")
+            return
+        self.jobs.cancel_all()
+
+    def _poll_jobs(self):
+        """定时刷新进度条和任务吞吐量/剩余时间显示"""
+        running = self.jobs.running()
+        if running:
+            self.progress_var.set(running[0].percent)
+            text = " | ".join(job.describe() for job in running)
+            queued = len(self.jobs.pending())
+            if queued:
+                text += f" | 排队 {queued} 个"
+            self.job_var.set(text)
+        else:
+            self.progress_var.set(0)
+            self.job_var.set("")
+        self.root.after(JOB_POLL_MS, self._poll_jobs)
+
     def select_file(self):
         """选择数据文件"""
         filetypes = [
-            ("所有支持的格式", "*.csv;*.xlsx;*.xls;*.json"),
+            ("所有支持的格式", "*.csv;*.xlsx;*.xls;*.json;*.jsonl;*.ndjson;*.gz;*.zst;"
+                              "*.parquet;*.feather;*.arrow"),
             ("CSV文件", "*.csv"),
             ("Excel文件", "*.xlsx;*.xls"), 
             ("JSON文件", "*.json"),
+            ("JSON Lines文件", "*.jsonl;*.ndjson;*.jsonl.gz;*.jsonl.zst"),
             ("所有文件", "*.*")
         ]
         
@@ -244,10 +714,11 @@ class DataCleanPro:
         )
         
         if filename:
-            file_ext = Path(filename).suffix.lower()
-            if file_ext in ['.csv', '.xlsx', '.xls', '.json']:
+            file_ext = file_format(filename)
+            if file_ext in SUPPORTED_EXTENSIONS:
                 self.file_path = filename
                 self.status_var.set(f"✅ 已选择: {Path(filename).name}")
+                self.update_sheet_choices(filename)
                 
                 if messagebox.askyesno("确认", f"是否立即加载文件?\n{Path(filename).name}"):
                     self.load_data()
@@ -257,7 +728,9 @@ class DataCleanPro:
                                      "请选择以下格式:\n"
                                      "• CSV文件 (.csv)\n"
                                      "• Excel文件 (.xlsx, .xls)\n"
-                                     "• JSON文件 (.json)")
+                                     "• JSON文件 (.json)\n"
+                                     "• JSON Lines文件 (.jsonl, .ndjson，可gzip/zstd压缩)\n"
+                                     "• Parquet / Feather / Arrow IPC")
                 self.status_var.set("❌ 文件格式不支持")
                 
     def load_data(self):
@@ -265,246 +738,373 @@ class DataCleanPro:
         if not self.file_path:
             messagebox.showwarning("警告", "请先选择数据文件!")
             return
-            
-        threading.Thread(target=self._load_data_thread, daemon=True).start()
-        
-    def _load_data_thread(self):
-        """在后台线程中加载数据"""
         try:
-            self.status_var.set("正在加载数据...")
-            self.progress_var.set(20)
-            
-            file_path = Path(self.file_path)
-            file_ext = file_path.suffix.lower()
-            
-            self.progress_var.set(40)
-            
-            if file_ext == '.csv':
-                with open(file_path, 'rb') as f:
-                    raw_data = f.read()
-                    encoding = chardet.detect(raw_data)['encoding'] or 'utf-8'
-                df = pd.read_csv(file_path, encoding=encoding)
-                
-            elif file_ext in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path)
-                
-            elif file_ext == '.json':
-                df = pd.read_json(file_path)
-                
-            else:
-                raise ValueError(f"不支持的文件格式: {file_ext}")
-            
-            self.progress_var.set(80)
-            
-            self.df_original = df.copy()
-            self.df_current = df.copy()
-            self.cleaning_history = []
-            
-            self.progress_var.set(100)
-            
-            self.root.after(0, self._update_ui_after_load)
-            
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("加载错误", f"加载文件失败:\n{str(e)}"))
-            self.root.after(0, lambda: self.status_var.set("❌ 加载失败"))
-            self.root.after(0, lambda: self.progress_var.set(0))
+            encoding = self.get_encoding_override()
+        except LookupError as e:
+            messagebox.showerror("加载错误", f"加载文件失败:\n{str(e)}")
+            return
+        method = SAMPLE_METHODS[self.sample_method.get()]
+        if method is not None:
+            try:
+                rows = int(self.sample_rows.get())
+            except (tk.TclError, ValueError):
+                rows = 0
+            if rows <= 0:
+                messagebox.showwarning("警告", "抽样行数必须为正整数!")
+                return
+            if method == 'reservoir':
+                # 随机抽样要读完整个文件: 先以前若干行给出预览，抽样完成后替换
+                self.submit_job("预览前N行", self._load_sample_job, Path(self.file_path), encoding,
+                                self.get_sheet_choice(), 'head', min(rows, SAMPLE_HEAD_PREVIEW_ROWS),
+                                False, on_success=self._apply_loaded_data, error_title="加载错误")
+            self.submit_job("抽样加载", self._load_sample_job, Path(self.file_path), encoding,
+                            self.get_sheet_choice(), method, rows, self.optimize_memory.get(),
+                            on_success=self._apply_loaded_data, error_title="加载错误")
+            return
+        cache = self.load_cache if self.use_load_cache.get() else None
+        self.submit_job("加载数据", self._load_data_job, Path(self.file_path), encoding, cache,
+                        self.optimize_memory.get(), self.get_sheet_choice(), self.csv_engine.get(),
+                        on_success=self._apply_loaded_data, error_title="加载错误")
+
+    def _load_sample_job(self, job, file_path, encoding, sheet, method, rows, optimize):
+        """(后台任务) 抽样读取文件 (前N行或流式随机抽样)，样本上的统计均为估计值"""
+        df, info = read_data_sample(file_path, rows, method, encoding, sheet,
+                                    progress_callback=job.progress)
+        info.update(file_path=str(file_path), encoding=encoding, sheet=sheet)
+        label = "前N行" if method == 'head' else "随机抽样"
+        load_info = f"{label} {info['rows']:,} 行 (读取 {info['rows_read']:,} 行, {info['seconds']:.2f}s)"
+        memory_report = None
+        if optimize:
+            job.check()
+            df, memory_report = optimize_dtypes(df)
+        job.check()
+        return df, load_info, memory_report, DataProfile(df).warm(), info
+
+    def _load_data_job(self, job, file_path, encoding, cache, optimize, sheet=None, engine=None):
+        """(后台任务) 读取文件、优化内存并预先计算数据概况"""
+        df, info = read_data_file(file_path, encoding, cache, progress_callback=job.progress,
+                                  sheet=sheet, engine=engine)
+
+        if info['cache'] == 'hit':
+            load_info = f"⚡ 缓存命中 (读取 {info['parse_seconds']:.2f}s)"
+        elif info['encoding']:
+            load_info = (f"冷加载 | 编码 {info['encoding']} (检测 {info['detect_seconds']:.2f}s) | "
+                         f"{info['engine']}解析 {info['parse_seconds']:.2f}s")
+        else:
+            load_info = f"冷加载 | 解析 {info['parse_seconds']:.2f}s"
+
+        memory_report = None
+        if optimize:
+            job.check()
+            df, memory_report = optimize_dtypes(df)
+            before = memory_report['优化前字节'].sum() / 1024 / 1024
+            after = memory_report['优化后字节'].sum() / 1024 / 1024
+            load_info += f" | 内存 {before:.1f}→{after:.1f} MB"
+
+        job.check()
+        return df, load_info, memory_report, DataProfile(df).warm(), None
+
+    def _apply_loaded_data(self, result):
+        """(界面线程) 替换当前数据并更新UI"""
+        df, self.load_info, self.memory_report, profile, self.sample_info = result
+        self.sample_plans = []
+        # 原始数据与当前数据共享同一对象，清洗总是生成新的DataFrame
+        self.df_original = df
+        self.set_current_data(df, profile=profile)
+        self.cleaning_history = []
+        if self.history is not None:
+            self.history.close()
+        self.history = SnapshotHistory(df)
+        self._update_ui_after_load()
             
+    def purge_load_cache(self):
+        """清空加载缓存"""
+        count, size = self.load_cache.usage()
+        if count == 0:
+            messagebox.showinfo("加载缓存", "缓存为空")
+            return
+        if not messagebox.askyesno("确认", f"是否清空加载缓存?\n{count} 个文件, {size / 1024 / 1024:.1f} MB"):
+            return
+        count, size = self.load_cache.purge()
+        self.status_var.set(f"🗑 已清空加载缓存 - 释放 {size / 1024 / 1024:.1f} MB")
+
+    def set_current_data(self, df, known=None, profile=None):
+        """替换当前数据并设置新版本的数据概况 (profile为后台任务中预先计算好的概况)"""
+        self.data_version += 1
+        self.df_current = df
+        if profile is None or profile.df is not df:
+            profile = DataProfile(df, known=known)
+        profile.version = self.data_version
+        self._profile = profile
+
+    def get_profile(self):
+        """返回当前数据版本的数据概况，版本变化时重新生成"""
+        if self.df_current is None:
+            return None
+        if self._profile is None or self._profile.df is not self.df_current:
+            self.data_version += 1
+            self._profile = DataProfile(self.df_current, self.data_version)
+        return self._profile
+
+    def get_encoding_override(self):
+        """返回手动指定的编码，自动检测时返回None"""
+        choice = self.encoding_choice.get().strip()
+        if choice and choice != ENCODING_AUTO:
+            codecs.lookup(choice)  # 无效编码名在此处报错
+            return choice
+        return None
+
+    def get_sheet_choice(self):
+        """返回Excel工作表选择 (见parse_sheet)"""
+        choice = self.sheet_choice.get().strip()
+        if choice == SHEET_FIRST:
+            return None
+        if choice == SHEET_ALL_LABEL:
+            return SHEETS_ALL
+        return parse_sheet(choice)
+
+    def update_sheet_choices(self, file_path):
+        """选择Excel文件后列出其工作表供选择"""
+        self.sheet_choice.set(SHEET_FIRST)
+        names = []
+        if file_format(file_path) in ['.xlsx', '.xls']:
+            try:
+                names = excel_sheet_names(file_path)
+            except Exception:
+                pass  # 读取失败时在加载阶段报告错误
+        self.sheet_combo.configure(values=[SHEET_FIRST, SHEET_ALL_LABEL] + names)
+
+    def get_csv_encoding(self, file_path):
+        """返回CSV文件编码: 优先使用手动指定的编码，否则有界采样检测"""
+        encoding = self.get_encoding_override()
+        if encoding is None:
+            encoding, _ = detect_encoding(file_path)
+        return encoding
+
     def _update_ui_after_load(self):
         """数据加载完成后更新UI"""
         self.update_data_preview()
         self.update_stats_display()
-        self.status_var.set(f"✅ 加载成功 - {len(self.df_current)}行 × {len(self.df_current.columns)}列")
-        self.progress_var.set(0)
+        if self.is_sampled():
+            self.status_var.set(f"🔍 抽样预览 - {len(self.df_current)}行 × {len(self.df_current.columns)}列"
+                                f" | {self.load_info} | 统计为估计值，保存时清洗完整文件")
+            return
+        self.status_var.set(f"✅ 加载成功 - {len(self.df_current)}行 × {len(self.df_current.columns)}列"
+                            f" | {self.load_info}")
+
+    def is_sampled(self):
+        """当前数据是否为文件的部分样本 (样本已包含全部行时按完整数据处理)"""
+        return self.sample_info is not None and not self.sample_info['complete']
         
     def update_data_preview(self):
         """更新数据预览"""
         if self.df_current is None:
             return
-            
-        # 清空现有数据
-        for item in self.data_tree.get_children():
-            self.data_tree.delete(item)
-            
-        df = self.df_current
-        columns = list(df.columns)
-        
-        # 限制显示列数
-        max_cols = 8
-        display_columns = columns[:max_cols] if len(columns) > max_cols else columns
-        
-        # 配置列
-        self.data_tree["columns"] = display_columns
-        for col in display_columns:
-            self.data_tree.heading(col, text=col)
-            self.data_tree.column(col, width=100, minwidth=60)
-            
-        # 添加数据行 (限制100行)
-        max_rows = 100
-        display_rows = min(len(df), max_rows)
-        
-        for i in range(display_rows):
-            row_data = []
-            for col in display_columns:
-                value = df.iloc[i][col]
-                if pd.isna(value):
-                    row_data.append("(空)")
-                else:
-                    str_value = str(value)
-                    if len(str_value) > 20:
-                        str_value = str_value[:17] + "..."
-                    row_data.append(str_value)
-                    
-            self.data_tree.insert("", "end", values=row_data)
-            
-        if len(df) > max_rows:
-            self.data_tree.insert("", "end", values=["..."] * len(display_columns))
+        self.preview_grid.set_dataframe(self.df_current)
+
+    def _update_preview_info(self):
+        """更新预览窗口的行列位置信息"""
+        grid = self.preview_grid
+        if grid.df is None:
+            self.preview_info_var.set("")
+            return
+        row_stop = min(grid.row_offset + grid.page_rows, grid.n_rows)
+        col_stop = min(grid.col_offset + grid.page_cols, grid.n_cols)
+        self.preview_info_var.set(
+            f"行 {grid.row_offset + 1 if grid.n_rows else 0}-{row_stop} / {grid.n_rows:,} | "
+            f"列 {grid.col_offset + 1 if grid.n_cols else 0}-{col_stop} / {grid.n_cols}")
+
+    def jump_to_row(self):
+        """跳转到指定行号(从1开始)"""
+        try:
+            row = int(self.jump_row_var.get().replace(',', '').strip())
+        except ValueError:
+            messagebox.showwarning("警告", "请输入有效的行号!")
+            return
+        self.preview_grid.scroll_to_row(row - 1)
             
     def update_stats_display(self):
         """更新统计信息显示"""
         if self.df_current is None:
             return
-            
-        df = self.df_current
-        
-        stats_text = "=== 数据基本信息 ===\n\n"
-        stats_text += f"数据形状: {df.shape[0]} 行 × {df.shape[1]} 列\n"
-        stats_text += f"内存使用: {df.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB\n\n"
-        
+
+        profile = self.get_profile()
+        n_rows = profile.n_rows
+
+        stats_text = ""
+        if self.is_sampled():
+            stats_text += "=== ⚠ 抽样估计 ===\n" + sample_note_text(self.sample_info) + "\n"
+        stats_text += "=== 数据基本信息 ===\n\n"
+        stats_text += f"数据形状: {n_rows} 行 × {profile.n_cols} 列\n"
+        stats_text += f"内存使用: {profile.memory_bytes / 1024 / 1024:.1f} MB\n\n"
+
         stats_text += "=== 数据类型统计 ===\n"
-        for dtype, count in df.dtypes.value_counts().items():
+        for dtype, count in profile.dtypes.value_counts().items():
             stats_text += f"{dtype}: {count} 列\n"
         stats_text += "\n"
-        
+
         stats_text += "=== 数据质量评估 ===\n"
-        missing_stats = df.isnull().sum()
-        total_missing = missing_stats.sum()
+        missing_stats = profile.null_counts
+        total_missing = profile.total_missing
         stats_text += f"总缺失值: {total_missing}\n"
-        
+
         if total_missing > 0:
             stats_text += "缺失值分布:\n"
             for col, count in missing_stats[missing_stats > 0].items():
-                percentage = count / len(df) * 100
+                percentage = count / n_rows * 100
                 stats_text += f"  {col}: {count} ({percentage:.1f}%)\n"
         stats_text += "\n"
-        
-        duplicate_count = df.duplicated().sum()
+
+        duplicate_count = profile.duplicate_count
         stats_text += f"重复行数: {duplicate_count}\n"
         if duplicate_count > 0:
-            percentage = duplicate_count / len(df) * 100
+            percentage = duplicate_count / n_rows * 100
             stats_text += f"重复率: {percentage:.1f}%\n"
         stats_text += "\n"
-        
+
         # 数值列统计
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) > 0:
+        summary = profile.numeric_summary
+        if len(summary.columns) > 0:
             stats_text += "=== 数值列统计 ===\n"
-            for col in numeric_cols[:3]:  # 只显示前3列
-                series = df[col]
+            for col in summary.columns[:3]:  # 只显示前3列
+                col_stats = summary[col]
                 stats_text += f"\n{col}:\n"
-                stats_text += f"  计数: {series.count()}\n"
-                stats_text += f"  均值: {series.mean():.2f}\n"
-                stats_text += f"  标准差: {series.std():.2f}\n"
-                stats_text += f"  最小值: {series.min()}\n"
-                stats_text += f"  最大值: {series.max()}\n"
-                
+                stats_text += f"  计数: {int(col_stats['count'])}\n"
+                stats_text += f"  均值: {col_stats['mean']:.2f}\n"
+                stats_text += f"  标准差: {col_stats['std']:.2f}\n"
+                stats_text += f"  最小值: {col_stats['min']}\n"
+                stats_text += f"  最大值: {col_stats['max']}\n"
+
+        if self.memory_report is not None:
+            stats_text += "\n=== 加载时内存优化 ===\n"
+            stats_text += describe_memory_report(self.memory_report)
+
         self.stats_text.delete(1.0, tk.END)
         self.stats_text.insert(1.0, stats_text)
-        
+
     def execute_cleaning(self):
         """执行数据清洗"""
-        if self.df_current is None:
+        if self.df_current is None and not self.has_data_jobs():
             messagebox.showwarning("警告", "请先加载数据!")
             return
+        config = self.get_cleaning_config()
+        # 只使用数据概况中已算好的缺失值统计，不为此触发扫描；排队在加载/清洗之后时数据还会变化，不传统计
+        null_counts = None if self.has_data_jobs() else self.get_profile().__dict__.get('null_counts')
+        self.submit_job("数据清洗", self._cleaning_job, config, null_counts,
+                        on_success=lambda result: self._apply_cleaning(config, result),
+                        error_title="清洗错误")
+        
+    def _cleaning_job(self, job, config, null_counts):
+        """(后台任务) 清洗当前数据，在步骤之间检查取消；只返回结果，历史和抽样配方由界面线程更新"""
+        # 同组任务逐个执行，当前数据只在前一任务的完成回调 (界面线程) 中被替换
+        df_before = self.df_current
+        if df_before is None:
+            raise ValueError("没有已加载的数据")
+        df, operations, known = clean_dataframe(df_before, config, progress_callback=job.progress,
+                                                null_counts=null_counts)
+        job.check()
+        delta = SnapshotHistory.diff(df_before, df)
+        job.check()
+        return df, operations, delta, DataProfile(df, known=known).warm()
+
+    def _apply_cleaning(self, config, result):
+        """(界面线程) 记录历史、替换当前数据并更新UI"""
+        df, operations, delta, profile = result
+        self.history.record(self.df_current, df, operations, delta=delta)
+        if self.sample_info is not None:
+            del self.sample_plans[self.history.position - 1:]
+            self.sample_plans.append(CleaningPlan.coerce(config))
+        self.set_current_data(df, profile=profile)
+        self.cleaning_history = self.history.operations()
+        self._update_ui_after_cleaning(operations)
             
-        threading.Thread(target=self._execute_cleaning_thread, daemon=True).start()
-        
-    def _execute_cleaning_thread(self):
-        """在后台线程中执行清洗"""
-        try:
-            self.status_var.set("正在执行数据清洗...")
-            self.progress_var.set(0)
-            
-            df = self.df_current.copy()
-            operations = []
-            
-            # 缺失值处理
-            self.progress_var.set(25)
-            if self.missing_action.get() == "删除含缺失值的行":
-                before_count = len(df)
-                df = df.dropna()
-                after_count = len(df)
-                operations.append(f"删除含缺失值的行: {before_count - after_count} 行")
-                
-            elif self.missing_action.get() == "删除含缺失值的列":
-                before_cols = len(df.columns)
-                df = df.dropna(axis=1)
-                after_cols = len(df.columns)
-                operations.append(f"删除含缺失值的列: {before_cols - after_cols} 列")
-                
-            elif self.missing_action.get() in ["均值填充", "中位数填充", "众数填充"]:
-                numeric_cols = df.select_dtypes(include=[np.number]).columns
-                if len(numeric_cols) > 0:
-                    if self.missing_action.get() == "均值填充":
-                        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
-                        operations.append("使用均值填充数值列缺失值")
-                    elif self.missing_action.get() == "中位数填充":
-                        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
-                        operations.append("使用中位数填充数值列缺失值")
-                    elif self.missing_action.get() == "众数填充":
-                        for col in numeric_cols:
-                            mode_val = df[col].mode()
-                            if not mode_val.empty:
-                                df[col] = df[col].fillna(mode_val.iloc[0])
-                        operations.append("使用众数填充数值列缺失值")
-            
-            # 重复值处理
-            self.progress_var.set(50)
-            if self.duplicate_action.get() == "删除重复行":
-                before_count = len(df)
-                df = df.drop_duplicates()
-                after_count = len(df)
-                operations.append(f"删除重复行: {before_count - after_count} 行")
-                
-            elif self.duplicate_action.get() == "标记重复行":
-                df['是否重复'] = df.duplicated()
-                duplicate_count = df['是否重复'].sum()
-                operations.append(f"标记重复行: {duplicate_count} 行")
-            
-            # 异常值处理
-            self.progress_var.set(75)
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            
-            if self.outlier_action.get() == "IQR方法" and len(numeric_cols) > 0:
-                before_count = len(df)
-                for col in numeric_cols:
-                    Q1 = df[col].quantile(0.25)
-                    Q3 = df[col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    lower_bound = Q1 - 1.5 * IQR
-                    upper_bound = Q3 + 1.5 * IQR
-                    df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
-                after_count = len(df)
-                operations.append(f"IQR方法处理异常值: 移除 {before_count - after_count} 行")
-                
-            elif self.outlier_action.get() == "Z-score方法" and len(numeric_cols) > 0:
-                before_count = len(df)
-                for col in numeric_cols:
-                    z_scores = np.abs((df[col] - df[col].mean()) / df[col].std())
-                    df = df[z_scores < 3]
-                after_count = len(df)
-                operations.append(f"Z-score方法处理异常值: 移除 {before_count - after_count} 行")
-            
-            self.progress_var.set(100)
-            
-            self.df_current = df
-            self.cleaning_history.extend(operations)
+    def undo_cleaning(self):
+        """撤销上一步清洗"""
+        if self.history is None or not self.history.can_undo:
+            self.status_var.set("没有可撤销的操作")
+            return
+        self.submit_job("撤销", self._undo_redo_job, True, on_success=self._apply_undo_redo,
+                        error_title="历史错误")
+
+    def redo_cleaning(self):
+        """重做下一步清洗"""
+        if self.history is None or not self.history.can_redo:
+            self.status_var.set("没有可重做的操作")
+            return
+        self.submit_job("重做", self._undo_redo_job, False, on_success=self._apply_undo_redo,
+                        error_title="历史错误")
+
+    def _undo_redo_job(self, job, undo):
+        """(后台任务) 在当前数据上反向或正向应用一步增量"""
+        df = self.history.undo(self.df_current) if undo else self.history.redo(self.df_current)
+        return undo, df, DataProfile(df).warm()
+
+    def _apply_undo_redo(self, result):
+        """(界面线程) 替换当前数据并更新UI"""
+        undo, df, profile = result
+        self.set_current_data(df, profile=profile)
+        self.cleaning_history = self.history.operations()
+        self._update_ui_after_undo_redo(undo)
             
-            self.root.after(0, self._update_ui_after_cleaning, operations)
+    def _update_ui_after_undo_redo(self, undo):
+        """撤销/重做完成后更新UI"""
+        self.update_data_preview()
+        self.update_stats_display()
+        action = "撤销" if undo else "重做"
+        self.status_var.set(f"✅ 已{action} ({self.history.position}/{len(self.history.entries())} 步) - "
+                            f"{len(self.df_current)}行 × {len(self.df_current.columns)}列")
+
+    def get_cleaning_config(self):
+        """从界面选项生成清洗配置"""
+        return {
+            'missing_action': self.missing_action.get(),
+            'duplicate_action': self.duplicate_action.get(),
+            'outlier_action': self.outlier_action.get(),
+            'outlier_policy': self.outlier_policy.get(),
+            'dedup_subset': parse_column_list(self.dedup_keys.get()),
+            'dedup_keep': DEDUP_KEEP_OPTIONS[self.dedup_keep.get()],
+            'fingerprint_bits': int(self.fingerprint_bits.get()),
+            'near_threshold': self.near_threshold.get().strip(),
+        }
+
+    def set_cleaning_config(self, config):
+        """将清洗配置写回界面选项"""
+        config = {**DEFAULT_CLEANING_CONFIG, **config}
+        self.missing_action.set(config['missing_action'])
+        self.duplicate_action.set(config['duplicate_action'])
+        self.outlier_action.set(config['outlier_action'])
+        self.outlier_policy.set(config['outlier_policy'])
+        self.dedup_keys.set(", ".join(config['dedup_subset'] or []))
+        keep_labels = {keep: label for label, keep in DEDUP_KEEP_OPTIONS.items()}
+        self.dedup_keep.set(keep_labels[config['dedup_keep']])
+        self.fingerprint_bits.set(str(config['fingerprint_bits']))
+        self.near_threshold.set(str(config['near_threshold']))
+
+    def export_recipe(self):
+        """将当前清洗选项导出为JSON配方 (可用 --recipe 在命令行重放)"""
+        filename = filedialog.asksaveasfilename(title="导出清洗配方", filetypes=RECIPE_FILE_TYPES,
+                                                defaultextension=".json")
+        if not filename:
+            return
+        try:
+            plan = CleaningPlan.from_config(self.get_cleaning_config())
+            plan.save(filename)
+            self.status_var.set(f"✅ 配方已导出: {Path(filename).name} ({len(plan.steps)} 步)")
+        except Exception as e:
+            messagebox.showerror("导出错误", f"导出配方失败:\n{str(e)}")
             
+    def import_recipe(self):
+        """导入JSON配方并设置清洗选项"""
+        filename = filedialog.askopenfilename(title="导入清洗配方", filetypes=RECIPE_FILE_TYPES)
+        if not filename:
+            return
+        try:
+            plan = CleaningPlan.load(filename)
+            self.set_cleaning_config(plan.to_config())
+            self.status_var.set(f"✅ 配方已导入: {Path(filename).name}")
+            messagebox.showinfo("导入配方", "清洗步骤:\n" + "\n".join(plan.describe()))
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("清洗错误", f"数据清洗失败:\n{str(e)}"))
-            self.root.after(0, lambda: self.status_var.set("❌ 清洗失败"))
-            self.root.after(0, lambda: self.progress_var.set(0))
+            messagebox.showerror("导入错误", f"导入配方失败:\n{str(e)}")
             
     def _update_ui_after_cleaning(self, operations):
         """数据清洗完成后更新UI"""
@@ -513,21 +1113,146 @@ class DataCleanPro:
         
         operation_text = "\n".join(operations) if operations else "无操作"
         self.status_var.set(f"✅ 清洗完成 - {len(self.df_current)}行 × {len(self.df_current.columns)}列")
-        self.progress_var.set(0)
         
         if operations:
             messagebox.showinfo("清洗完成", f"数据清洗完成!\n\n执行的操作:\n{operation_text}")
         
+    def execute_streaming_cleaning(self):
+        """对CSV/JSON Lines文件执行分块流式清洗，结果直接写入输出文件
+
+        勾选"增量"时选择上次的输出文件，只清洗输入文件新追加的行并追加写入。
+        """
+        incremental = self.stream_incremental.get()
+        if incremental and self.stream_multi_files.get():
+            messagebox.showwarning("警告", "增量清洗只支持单个输入文件!")
+            return
+        if self.stream_multi_files.get():
+            input_files = list(filedialog.askopenfilenames(
+                title="选择要合并清洗的文件 (按所选顺序合并，跨文件去重)",
+                filetypes=[("CSV/JSON Lines文件", "*.csv *.jsonl *.ndjson *.json *.gz *.zst"),
+                           ("CSV文件", "*.csv")]
+            ))
+            if not input_files:
+                return
+        elif self.file_path:
+            input_files = [self.file_path]
+        else:
+            messagebox.showwarning("警告", "请先选择数据文件!")
+            return
+        if not all(can_stream(path) for path in input_files):
+            messagebox.showwarning("警告", "流式清洗目前仅支持CSV和JSON Lines文件!")
+            return
+        try:
+            chunksize = int(self.chunk_size.get())
+        except (tk.TclError, ValueError):
+            messagebox.showwarning("警告", "分块行数必须为正整数!")
+            return
+        if chunksize <= 0:
+            messagebox.showwarning("警告", "分块行数必须为正整数!")
+            return
+
+        if incremental:
+            filename = filedialog.asksaveasfilename(
+                title="选择增量清洗的输出文件 (再次选择上次的输出文件即只追加新行)",
+                filetypes=[("CSV文件", "*.csv"), ("JSON Lines文件", "*.jsonl")],
+                defaultextension=".csv", confirmoverwrite=False
+            )
+        else:
+            filename = filedialog.asksaveasfilename(
+                title="保存流式清洗结果",
+                filetypes=[("CSV文件", "*.csv"), ("JSON Lines文件", "*.jsonl"),
+                           ("JSON Lines (gzip)", "*.jsonl.gz")],
+                defaultextension=".csv"
+            )
+        if not filename:
+            return
+        if any(Path(filename).resolve() == Path(path).resolve() for path in input_files):
+            messagebox.showwarning("警告", "输出文件不能与输入文件相同!")
+            return
+
+        try:
+            encoding = self.get_encoding_override()
+        except LookupError as e:
+            messagebox.showerror("清洗错误", f"流式清洗失败:\n{str(e)}")
+            return
+        sketch_error = SKETCH_RELATIVE_ERROR if self.stream_approximate.get() else None
+        cleaner_class = IncrementalCleaner if incremental else ChunkedCleaner
+        try:
+            cleaner = cleaner_class.from_config(self.get_cleaning_config(), chunksize=chunksize,
+                                                encoding=encoding, sketch_error=sketch_error)
+        except ValueError as e:
+            messagebox.showwarning("警告", str(e))
+            return
+        self.submit_job("流式清洗", self._streaming_cleaning_job, cleaner, input_files, filename,
+                        group=None, on_success=self._update_ui_after_streaming,
+                        error_title="清洗错误")
+
+    def _streaming_cleaning_job(self, job, cleaner, input_files, output_path):
+        """(后台任务) 执行流式清洗，在数据块边界检查取消"""
+        cleaner.progress_callback = job.progress
+        return cleaner.run(input_files, output_path)
+
+    def _update_ui_after_streaming(self, operations):
+        """流式清洗完成后更新UI"""
+        self.status_var.set("✅ 流式清洗完成")
+        messagebox.showinfo("清洗完成", "流式清洗完成!\n\n执行的操作:\n" + "\n".join(operations))
+
+    def profile_large_files(self):
+        """不加载到内存，单遍流式生成一个或多个文件的近似数据概况"""
+        input_files = list(filedialog.askopenfilenames(
+            title="选择要分析的数据文件 (多个文件合并统计)",
+            filetypes=[("数据文件", "*.csv *.xlsx *.xls *.json *.jsonl *.ndjson *.gz *.zst"),
+                       ("CSV文件", "*.csv")]
+        ))
+        if not input_files:
+            return
+        try:
+            chunksize = max(int(self.chunk_size.get()), 1)
+        except (tk.TclError, ValueError):
+            chunksize = DEFAULT_CHUNK_SIZE
+        try:
+            encoding = self.get_encoding_override()
+        except LookupError as e:
+            messagebox.showerror("分析错误", f"流式分析失败:\n{str(e)}")
+            return
+        self.submit_job("流式分析", self._profile_job, input_files, chunksize, encoding, group=None,
+                        on_success=lambda text: self._show_profile_report(input_files, text),
+                        error_title="分析错误")
+
+    def _profile_job(self, job, input_files, chunksize, encoding):
+        """(后台任务) 生成近似概况"""
+        profiler = profile_files(input_files, chunksize, encoding, progress_callback=job.progress)
+        return profiler.report_text()
+
+    def _show_profile_report(self, input_files, report_text):
+        """显示近似概况窗口"""
+        self.status_var.set(f"✅ 流式分析完成 - {len(input_files)} 个文件")
+
+        report_window = tk.Toplevel(self.root)
+        report_window.title("近似数据概况 - " + ", ".join(Path(path).name for path in input_files))
+        report_window.geometry("600x450")
+
+        text_widget = scrolledtext.ScrolledText(report_window, font=('Consolas', 9))
+        text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        text_widget.insert(1.0, report_text)
+        text_widget.config(state=tk.DISABLED)
+
     def save_data(self):
-        """保存清洗结果"""
-        if self.df_current is None:
+        """保存清洗结果 (排在尚未完成的加载/清洗任务之后执行)"""
+        if self.df_current is None and not self.has_data_jobs():
             messagebox.showwarning("警告", "没有数据可保存!")
             return
             
         filetypes = [
             ("CSV文件", "*.csv"),
             ("Excel文件", "*.xlsx"),
-            ("JSON文件", "*.json")
+            ("JSON文件", "*.json"),
+            ("JSON Lines文件", "*.jsonl"),
+            ("JSON Lines (gzip)", "*.jsonl.gz"),
+            ("CSV (gzip压缩)", "*.csv.gz"),
+            ("CSV (zstd压缩)", "*.csv.zst"),
+            ("Parquet", "*.parquet"),
+            ("Feather / Arrow IPC", "*.feather;*.arrow")
         ]
         
         filename = filedialog.asksaveasfilename(
@@ -536,23 +1261,72 @@ class DataCleanPro:
             defaultextension=".csv"
         )
         
-        if filename:
-            try:
-                file_path = Path(filename)
-                file_ext = file_path.suffix.lower()
-                
-                if file_ext == '.csv':
-                    self.df_current.to_csv(filename, index=False, encoding='utf-8-sig')
-                elif file_ext == '.xlsx':
-                    self.df_current.to_excel(filename, index=False)
-                elif file_ext == '.json':
-                    self.df_current.to_json(filename, orient='records', force_ascii=False, indent=2)
-                    
-                messagebox.showinfo("保存成功", f"数据已保存到:\n{filename}")
-                self.status_var.set("✅ 数据保存成功")
+        if not filename:
+            return
+        if self.is_sampled():
+            plan = self.sample_plan()
+            steps = "\n".join(plan.describe()) if plan.steps else "(未执行清洗，原样转换格式)"
+            choice = messagebox.askyesnocancel(
+                "保存抽样数据",
+                f"当前数据是 {Path(self.sample_info['file_path']).name} 的样本。\n\n"
+                f"是: 对完整文件执行已应用的清洗步骤后保存 (统计量按完整文件重新计算):\n{steps}\n\n"
+                "否: 只保存当前样本")
+            if choice is None:
+                return
+            if choice:
+                try:
+                    chunksize = max(int(self.chunk_size.get()), 1)
+                except (tk.TclError, ValueError):
+                    chunksize = DEFAULT_CHUNK_SIZE
+                self.submit_job("保存数据(完整文件)", self._save_full_file_job, filename, plan,
+                                dict(self.sample_info), chunksize, self.csv_engine.get(),
+                                on_success=self._update_ui_after_save, error_title="保存错误")
+                return
+        self.submit_job("保存数据", self._save_data_job, filename,
+                        on_success=self._update_ui_after_save, error_title="保存错误")
+
+    def sample_plan(self):
+        """在样本上已应用 (未撤销) 的各次清洗合并成的计划"""
+        applied = self.sample_plans[:self.history.position] if self.history is not None else []
+        return CleaningPlan([step for plan in applied for step in plan.steps])
+
+    def _save_full_file_job(self, job, filename, plan, sample_info, chunksize, engine=None):
+        """(后台任务) 对完整文件执行在样本上选定的清洗计划并写出
+
+        计划可转换为流式清洗选项且输入输出格式支持时分块流式清洗，否则整表加载后清洗。
+        """
+        source, encoding, sheet = sample_info['file_path'], sample_info['encoding'], sample_info['sheet']
+        try:
+            config = plan.to_config()
+        except ValueError:
+            config = None
+        if config is not None and plan.streamable and can_stream(source) \
+                and not isinstance(sheet, list) and sheet != SHEETS_ALL \
+                and file_format(filename) in ['.csv'] + JSON_LINES_EXTENSIONS:
+            cleaner = ChunkedCleaner.from_config(config, chunksize=chunksize, encoding=encoding,
+                                                 progress_callback=job.progress, sheet=sheet)
+            cleaner.run(source, filename)
+            return filename
+        df, _ = read_data_file(source, encoding, progress_callback=lambda percent, **kw:
+                               job.progress(percent * 0.4, **kw), sheet=sheet, engine=engine)
+        df, _, _ = clean_dataframe(df, plan, progress_callback=lambda percent, **kw:
+                                   job.progress(40 + percent * 0.2, **kw))
+        job.check()
+        write_data_file(df, filename, progress_callback=lambda percent, **kw:
+                        job.progress(60 + percent * 0.4, **kw))
+        return filename
                 
-            except Exception as e:
-                messagebox.showerror("保存错误", f"保存文件失败:\n{str(e)}")
+    def _save_data_job(self, job, filename):
+        """(后台任务) 写出当前数据，分段写入并可取消"""
+        if self.df_current is None:
+            raise ValueError("没有数据可保存")
+        write_data_file(self.df_current, filename, progress_callback=job.progress)
+        return filename
+
+    def _update_ui_after_save(self, filename):
+        """保存完成后更新UI"""
+        messagebox.showinfo("保存成功", f"数据已保存到:\n{filename}")
+        self.status_var.set("✅ 数据保存成功")
                 
     def show_data_overview(self):
         """显示数据概览"""
@@ -571,45 +1345,9 @@ class DataCleanPro:
         report_window.title("数据质量报告")
         report_window.geometry("500x400")
         
-        df = self.df_current
-        
-        report_text = "=== 数据质量评估报告 ===\n\n"
-        
-        # 完整性评分
-        total_cells = len(df) * len(df.columns)
-        missing_cells = df.isnull().sum().sum()
-        completeness = (1 - missing_cells / total_cells) * 100
-        report_text += f"数据完整性: {completeness:.1f}%\n"
-        
-        # 一致性评分
-        duplicate_rate = df.duplicated().sum() / len(df) * 100
-        consistency = 100 - duplicate_rate
-        report_text += f"数据一致性: {consistency:.1f}%\n"
-        
-        report_text += f"\n总体质量评分: {(completeness + consistency) / 2:.1f}%\n\n"
-        
-        report_text += "=== 详细分析 ===\n\n"
-        
-        # 各列质量分析
-        report_text += "各列质量分析:\n"
-        for col in df.columns:
-            missing_rate = df[col].isnull().sum() / len(df) * 100
-            quality_score = 100 - missing_rate
-            report_text += f"  {col}: {quality_score:.1f}%"
-            if missing_rate > 0:
-                report_text += f" (缺失{missing_rate:.1f}%)"
-            report_text += "\n"
-            
-        # 建议
-        report_text += "\n=== 清洗建议 ===\n"
-        
-        if missing_cells > 0:
-            high_missing_cols = df.columns[df.isnull().sum() / len(df) > 0.5]
-            if len(high_missing_cols) > 0:
-                report_text += f"• 建议删除缺失值超过50%的列: {list(high_missing_cols)}\n"
-                
-        if df.duplicated().sum() > 0:
-            report_text += f"• 发现 {df.duplicated().sum()} 行重复数据，建议删除\n"
+        report_text = quality_report_text(self.get_profile())
+        if self.is_sampled():
+            report_text = "⚠ 抽样估计: " + sample_note_text(self.sample_info) + "\n" + report_text
         
         text_widget = scrolledtext.ScrolledText(report_window, font=('Consolas', 9))
         text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -617,34 +1355,82 @@ class DataCleanPro:
         text_widget.config(state=tk.DISABLED)
         
     def show_cleaning_history(self):
-        """显示清洗历史"""
-        if not self.cleaning_history:
+        """显示清洗历史和各任务的阶段耗时/内存"""
+        has_history = self.history is not None and self.history.entries()
+        if not has_history and not self.stage_traces:
             messagebox.showinfo("历史记录", "暂无清洗历史记录")
             return
             
         history_window = tk.Toplevel(self.root)
         history_window.title("清洗历史记录")
-        history_window.geometry("400x300")
+        history_window.geometry("640x420")
         
         history_text = "=== 数据清洗历史记录 ===\n\n"
-        history_text += f"原始数据: {self.df_original.shape[0]}行 × {self.df_original.shape[1]}列\n"
-        history_text += f"当前数据: {self.df_current.shape[0]}行 × {self.df_current.shape[1]}列\n\n"
-        
-        history_text += "执行的操作:\n"
-        for i, operation in enumerate(self.cleaning_history, 1):
-            history_text += f"{i}. {operation}\n"
+        if has_history:
+            history_text += f"原始数据: {self.df_original.shape[0]}行 × {self.df_original.shape[1]}列\n"
+            history_text += f"当前数据: {self.df_current.shape[0]}行 × {self.df_current.shape[1]}列\n"
+            history_text += (f"历史增量: {self.history.memory_bytes / 1024 / 1024:.1f} MB"
+                             f" (已溢写 {self.history.spilled_steps} 步)\n\n")
+
+            history_text += "执行的操作:\n"
+            for i, (operations, applied) in enumerate(self.history.entries(), 1):
+                suffix = "" if applied else " (已撤销)"
+                for operation in operations or ["无操作"]:
+                    history_text += f"{i}. {operation}{suffix}\n"
+
+        traces = list(self.stage_traces)
+        if traces:
+            history_text += f"\n=== 阶段计量 (最近 {len(traces)} 个任务) ===\n"
+            for trace in reversed(traces):
+                history_text += "\n".join(trace.describe()) + "\n"
+            deep = [trace for trace in traces if trace.profile_text or trace.allocation_text]
+            if deep:
+                history_text += f"\n=== 深度剖析: {deep[-1].label} ===\n"
+                history_text += (deep[-1].profile_text or "") + "\n"
+                if deep[-1].allocation_text:
+                    history_text += "内存分配最多的位置 (tracemalloc):\n" + deep[-1].allocation_text + "\n"
+
+            export_frame = tk.Frame(history_window)
+            export_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+            tk.Button(export_frame, text="💾 导出计时 (JSON / Chrome Trace)", command=self.export_traces,
+                      font=('微软雅黑', 8)).pack(side=tk.LEFT)
             
         text_widget = scrolledtext.ScrolledText(history_window, font=('微软雅黑', 9))
         text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         text_widget.insert(1.0, history_text)
         text_widget.config(state=tk.DISABLED)
         
+    def export_traces(self):
+        """导出阶段计量记录 (*.trace.json 可在 chrome://tracing 或 Perfetto 中打开)"""
+        filename = filedialog.asksaveasfilename(title="导出阶段计时", filetypes=TRACE_FILE_TYPES,
+                                                defaultextension=".json")
+        if not filename:
+            return
+        try:
+            save_traces(list(self.stage_traces), filename)
+            self.status_var.set(f"✅ 计时已导出: {Path(filename).name}")
+        except Exception as e:
+            messagebox.showerror("导出错误", f"导出计时失败:\n{str(e)}")
+
     def run(self):
         """运行应用程序"""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.jobs.shutdown()
+
+
+def main(argv=None):
+    """主函数: 带参数时执行命令行批量清洗，否则启动图形界面"""
+    argv = sys.argv[1:] if argv is None else argv
+    startup_profile = None
+    if argv == ['--startup-profile']:
+        startup_profile = StartupProfile()
+        startup_profile.mark("app模块导入完成")
+        argv = []
+    if argv:
+        return run_cli(argv)
 
-def main():
-    """主函数"""
     try:
         print("🚀 启动 DataCleanPro - 数据清洗专家...")
         print("📊 版本: 2.1.2 (简化兼容版)")
@@ -653,7 +1439,7 @@ def main():
         print("🔧 兼容性: 支持所有tkinter版本")
         print("-" * 50)
         
-        app = DataCleanPro()
+        app = DataCleanPro(startup_profile)
         app.run()
     except Exception as e:
         print(f"❌ 应用程序启动失败: {e}")
@@ -664,4 +1450,4 @@ def main():
         input("\n按回车键退出...")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DataCleanPro 性能基准
+生成可控脏数据(缺失率/重复率/异常值率/列数/类型组合)，逐阶段计时并记录峰值内存，结果输出为JSON便于跨提交比较
+
+用法:
+    python benchmark.py --rows 1e4 1e5 1e6 -o results.json
+    python benchmark.py --rows 1e5 --compare baseline.json     # 出现性能回退时退出码为1
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from datacleanpro.dataprofile import DataProfile, quality_report_text
+from datacleanpro.fileio import (DEFAULT_CHUNK_SIZE, read_data_file, read_data_sample, resolve_csv_engine,
+                                 write_data_file)
+from datacleanpro.plan import DUPLICATE_ACTIONS, MISSING_ACTIONS, OUTLIER_ACTIONS, clean_dataframe
+from datacleanpro.streaming import ChunkedCleaner, profile_files
+from datacleanpro.tracing import peak_rss_mb, reset_peak_rss, rss_mb
+
+# ==================== 脏数据生成 ====================
+
+DTYPE_KINDS = ['int', 'float', 'str', 'category', 'datetime', 'bool']
+
+DEFAULT_DATASET_SPEC = {
+    'columns': 8,
+    'null_rate': 0.05,       # 每个单元格为缺失值的概率
+    'duplicate_rate': 0.05,  # 与之前某行完全相同的行占比
+    'outlier_rate': 0.01,    # 数值单元格为离群值的概率
+    'dtypes': ['int', 'float', 'str', 'category', 'datetime'],  # 各列按顺序循环使用
+    'seed': 0,
+}
+
+GENERATE_CHUNK_ROWS = 500_000
+CATEGORY_LEVELS = ["北京", "上海", "广州", "深圳", "杭州", "成都", "武汉", "西安"]
+
+
+def dataset_columns(spec):
+    """按类型组合循环分配列，返回 [(列名, 类型)]"""
+    kinds = spec['dtypes']
+    for kind in kinds:
+        if kind not in DTYPE_KINDS:
+            raise ValueError(f"未知列类型: {kind} (可选: {', '.join(DTYPE_KINDS)})")
+    return [(f"{kinds[i % len(kinds)]}_{i}", kinds[i % len(kinds)]) for i in range(spec['columns'])]
+
+
+def generate_chunk(rows, spec, seed, first_row=0):
+    """生成一块脏数据: 先生成干净列，再注入离群值、缺失值和块内重复行"""
+    rng = np.random.default_rng(seed)
+    # 随机选择重复行，复制为其之前某一行的内容
+    n_duplicates = min(int(rows * spec['duplicate_rate']), max(rows - 1, 0))
+    targets = np.sort(rng.choice(np.arange(1, max(rows, 2)), n_duplicates, replace=False))
+    sources = (rng.random(len(targets)) * targets).astype(np.int64)
+    data = {}
+    for name, kind in dataset_columns(spec):
+        if kind == 'int':
+            values = rng.integers(0, 1000, rows).astype(float)
+        elif kind == 'float':
+            values = rng.normal(100.0, 15.0, rows)
+        elif kind == 'str':
+            values = pd.Series(rng.integers(0, max(rows, 1), rows) + first_row).map("user_{:d}".format)
+        elif kind == 'category':
+            levels = np.asarray(CATEGORY_LEVELS, dtype=object)
+            values = pd.Series(levels[rng.integers(0, len(levels), rows)])
+        elif kind == 'datetime':
+            seconds = pd.to_timedelta(rng.integers(0, 365 * 86400, rows), unit='s')
+            values = pd.Series(pd.Timestamp('2024-01-01') + seconds)
+        else:
+            values = pd.Series(rng.random(rows) < 0.5)
+
+        if kind in ('int', 'float') and spec['outlier_rate'] > 0:
+            outliers = rng.random(rows) < spec['outlier_rate']
+            values[outliers] = values[outliers] * rng.choice([-50.0, 50.0], int(outliers.sum()))
+        if kind == 'int' and spec['null_rate'] == 0:
+            values = values.astype(np.int64)
+        values = pd.Series(values)
+        if spec['null_rate'] > 0:
+            values = values.mask(rng.random(rows) < spec['null_rate'])
+        values = values.to_numpy(copy=True)
+        values[targets] = values[sources]
+        data[name] = values
+    return pd.DataFrame(data)
+
+
+def iter_dirty_chunks(rows, spec=None, chunk_rows=GENERATE_CHUNK_ROWS):
+    """按块生成共rows行脏数据 (每块使用独立种子，结果与块大小无关的只有统计特性)"""
+    spec = {**DEFAULT_DATASET_SPEC, **(spec or {})}
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        yield generate_chunk(min(chunk_rows, rows - start), spec, (spec['seed'], index), start)
+
+
+def generate_dirty_data(rows, spec=None):
+    """在内存中生成rows行脏数据"""
+    chunks = list(iter_dirty_chunks(rows, spec))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+def write_dirty_csv(path, rows, spec=None, chunk_rows=GENERATE_CHUNK_ROWS):
+    """按块生成并写入CSV，内存占用与行数无关 (用于1e7以上的规模)"""
+    with open(path, 'w', encoding='utf-8', newline='') as out:
+        for index, chunk in enumerate(iter_dirty_chunks(rows, spec, chunk_rows)):
+            chunk.to_csv(out, index=False, header=index == 0)
+    return path
+
+
+# ==================== 峰值内存 ====================
+
+class PeakMemory:
+    """测量一个阶段内的进程峰值RSS (MB)
+
+    Linux: 阶段开始前重置VmHWM，结束后读取，结果精确；
+    其他平台: 能获取RSS时(如安装了psutil)后台线程按间隔采样，否则返回None。
+    """
+
+    SAMPLE_INTERVAL = 0.01
+
+    def __init__(self):
+        self.start_mb = self.peak_mb = None
+        self.method = None
+
+    def __enter__(self):
+        self.start_mb = rss_mb()
+        if self.start_mb is None:
+            return self
+        if reset_peak_rss():
+            self.method = 'vmhwm'
+            return self
+        self.method = 'sampled'
+        self.peak_mb = self.start_mb
+        self._stop = threading.Event()
+
+        def sample():
+            while not self._stop.wait(self.SAMPLE_INTERVAL):
+                self.peak_mb = max(self.peak_mb, rss_mb())
+
+        self._thread = threading.Thread(target=sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.method == 'vmhwm':
+            self.peak_mb = peak_rss_mb()
+        elif self.method == 'sampled':
+            self._stop.set()
+            self._thread.join()
+        return False
+
+    @property
+    def delta_mb(self):
+        if self.peak_mb is None:
+            return None
+        return self.peak_mb - self.start_mb
+
+
+# ==================== 阶段计时 ====================
+
+FORMAT_MAX_ROWS = {'csv': None, 'csv.gz': None, 'csv.zst': None, 'xlsx': 200_000, 'json': 2_000_000,
+                   'jsonl': None, 'jsonl.gz': None, 'parquet': None, 'feather': None,
+                   'arrow': None}  # 超过后跳过该格式的读写
+IN_MEMORY_MAX_ROWS = 5_000_000  # 超过后只运行流式阶段
+
+FULL_CLEANING_CONFIG = {
+    'missing_action': "中位数填充",
+    'duplicate_action': "删除重复行",
+    'outlier_action': "IQR方法",
+}
+
+
+def _rows_of(result):
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    return len(result) if isinstance(result, pd.DataFrame) else None
+
+
+def measure(stage, func, *args, rows_in=None, repeat=1):
+    """运行一个阶段repeat次，返回 (记录, 最后一次的结果)；耗时取最小值，峰值内存取最大值"""
+    record = {'stage': stage, 'status': 'ok', 'rows_in': rows_in}
+    walls, cpus, peaks, deltas = [], [], [], []
+    result = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        with PeakMemory() as memory:
+            wall, cpu = time.perf_counter(), time.process_time()
+            result = func(*args)
+            walls.append(time.perf_counter() - wall)
+            cpus.append(time.process_time() - cpu)
+        peaks.append(memory.peak_mb)
+        deltas.append(memory.delta_mb)
+    record['wall_seconds'] = round(min(walls), 6)
+    record['cpu_seconds'] = round(min(cpus), 6)
+    record['peak_rss_mb'] = None if peaks[0] is None else round(max(peaks), 2)
+    record['peak_delta_mb'] = None if deltas[0] is None else round(max(deltas), 2)
+    record['rows_out'] = _rows_of(result)
+    if rows_in and record['wall_seconds'] > 0:
+        record['rows_per_second'] = round(rows_in / record['wall_seconds'])
+    return record, result
+
+
+def skipped(stage, reason):
+    return {'stage': stage, 'status': 'skipped', 'note': reason}
+
+
+def run_size(rows, spec, workdir, formats, chunksize=DEFAULT_CHUNK_SIZE,
+             in_memory_max_rows=IN_MEMORY_MAX_ROWS, repeat=1, log=print):
+    """对一个规模运行全部阶段，返回阶段记录列表"""
+    records = []
+
+    def add(record):
+        records.append(record)
+        if record['status'] == 'ok':
+            peak = f"{record['peak_delta_mb']:+.1f} MB" if record['peak_delta_mb'] is not None else "-"
+            log(f"  {record['stage']:<28} {record['wall_seconds']:>9.3f}s  峰值内存 {peak}")
+        else:
+            log(f"  {record['stage']:<28} 跳过: {record['note']}")
+
+    csv_path = Path(workdir) / f"dirty_{rows}.csv"
+    record, _ = measure('generate.csv', write_dirty_csv, csv_path, rows, spec, rows_in=rows)
+    record['bytes'] = csv_path.stat().st_size
+    add(record)
+
+    if rows <= in_memory_max_rows:
+        record, (df, _) = measure('load.csv', read_data_file, csv_path, rows_in=rows, repeat=repeat)
+        record['memory_mb'] = round(df.memory_usage(deep=True).sum() / 1024 / 1024, 2)
+        add(record)
+
+        record, _ = measure('stats', lambda: DataProfile(df).warm(), rows_in=rows, repeat=repeat)
+        add(record)
+        record, _ = measure('quality_report', lambda: quality_report_text(DataProfile(df)),
+                            rows_in=rows, repeat=repeat)
+        add(record)
+
+        for key, actions in (('missing_action', MISSING_ACTIONS), ('duplicate_action', DUPLICATE_ACTIONS),
+                             ('outlier_action', OUTLIER_ACTIONS)):
+            for action in actions[1:]:
+                record, _ = measure(f"clean.{key.split('_')[0]}.{action}", clean_dataframe, df,
+                                    {key: action}, rows_in=rows, repeat=repeat)
+                add(record)
+        record, _ = measure('clean.full', clean_dataframe, df, FULL_CLEANING_CONFIG,
+                            rows_in=rows, repeat=repeat)
+        add(record)
+
+        if resolve_csv_engine('pyarrow') == 'pyarrow':
+            record, (arrow_df, _) = measure('load.csv.pyarrow',
+                                            lambda: read_data_file(csv_path, engine='pyarrow'),
+                                            rows_in=rows, repeat=repeat)
+            record['memory_mb'] = round(arrow_df.memory_usage(deep=True).sum() / 1024 / 1024, 2)
+            add(record)
+            record, _ = measure('clean.full.pyarrow', clean_dataframe, arrow_df, FULL_CLEANING_CONFIG,
+                                rows_in=rows, repeat=repeat)
+            add(record)
+            del arrow_df
+        else:
+            add(skipped('load.csv.pyarrow', "未安装pyarrow"))
+
+        for fmt in formats:
+            limit = FORMAT_MAX_ROWS[fmt]
+            if limit is not None and rows > limit:
+                add(skipped(f"save.{fmt}", f"超过 {limit:,} 行"))
+                add(skipped(f"load.{fmt}", f"超过 {limit:,} 行"))
+                continue
+            out_path = Path(workdir) / f"saved_{rows}.{fmt}"
+            record, _ = measure(f"save.{fmt}", write_data_file, df, out_path, rows_in=rows, repeat=repeat)
+            record['bytes'] = out_path.stat().st_size
+            add(record)
+            if fmt != 'csv':
+                record, _ = measure(f"load.{fmt}", read_data_file, out_path, rows_in=rows, repeat=repeat)
+                add(record)
+            out_path.unlink()
+        del df
+    else:
+        add(skipped('load.csv', f"超过整表加载上限 {in_memory_max_rows:,} 行，仅运行流式阶段"))
+
+    stream_path = Path(workdir) / f"stream_{rows}.csv"
+    record, _ = measure('stream.clean',
+                        lambda: ChunkedCleaner.from_config(FULL_CLEANING_CONFIG, chunksize=chunksize)
+                        .run(csv_path, stream_path), rows_in=rows, repeat=repeat)
+    add(record)
+    stream_path.unlink(missing_ok=True)
+    record, _ = measure('stream.profile', profile_files, csv_path, chunksize, rows_in=rows, repeat=repeat)
+    add(record)
+    for method in ['head', 'reservoir']:
+        record, _ = measure(f"load.sample.{method}", lambda: read_data_sample(csv_path, method=method, seed=0),
+                            rows_in=rows, repeat=repeat)
+        add(record)
+    csv_path.unlink()
+    return records
+
+
+# ==================== 结果比较 ====================
+
+REGRESSION_THRESHOLD = 1.2  # 耗时/峰值内存超过基线的倍数视为回退
+MIN_COMPARE_SECONDS = 0.05  # 基线耗时低于此值的阶段噪声太大，不参与耗时比较
+MIN_COMPARE_MB = 16
+
+
+def environment_info():
+    """记录运行环境，便于比较不同提交/机器上的结果"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare_results(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """按 (行数, 阶段) 对比两次结果，返回 [(行数, 阶段, 指标, 基线, 当前, 倍数)] 中超过阈值的项"""
+    def index(results):
+        return {(run['rows'], stage['stage']): stage for run in results['runs']
+                for stage in run['stages'] if stage['status'] == 'ok'}
+
+    old, new = index(baseline), index(current)
+    regressions = []
+    for key in sorted(old.keys() & new.keys()):
+        for metric, minimum in (('wall_seconds', MIN_COMPARE_SECONDS), ('peak_delta_mb', MIN_COMPARE_MB)):
+            before, after = old[key].get(metric), new[key].get(metric)
+            if before is None or after is None or max(before, after) < minimum:
+                continue
+            ratio = after / max(before, 1e-9)
+            if ratio > threshold:
+                regressions.append((*key, metric, before, after, ratio))
+    return regressions
+
+
+# ==================== 命令行 ====================
+
+def parse_rows(value):
+    """支持 1e6 / 1000000 / 1_000_000 写法"""
+    rows = int(float(value.replace('_', '')))
+    if rows <= 0:
+        raise argparse.ArgumentTypeError("行数必须为正整数")
+    return rows
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog="benchmark.py", description="DataCleanPro 性能基准")
+    parser.add_argument('--rows', type=parse_rows, nargs='+', default=[10_000, 100_000],
+                        help="数据规模 (行数，可多个，如 1e4 1e6 1e8)")
+    parser.add_argument('--columns', type=int, default=DEFAULT_DATASET_SPEC['columns'], help="列数")
+    parser.add_argument('--null-rate', type=float, default=DEFAULT_DATASET_SPEC['null_rate'], help="缺失率")
+    parser.add_argument('--duplicate-rate', type=float, default=DEFAULT_DATASET_SPEC['duplicate_rate'],
+                        help="重复行比例")
+    parser.add_argument('--outlier-rate', type=float, default=DEFAULT_DATASET_SPEC['outlier_rate'],
+                        help="数值单元格离群值比例")
+    parser.add_argument('--dtypes', default=",".join(DEFAULT_DATASET_SPEC['dtypes']),
+                        help=f"列类型组合，逗号分隔，各列循环使用 (可选: {','.join(DTYPE_KINDS)})")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--formats', default="csv,xlsx,json,jsonl",
+                        help="测试读写的文件格式 (xlsx超过20万行、json超过200万行时跳过)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNK_SIZE, help="流式阶段的分块行数")
+    parser.add_argument('--in-memory-max-rows', type=parse_rows, default=IN_MEMORY_MAX_ROWS,
+                        help="超过此行数时跳过整表加载的阶段，只运行流式阶段")
+    parser.add_argument('--repeat', type=int, default=1, help="每个阶段重复次数 (耗时取最小值)")
+    parser.add_argument('--workdir', help="生成数据的临时目录 (默认系统临时目录)")
+    parser.add_argument('-o', '--output', default="benchmark_results.json", help="结果JSON文件")
+    parser.add_argument('--compare', help="与基线结果JSON比较，出现回退时退出码为1")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f"回退判定倍数 (默认 {REGRESSION_THRESHOLD})")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    spec = {
+        'columns': args.columns,
+        'null_rate': args.null_rate,
+        'duplicate_rate': args.duplicate_rate,
+        'outlier_rate': args.outlier_rate,
+        'dtypes': [kind.strip() for kind in args.dtypes.split(',') if kind.strip()],
+        'seed': args.seed,
+    }
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    for fmt in formats:
+        if fmt not in FORMAT_MAX_ROWS:
+            print(f"❌ 不支持的格式: {fmt}")
+            return 2
+    dataset_columns(spec)  # 提前校验类型组合
+
+    results = {'environment': environment_info(), 'dataset': spec,
+               'settings': {'formats': formats, 'chunksize': args.chunksize, 'repeat': args.repeat,
+                            'in_memory_max_rows': args.in_memory_max_rows},
+               'runs': []}
+    workdir = tempfile.mkdtemp(prefix="datacleanpro_bench_", dir=args.workdir)
+    try:
+        for rows in args.rows:
+            print(f"📊 {rows:,} 行 × {args.columns} 列")
+            stages = run_size(rows, spec, workdir, formats, args.chunksize, args.in_memory_max_rows,
+                              args.repeat)
+            results['runs'].append({'rows': rows, 'stages': stages})
+            # 每个规模完成后立即写出，长时间运行中断时保留已有结果
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"💾 结果已保存: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        print(f"\n与基线比较 ({args.compare}, 提交 {baseline['environment'].get('commit')}):")
+        for rows, stage, metric, before, after, ratio in regressions:
+            print(f"  ⚠️ {rows:,} 行 {stage} {metric}: {before:.3f} → {after:.3f} (×{ratio:.2f})")
+        if regressions:
+            return 1
+        print("  ✅ 无性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
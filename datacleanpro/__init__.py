@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""DataCleanPro数据清洗引擎
+
+各子模块不依赖图形界面，可单独导入 (命令行、基准和测试使用)；pandas/numpy在首次使用时才导入 (见lazy)。
+"""
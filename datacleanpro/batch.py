@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""批量清洗: 在进程池中清洗或概况多个文件"""
+
+import time
+from pathlib import Path
+import json
+import glob
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+
+from .tracing import StageTrace
+from .formats import JSON_LINES_EXTENSIONS, file_format, split_data_suffix
+from .excel import SHEETS_ALL
+from .fileio import DEFAULT_CHUNK_SIZE, SUPPORTED_EXTENSIONS, can_stream, read_data_file, write_data_file
+from .memory import optimize_dtypes
+from .cache import LoadCache
+from .executors import get_column_executor, get_row_executor, set_column_workers, set_row_workers
+from .sketches import SKETCH_RELATIVE_ERROR
+from .plan import CleaningPlan, clean_dataframe
+from .streaming import ChunkedCleaner, IncrementalCleaner, StreamProfiler, profile_files
+
+
+BATCH_SUMMARY_FILE = "batch_summary.json"
+PROFILE_SUMMARY_FILE = "profile_summary.json"
+
+
+def collect_input_files(patterns, recursive=False):
+    """展开目录、通配符和文件路径，返回支持格式的文件列表 (去重并保持顺序)"""
+    files = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = sorted(path.rglob('*') if recursive else path.glob('*'))
+        elif any(ch in pattern for ch in '*?['):
+            candidates = sorted(Path(p) for p in glob.glob(pattern, recursive=recursive))
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            if candidate.is_file() and file_format(candidate) in SUPPORTED_EXTENSIONS:
+                files.append(candidate.resolve())
+    return list(dict.fromkeys(files))
+
+
+def batch_output_paths(input_files, output_dir, output_format=None, tag="_cleaned"):
+    """为每个输入文件生成输出路径 <文件名><tag><扩展名>，重名时追加序号"""
+    output_dir = Path(output_dir)
+    used = set()
+    outputs = []
+    for input_path in input_files:
+        stem, suffix = split_data_suffix(input_path)
+        suffix = output_format or suffix
+        if suffix == '.xls':
+            suffix = '.xlsx'
+        name = f"{stem}{tag}{suffix}"
+        index = 1
+        while name in used:
+            index += 1
+            name = f"{stem}{tag}_{index}{suffix}"
+        used.add(name)
+        outputs.append(output_dir / name)
+    return outputs
+
+
+def configure_workers(column_workers=None, column_processes=None, row_workers=None, row_processes=None):
+    """按命令行选项重新配置本进程的列并行和行分片执行器 (未指定的项保持当前设置)"""
+    if column_workers or column_processes is not None:
+        set_column_workers(column_workers or get_column_executor().workers, column_processes)
+    if row_workers or row_processes is not None:
+        set_row_workers(row_workers or get_row_executor().workers, row_processes)
+
+
+def clean_file(input_path, output_path, config, encoding=None, chunksize=None, use_cache=False,
+               optimize_memory=False, column_workers=None, sketch_error=None, deep_profile=False,
+               sheet=None, write_options=None, engine=None, incremental=False,
+               column_processes=None, row_workers=None, row_processes=None):
+    """清洗单个文件并写出结果 (批量模式的工作进程入口)，返回该文件的汇总信息 (含阶段计量)
+
+    incremental=True时只清洗输入文件上次运行后追加的行并追加到输出文件 (见IncrementalCleaner)。
+    column_workers/column_processes/row_workers/row_processes为None时沿用本进程的执行器设置。
+    """
+    start = time.perf_counter()
+    configure_workers(column_workers, column_processes, row_workers, row_processes)
+    column_executor, row_executor = get_column_executor(), get_row_executor()
+    summary = {'input': str(input_path), 'output': str(output_path), 'status': 'ok',
+               'workers': {'column': column_executor.workers, 'column_processes': column_executor.processes,
+                           'row': row_executor.workers, 'row_processes': row_executor.processes}}
+    trace = StageTrace(Path(input_path).name, deep=deep_profile)
+    try:
+        with trace:
+            plan = CleaningPlan.coerce(config)
+            if incremental:
+                cleaner = IncrementalCleaner.from_config(plan.to_config(),
+                                                         chunksize=chunksize or DEFAULT_CHUNK_SIZE,
+                                                         encoding=encoding, sketch_error=sketch_error)
+                operations = cleaner.run(input_path, output_path)
+                summary.update(rows_in=cleaner.rows_in, columns_in=len(cleaner.columns or []),
+                               rows_out=cleaner.rows_out, columns_out=len(cleaner.columns_out or []),
+                               rows_total=cleaner.rows_total, full_run=cleaner.full_reason is not None)
+            elif chunksize and can_stream(input_path) and not isinstance(sheet, list) \
+                    and sheet != SHEETS_ALL and plan.streamable \
+                    and file_format(output_path) in ['.csv'] + JSON_LINES_EXTENSIONS:
+                cleaner = ChunkedCleaner.from_config(plan.to_config(),
+                                                     chunksize=chunksize, encoding=encoding,
+                                                     sketch_error=sketch_error, sheet=sheet)
+                operations = cleaner.run(input_path, output_path)
+                summary.update(rows_in=cleaner.rows_in, columns_in=len(cleaner.columns or []),
+                               rows_out=cleaner.rows_out, columns_out=len(cleaner.columns_out or []))
+            else:
+                df, info = read_data_file(input_path, encoding, LoadCache() if use_cache else None,
+                                          sheet=sheet, engine=engine)
+                summary.update(rows_in=len(df), columns_in=len(df.columns), cache=info['cache'],
+                               engine=info['engine'])
+                if optimize_memory:
+                    df, report = optimize_dtypes(df)
+                    summary.update(memory_before=int(report['优化前字节'].sum()),
+                                   memory_after=int(report['优化后字节'].sum()))
+                df, operations, _ = clean_dataframe(df, plan)
+                write_data_file(df, output_path, options=write_options)
+                summary.update(rows_out=len(df), columns_out=len(df.columns))
+        summary['operations'] = operations
+    except Exception as e:
+        summary.update(status='error', error=str(e))
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    summary['trace'] = trace.to_dict()
+    return summary
+
+
+def run_batch(input_files, output_dir, config, workers=None, output_format=None,
+              encoding=None, chunksize=None, use_cache=False, optimize_memory=False,
+              sketch_error=None, deep_profile=False, sheet=None, write_options=None, engine=None,
+              incremental=False, log=print, column_workers=None, column_processes=None,
+              row_workers=None, row_processes=None):
+    """使用进程池并行清洗多个文件，返回按输入顺序排列的汇总列表
+
+    column_workers/row_workers为列并行和行分片的总线程数 (默认为本进程执行器的设置)，
+    多进程时每个进程分得 总数/进程数，避免线程数超过核数；column_processes/row_processes
+    原样传给各工作进程，为None时沿用各进程的默认设置。
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    output_paths = batch_output_paths(input_files, output_dir, output_format)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(input_files) or 1))
+    jobs = list(zip(input_files, output_paths))
+    summaries = [None] * len(jobs)
+
+    def report(done, summary):
+        name = Path(summary['input']).name
+        if summary['status'] == 'ok':
+            log(f"✅ [{done}/{len(jobs)}] {name}: {summary['rows_in']}→{summary['rows_out']} 行 "
+                f"({summary['seconds']:.2f}s)")
+        else:
+            log(f"❌ [{done}/{len(jobs)}] {name}: {summary['error']}")
+
+    if workers == 1:
+        for i, (input_path, output_path) in enumerate(jobs):
+            summaries[i] = clean_file(input_path, output_path, config, encoding, chunksize,
+                                      use_cache, optimize_memory, column_workers, sketch_error,
+                                      deep_profile, sheet, write_options, engine, incremental,
+                                      column_processes, row_workers, row_processes)
+            report(i + 1, summaries[i])
+        return summaries
+
+    column_workers = max(1, (column_workers or get_column_executor().workers) // workers)
+    row_workers = max(1, (row_workers or get_row_executor().workers) // workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(clean_file, input_path, output_path, config, encoding,
+                                   chunksize, use_cache, optimize_memory, column_workers,
+                                   sketch_error, deep_profile, sheet, write_options, engine,
+                                   incremental, column_processes, row_workers, row_processes): i
+                   for i, (input_path, output_path) in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            summaries[futures[future]] = future.result()
+            report(done, summaries[futures[future]])
+    return summaries
+
+
+def profile_file(input_path, output_path, chunksize=None, encoding=None,
+                 relative_error=SKETCH_RELATIVE_ERROR):
+    """流式分析单个文件并写出JSON概况，返回 (汇总信息, StreamProfiler) 以便合并"""
+    start = time.perf_counter()
+    summary = {'input': str(input_path), 'output': str(output_path), 'status': 'ok'}
+    profiler = None
+    try:
+        profiler = profile_files(input_path, chunksize or DEFAULT_CHUNK_SIZE, encoding, relative_error)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(profiler.summary(), f, ensure_ascii=False, indent=2)
+        summary['rows'] = profiler.rows
+    except Exception as e:
+        summary.update(status='error', error=str(e))
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    return summary, profiler
+
+
+def run_profile(input_files, output_dir, workers=None, chunksize=None, encoding=None,
+                relative_error=SKETCH_RELATIVE_ERROR, log=print):
+    """使用进程池并行分析多个文件，各进程的草图合并为总体概况，返回 (汇总列表, 合并后的概况)"""
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    output_paths = batch_output_paths(input_files, output_dir, '.json', tag="_profile")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(input_files) or 1))
+    summaries = [None] * len(input_files)
+    merged = StreamProfiler(relative_error)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(profile_file, input_path, output_path, chunksize, encoding,
+                                   relative_error): i
+                   for i, (input_path, output_path) in enumerate(zip(input_files, output_paths))}
+        for done, future in enumerate(as_completed(futures), 1):
+            summary, profiler = future.result()
+            summaries[futures[future]] = summary
+            name = Path(summary['input']).name
+            if profiler is None:
+                log(f"❌ [{done}/{len(input_files)}] {name}: {summary['error']}")
+                continue
+            merged.merge(profiler)
+            log(f"✅ [{done}/{len(input_files)}] {name}: {profiler.rows} 行 ({summary['seconds']:.2f}s)")
+    return summaries, merged
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""加载缓存: 解析结果以列式文件缓存，源文件未修改时直接载入"""
+
+from pathlib import Path
+import json
+import os
+import hashlib
+
+from .lazy import LazyModule, optional_module
+
+pd = LazyModule('pandas', 'pd', globals())
+
+# 可选依赖: pyarrow (列式缓存使用Feather格式，未安装时退回pickle；Parquet/Arrow输出和多线程CSV解析需要)
+feather = optional_module('pyarrow.feather', 'feather', globals())
+
+
+CACHE_DIR = Path(os.environ.get('DATACLEANPRO_CACHE_DIR',
+                                Path.home() / '.datacleanpro' / 'cache'))
+CACHE_MAX_BYTES = 5 * 1024 ** 3
+CACHE_SUFFIXES = ['.feather', '.pkl']
+
+
+class LoadCache:
+    """已解析数据的列式旁路缓存
+
+    以 文件路径+大小+修改时间+解析选项 为键，优先存为Feather(内存映射读取)，
+    无pyarrow或数据类型不受支持时存为pickle。超过容量上限时按最近使用时间(LRU)淘汰。
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key(self, file_path, options=None):
+        stat = os.stat(file_path)
+        payload = json.dumps({
+            'path': str(Path(file_path).resolve()),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'options': options or {},
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _entries(self):
+        if not self.cache_dir.is_dir():
+            return []
+        return [path for path in self.cache_dir.iterdir() if path.suffix in CACHE_SUFFIXES]
+
+    def get(self, file_path, options=None):
+        """命中时返回DataFrame并刷新使用时间，未命中返回None"""
+        key = self.key(file_path, options)
+        for suffix in CACHE_SUFFIXES:
+            path = self.cache_dir / f"{key}{suffix}"
+            if not path.exists():
+                continue
+            try:
+                if suffix == '.feather':
+                    if feather is None:
+                        continue
+                    table = feather.read_table(path, memory_map=True)
+                    # pyarrow引擎加载的数据恢复为Arrow类型
+                    df = table.to_pandas(types_mapper=pd.ArrowDtype
+                                         if (options or {}).get('engine') == 'pyarrow' else None)
+                else:
+                    df = pd.read_pickle(path)
+                os.utime(path)
+                return df
+            except Exception:
+                # 缓存文件损坏或被并发删除时视为未命中
+                path.unlink(missing_ok=True)
+        return None
+
+    def put(self, file_path, df, options=None):
+        """写入缓存 (先写临时文件再原子替换)，并按容量上限淘汰旧条目"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        key = self.key(file_path, options)
+        tmp_path = self.cache_dir / f"{key}.{os.getpid()}.tmp"
+        try:
+            try:
+                if feather is None:
+                    raise TypeError("pyarrow未安装")
+                feather.write_feather(df, tmp_path, compression='uncompressed')
+                suffix = '.feather'
+            except Exception:
+                pd.to_pickle(df, tmp_path)
+                suffix = '.pkl'
+            os.replace(tmp_path, self.cache_dir / f"{key}{suffix}")
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self.evict()
+
+    def evict(self):
+        """按最近使用时间淘汰，直到总大小不超过上限"""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def usage(self):
+        """返回 (条目数, 总字节数)"""
+        sizes = []
+        for path in self._entries():
+            try:
+                sizes.append(path.stat().st_size)
+            except FileNotFoundError:
+                continue
+        return len(sizes), sum(sizes)
+
+    def purge(self):
+        """清空缓存，返回 (删除条目数, 释放字节数)"""
+        count, size = self.usage()
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+        return count, size
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""命令行: 参数解析以及批量清洗/概况模式入口"""
+
+import time
+from pathlib import Path
+import json
+import argparse
+
+from .tracing import save_traces
+from .dedup import FINGERPRINT_BITS, NEAR_DUP_THRESHOLD, parse_column_list
+from .excel import parse_sheet
+from .fileio import (COLUMNAR_COMPRESSION, CSV_ENGINES, CSV_WRITE_WORKERS, DEFAULT_CSV_ENGINE,
+                     PARQUET_ROW_GROUP_ROWS, parse_column_compression)
+from .cache import CACHE_DIR, LoadCache
+from .executors import COLUMN_WORKERS, ROW_WORKERS
+from .outliers import OUTLIER_POLICIES
+from .sketches import SKETCH_RELATIVE_ERROR
+from .plan import CleaningPlan, DUPLICATE_ACTIONS, MISSING_ACTIONS, OUTLIER_ACTIONS
+from .streaming import INCREMENTAL_STATE_SUFFIX
+from .batch import BATCH_SUMMARY_FILE, PROFILE_SUMMARY_FILE, collect_input_files, run_batch, run_profile
+
+
+def build_arg_parser():
+    """命令行参数 (清洗选项取值与界面下拉框一致)"""
+    parser = argparse.ArgumentParser(
+        prog="app.py",
+        description="DataCleanPro 批量清洗: 不带参数运行时启动图形界面")
+    parser.add_argument('inputs', nargs='*', help="输入文件、目录或通配符 (如 'data/*.csv')")
+    parser.add_argument('-o', '--output-dir', help="输出目录")
+    parser.add_argument('--missing', choices=MISSING_ACTIONS, default="无操作", help="缺失值处理")
+    parser.add_argument('--duplicate', choices=DUPLICATE_ACTIONS, default="无操作", help="重复值处理")
+    parser.add_argument('--outlier', choices=OUTLIER_ACTIONS, default="无操作", help="异常值处理")
+    parser.add_argument('--outlier-policy', choices=OUTLIER_POLICIES, default=OUTLIER_POLICIES[0],
+                        help="异常值策略")
+    parser.add_argument('--keys', default="", help="去重键列，逗号分隔 (默认全部列)")
+    parser.add_argument('--keep', choices=['first', 'last', 'none'], default='first',
+                        help="重复行保留方式 (none=全部删除)")
+    parser.add_argument('--bits', type=int, choices=FINGERPRINT_BITS, default=64, help="去重指纹位数")
+    parser.add_argument('--similarity', type=float, default=NEAR_DUP_THRESHOLD,
+                        help=f"近似重复的相似度阈值 (0~1，默认 {NEAR_DUP_THRESHOLD})；键列规范化空白/大小写/全半角后比较")
+    parser.add_argument('--recipe', help="JSON清洗配方 (界面导出或 --save-recipe 生成)，指定后忽略以上清洗选项")
+    parser.add_argument('--save-recipe', help="将本次清洗选项保存为JSON配方")
+    parser.add_argument('--format', choices=['csv', 'csv.gz', 'csv.zst', 'xlsx', 'json', 'jsonl', 'jsonl.gz',
+                                             'jsonl.zst', 'parquet', 'feather', 'arrow'],
+                        help="输出格式 (默认与输入相同)")
+    parser.add_argument('--compression', default=COLUMNAR_COMPRESSION,
+                        help=f"Parquet/Arrow的压缩算法 (默认 {COLUMNAR_COMPRESSION}，none为不压缩)")
+    parser.add_argument('--column-compression',
+                        help="Parquet逐列压缩算法，如 \"备注=gzip,id=snappy\" (其余列使用--compression)")
+    parser.add_argument('--row-group-rows', type=int, default=PARQUET_ROW_GROUP_ROWS,
+                        help=f"Parquet每个行组的行数 (默认 {PARQUET_ROW_GROUP_ROWS})")
+    parser.add_argument('--write-workers', type=int, default=None,
+                        help=f"并行压缩CSV分片 (.csv.gz/.csv.zst等) 的线程数 (默认 {CSV_WRITE_WORKERS})")
+    parser.add_argument('--encoding', help="CSV编码 (默认自动检测)")
+    parser.add_argument('--engine', choices=CSV_ENGINES, default=None,
+                        help=f"整表加载CSV时的解析引擎 (默认 {DEFAULT_CSV_ENGINE}；pyarrow为多线程解析，"
+                             "列保持Arrow类型，未安装时退回pandas)")
+    parser.add_argument('--sheet', help="Excel工作表: 名称、逗号分隔的多个名称 (并行读取后合并) 或 * 表示全部"
+                                        " (默认第一个)")
+    parser.add_argument('--chunksize', type=int, help="CSV/JSON Lines/xlsx按块流式清洗的分块行数 (默认整表加载)")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"增量清洗: 只清洗CSV/JSON Lines输入上次运行后追加的行并追加到输出文件 "
+                             f"(状态保存在 输出文件{INCREMENTAL_STATE_SUFFIX} 目录，配置或输入被改写时自动全量清洗)")
+    parser.add_argument('--approx', action='store_true',
+                        help="流式清洗时中位数/IQR分位数改用KLL草图近似计算 (内存恒定，需配合--chunksize)")
+    parser.add_argument('--sketch-error', type=float, default=SKETCH_RELATIVE_ERROR,
+                        help=f"近似统计的误差参数 (默认 {SKETCH_RELATIVE_ERROR})")
+    parser.add_argument('--profile', action='store_true',
+                        help="不清洗，单遍流式生成各文件及合并后的近似数据概况 (JSON)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="并行进程数 (默认CPU核数)")
+    parser.add_argument('-r', '--recursive', action='store_true', help="递归搜索子目录")
+    parser.add_argument('--cache', action='store_true', help=f"使用加载缓存 ({CACHE_DIR})")
+    parser.add_argument('--purge-cache', action='store_true', help="清空加载缓存后退出")
+    parser.add_argument('--optimize-memory', action='store_true',
+                        help="加载后压缩内存 (数值列向下转换、低基数字符串列转为category)")
+    parser.add_argument('--column-workers', type=int,
+                        help=f"逐列统计(填充值/异常值边界)的并行线程数 (默认 {COLUMN_WORKERS})")
+    parser.add_argument('--column-processes', action='store_true',
+                        help="逐列统计改用进程池 + 共享内存 (适合数千列的宽表)")
+    parser.add_argument('--row-workers', type=int,
+                        help=f"长表按行分片填充缺失值/判定异常值的并行线程数 (默认 {ROW_WORKERS})。"
+                             "默认使用线程: NumPy的逐元素比较和替换会释放GIL，各分片直接读写原数组，不复制数据")
+    parser.add_argument('--row-processes', action='store_true',
+                        help="行分片改用进程池 + 共享内存: 输入列需先整列复制到共享内存、结果再复制回来，"
+                             "一般只在数千万行且线程明显受GIL限制时更快")
+    parser.add_argument('--trace', help="导出各文件的阶段计时 (*.trace.json 为Chrome Trace格式，其余为JSON)")
+    parser.add_argument('--deep-profile', action='store_true',
+                        help="对每个文件启用cProfile和tracemalloc (开销较大，结果写入计时和汇总文件)")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="单独使用: 启动图形界面，并在控制台报告各延迟模块的导入耗时和首次绘制时间")
+    return parser
+
+
+def run_cli(argv):
+    """命令行批量清洗入口，返回进程退出码"""
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.startup_profile:
+        parser.error("--startup-profile 只用于启动图形界面，不能与其他参数同时使用")
+    if args.purge_cache:
+        count, size = LoadCache().purge()
+        print(f"🗑 已清空加载缓存: {count} 个文件, {size / 1024 / 1024:.1f} MB")
+        return 0
+
+    if args.recipe:
+        try:
+            plan = CleaningPlan.load(args.recipe)
+        except (OSError, ValueError) as e:
+            print(f"❌ 无法读取配方 {args.recipe}: {e}")
+            return 2
+    else:
+        plan = CleaningPlan.from_config({
+            'missing_action': args.missing,
+            'duplicate_action': args.duplicate,
+            'outlier_action': args.outlier,
+            'outlier_policy': args.outlier_policy,
+            'dedup_subset': parse_column_list(args.keys),
+            'dedup_keep': False if args.keep == 'none' else args.keep,
+            'fingerprint_bits': args.bits,
+            'near_threshold': args.similarity,
+        })
+    if args.save_recipe:
+        plan.save(args.save_recipe)
+        print(f"💾 配方已保存: {args.save_recipe}")
+        if not args.inputs:
+            return 0
+    if not args.inputs or not args.output_dir:
+        parser.error("需要指定输入文件和输出目录 (-o/--output-dir)")
+
+    input_files = collect_input_files(args.inputs, args.recursive)
+    if not input_files:
+        print("❌ 未找到可处理的文件 (支持: CSV | Excel | JSON | JSON Lines | Parquet | Feather/Arrow)")
+        return 2
+    if not 0 < args.sketch_error < 1:
+        parser.error("--sketch-error 必须在0和1之间")
+    if args.profile:
+        return run_profile_cli(args, input_files)
+
+    config = plan.to_recipe()
+    output_format = f".{args.format}" if args.format else None
+    try:
+        column_compression = parse_column_compression(args.column_compression)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.row_group_rows <= 0:
+        parser.error("--row-group-rows 必须为正整数")
+    write_options = {'row_group_rows': args.row_group_rows, 'compression': args.compression,
+                     'column_compression': column_compression}
+    if args.write_workers:
+        write_options['workers'] = args.write_workers
+
+    print(f"🚀 批量清洗 {len(input_files)} 个文件 → {args.output_dir}")
+    start = time.perf_counter()
+    summaries = run_batch(input_files, args.output_dir, config, args.workers, output_format,
+                          args.encoding, args.chunksize, args.cache, args.optimize_memory,
+                          args.sketch_error if args.approx else None, args.deep_profile,
+                          parse_sheet(args.sheet), write_options, args.engine, args.incremental,
+                          column_workers=args.column_workers, column_processes=args.column_processes or None,
+                          row_workers=args.row_workers, row_processes=args.row_processes or None)
+    elapsed = time.perf_counter() - start
+    if args.trace:
+        save_traces([summary['trace'] for summary in summaries], args.trace)
+
+    failed = sum(1 for summary in summaries if summary['status'] != 'ok')
+    summary_path = Path(args.output_dir) / BATCH_SUMMARY_FILE
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump({'recipe': config, 'seconds': round(elapsed, 3), 'files': summaries},
+                  f, ensure_ascii=False, indent=2)
+
+    print("-" * 50)
+    print(f"完成: 成功 {len(summaries) - failed} 个, 失败 {failed} 个, 用时 {elapsed:.1f}s")
+    print(f"汇总: {summary_path}")
+    if args.trace:
+        print(f"计时: {args.trace}")
+    return 1 if failed else 0
+
+
+def run_profile_cli(args, input_files):
+    """--profile: 并行分析各文件，写出各自的概况和合并后的 profile_summary.json"""
+    print(f"📏 流式分析 {len(input_files)} 个文件 → {args.output_dir}")
+    start = time.perf_counter()
+    summaries, merged = run_profile(input_files, args.output_dir, args.workers, args.chunksize,
+                                    args.encoding, args.sketch_error)
+    elapsed = time.perf_counter() - start
+
+    failed = sum(1 for summary in summaries if summary['status'] != 'ok')
+    summary_path = Path(args.output_dir) / PROFILE_SUMMARY_FILE
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump({'seconds': round(elapsed, 3), 'files': summaries, 'merged': merged.summary()},
+                  f, ensure_ascii=False, indent=2)
+    print("-" * 50)
+    print(merged.report_text())
+    print(f"完成: 成功 {len(summaries) - failed} 个, 失败 {failed} 个, 用时 {elapsed:.1f}s")
+    print(f"汇总: {summary_path}")
+    return 1 if failed else 0
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""数据概况: 缓存的统计概况和质量报告"""
+
+from functools import cached_property
+
+from .lazy import LazyModule
+from .tracing import stage
+from .dedup import duplicated_rows
+from .executors import (frame_distinct_counts, frame_memory_usage, frame_null_counts, frame_numeric_summary,
+                        get_column_executor)
+
+np = LazyModule('numpy', 'np', globals())
+pd = LazyModule('pandas', 'pd', globals())
+
+
+class DataProfile:
+    """数据概况 - 每个DataFrame版本只计算一次，统计面板和质量报告共用
+
+    各项统计按需惰性计算并缓存；已知结果(如去重后重复数为0)可通过known预先填入，
+    避免清洗后重新全表扫描。
+    """
+
+    def __init__(self, df, version=0, known=None):
+        self.df = df
+        self.version = version
+        self.n_rows = len(df)
+        self.n_cols = len(df.columns)
+        # cached_property 将结果存放在实例__dict__中，直接写入即视为已计算
+        for name, value in (known or {}).items():
+            self.__dict__[name] = value
+
+    @cached_property
+    def dtypes(self):
+        return self.df.dtypes
+
+    @cached_property
+    def numeric_cols(self):
+        return self.df.select_dtypes(include=[np.number]).columns
+
+    @cached_property
+    def null_counts(self):
+        return get_column_executor().map(frame_null_counts, self.df)
+
+    @cached_property
+    def total_missing(self):
+        return int(self.null_counts.sum())
+
+    @cached_property
+    def duplicate_mask(self):
+        return duplicated_rows(self.df)
+
+    @cached_property
+    def duplicate_count(self):
+        return int(self.duplicate_mask.sum())
+
+    @cached_property
+    def memory_bytes(self):
+        index_bytes = int(self.df.index.memory_usage(deep=True))
+        return index_bytes + int(get_column_executor().map(frame_memory_usage, self.df).sum())
+
+    @cached_property
+    def numeric_summary(self):
+        """数值列汇总 (行: count/mean/std/min/max, 列: 数值列)"""
+        if len(self.numeric_cols) == 0:
+            return pd.DataFrame()
+        return get_column_executor().map(frame_numeric_summary, self.df[self.numeric_cols])
+
+    @cached_property
+    def distinct_counts(self):
+        """各列唯一值个数估计 (基于64位哈希，不含缺失值)"""
+        return get_column_executor().map(frame_distinct_counts, self.df)
+
+    def warm(self):
+        """预先计算统计面板和质量报告所需的各项指标 (在后台线程中调用)"""
+        with stage('stats.profile', rows_in=self.n_rows):
+            self.memory_bytes, self.null_counts, self.duplicate_count, self.numeric_summary
+            self.distinct_counts
+        return self
+
+
+def quality_report_text(profile):
+    """由数据概况生成数据质量报告 (完整性/一致性评分、各列质量和清洗建议)"""
+    n_rows = max(profile.n_rows, 1)
+    null_counts = profile.null_counts
+    distinct_counts = profile.distinct_counts
+    duplicate_count = profile.duplicate_count
+
+    report_text = "=== 数据质量评估报告 ===\n\n"
+
+    # 完整性评分
+    total_cells = max(profile.n_rows * profile.n_cols, 1)
+    missing_cells = profile.total_missing
+    completeness = (1 - missing_cells / total_cells) * 100
+    report_text += f"数据完整性: {completeness:.1f}%\n"
+
+    # 一致性评分
+    duplicate_rate = duplicate_count / n_rows * 100
+    consistency = 100 - duplicate_rate
+    report_text += f"数据一致性: {consistency:.1f}%\n"
+
+    report_text += f"\n总体质量评分: {(completeness + consistency) / 2:.1f}%\n\n"
+
+    report_text += "=== 详细分析 ===\n\n"
+
+    # 各列质量分析
+    report_text += "各列质量分析:\n"
+    for col in null_counts.index:
+        missing_rate = null_counts[col] / n_rows * 100
+        quality_score = 100 - missing_rate
+        report_text += f"  {col}: {quality_score:.1f}%"
+        if missing_rate > 0:
+            report_text += f" (缺失{missing_rate:.1f}%)"
+        report_text += f" 唯一值≈{distinct_counts[col]}"
+        report_text += "\n"
+
+    # 建议
+    report_text += "\n=== 清洗建议 ===\n"
+
+    if missing_cells > 0:
+        high_missing_cols = null_counts.index[null_counts / n_rows > 0.5]
+        if len(high_missing_cols) > 0:
+            report_text += f"• 建议删除缺失值超过50%的列: {list(high_missing_cols)}\n"
+
+    if duplicate_count > 0:
+        report_text += f"• 发现 {duplicate_count} 行重复数据，建议删除\n"
+    return report_text
@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+"""重复值处理: 哈希指纹去重 (超出内存预算时溢出到磁盘) 和MinHash-LSH近似重复检测"""
+
+import os
+import shutil
+import tempfile
+import difflib
+
+from .lazy import LazyModule, optional_module
+
+np = LazyModule('numpy', 'np', globals())
+pd = LazyModule('pandas', 'pd', globals())
+
+# 可选依赖: rapidfuzz (近似去重时用C++实现比较候选对的相似度，未安装时使用difflib)
+fuzz = optional_module('rapidfuzz.fuzz', 'fuzz', globals())
+
+
+DEDUP_KEEP_OPTIONS = {"保留首次出现": 'first', "保留最后出现": 'last', "全部删除": False}
+FINGERPRINT_BITS = [64, 128]
+DEDUP_MEMORY_BUDGET = 256 * 1024 * 1024
+DUPLICATE_FLAG_COLUMN = '是否重复'
+
+# 128位指纹由两个不同密钥的64位哈希组成 (hash_key须为16字节)
+FINGERPRINT_128 = [('h1', '<u8'), ('h2', '<u8')]
+FINGERPRINT_SECOND_KEY = 'datacleanpro#fp2'
+
+
+def parse_column_list(text):
+    """解析逗号分隔的列名 (支持中英文逗号)，空白返回None表示全部列"""
+    if not text:
+        return None
+    columns = [col.strip() for col in text.replace('，', ',').split(',') if col.strip()]
+    return columns or None
+
+
+def hash_columns(columns, hash_key=None, n_rows=0):
+    """逐列计算64位哈希并合并为行哈希，合并方式与pd.util.hash_pandas_object(DataFrame)相同
+
+    传入Series列表而非DataFrame，清洗计划可以直接对覆盖列求哈希而无需先拼出整表。
+    没有列时返回n_rows个相同的哈希 (仍是每行一个)。
+    """
+    columns = list(columns)
+    kwargs = {'index': False} if hash_key is None else {'index': False, 'hash_key': hash_key}
+    out = None
+    mult = np.uint64(1000003)
+    for i, series in enumerate(columns):
+        hashes = pd.util.hash_pandas_object(series, **kwargs).to_numpy()
+        if out is None:
+            out = np.zeros_like(hashes) + np.uint64(0x345678)
+        inverse_i = len(columns) - i
+        out ^= hashes
+        out *= mult
+        mult += np.uint64(82520 + inverse_i + inverse_i)
+    if out is None:
+        return np.full(n_rows, 0x345678 + 97531, dtype=np.uint64)
+    return out + np.uint64(97531)
+
+
+def column_fingerprints(columns, bits=64, n_rows=0):
+    """由若干列(Series列表)计算每行的64/128位指纹 (n_rows为没有列时的行数)"""
+    columns = list(columns)
+    h1 = hash_columns(columns, n_rows=n_rows)
+    if bits == 64:
+        return h1
+    fingerprints = np.empty(len(h1), dtype=FINGERPRINT_128)
+    fingerprints['h1'] = h1
+    fingerprints['h2'] = hash_columns(columns, hash_key=FINGERPRINT_SECOND_KEY, n_rows=n_rows)
+    return fingerprints
+
+
+def row_fingerprints(df, subset=None, bits=64):
+    """计算每行(或键列子集)的64/128位指纹"""
+    if subset:
+        missing = [col for col in subset if col not in df.columns]
+        if missing:
+            raise ValueError(f"去重键列不存在: {missing}")
+        df = df[list(subset)]
+    return column_fingerprints((series for _, series in df.items()), bits, len(df))
+
+
+def duplicated_fingerprints(fingerprints, keep='first'):
+    """指纹数组的重复标记，语义与DataFrame.duplicated(keep)一致"""
+    if fingerprints.dtype == FINGERPRINT_128:
+        frame = pd.DataFrame({'h1': fingerprints['h1'], 'h2': fingerprints['h2']})
+        return frame.duplicated(keep=keep).to_numpy()
+    return pd.Series(fingerprints).duplicated(keep=keep).to_numpy()
+
+
+def duplicated_rows(df, subset=None, keep='first', bits=64):
+    """内存中的指纹去重，语义与DataFrame.duplicated(subset, keep)一致"""
+    if not len(df.columns):
+        return np.zeros(len(df), dtype=bool)
+    return duplicated_fingerprints(row_fingerprints(df, subset, bits), keep)
+
+
+def collision_probability(n, bits):
+    """n个不同指纹中至少出现一次哈希碰撞的概率 (生日问题近似)"""
+    return float(-np.expm1(-n * (n - 1) / 2.0 ** (bits + 1)))
+
+
+class FingerprintSet:
+    """紧凑的有序指纹集合 (LSM结构)
+
+    新指纹以有序数组追加，按大小逐级归并；内存超过预算时归并写入磁盘
+    成为有序run文件，之后以内存映射方式二分查找。attach()挂载的已保存指纹文件同样按内存映射查找。
+    """
+
+    def __init__(self, dtype='uint64', memory_budget=DEDUP_MEMORY_BUDGET, spill_dir=None):
+        self.dtype = np.dtype(dtype)
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.size = 0
+        self._runs = []
+        self._disk_runs = []
+        self._attached = []
+        self._tmpdir = None
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def memory_bytes(self):
+        return sum(run.nbytes for run in self._runs)
+
+    @property
+    def spilled_runs(self):
+        return len(self._disk_runs)
+
+    @staticmethod
+    def _member(run, fingerprints):
+        idx = np.searchsorted(run, fingerprints)
+        found = np.zeros(len(fingerprints), dtype=bool)
+        valid = idx < len(run)
+        found[valid] = run[idx[valid]] == fingerprints[valid]
+        return found
+
+    def contains(self, fingerprints):
+        """返回每个指纹是否已在集合中"""
+        found = np.zeros(len(fingerprints), dtype=bool)
+        for run in self._attached + self._disk_runs + self._runs:
+            rest = ~found
+            if not rest.any():
+                break
+            found[rest] = self._member(run, fingerprints[rest])
+        return found
+
+    def add(self, fingerprints):
+        """加入一批指纹，返回每个指纹在加入前是否已出现 (批内重复时首次出现为False)"""
+        unique, first_index = np.unique(fingerprints, return_index=True)
+        seen = np.ones(len(fingerprints), dtype=bool)
+        known = self.contains(unique)
+        seen[first_index[~known]] = False
+
+        new = unique[~known]
+        if len(new):
+            self.size += len(new)
+            self._runs.append(new)
+            # 相邻run大小相近时归并，保持run数量为O(log n)
+            while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+                right = self._runs.pop()
+                left = self._runs.pop()
+                self._runs.append(np.sort(np.concatenate([left, right]), kind='mergesort'))
+            if self.memory_bytes > self.memory_budget:
+                self._spill()
+        return seen
+
+    def _spill(self):
+        """将内存中的run归并写入磁盘"""
+        merged = np.sort(np.concatenate(self._runs), kind='mergesort')
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.mkdtemp(prefix='datacleanpro_fp_', dir=self.spill_dir)
+        path = os.path.join(self._tmpdir, f"run_{len(self._disk_runs)}.npy")
+        np.save(path, merged)
+        self._disk_runs.append(np.load(path, mmap_mode='r'))
+        self._runs = []
+
+    def attach(self, path):
+        """以内存映射方式挂载save()保存的指纹文件 (只读，close时不删除)"""
+        run = np.load(path, mmap_mode='r')
+        self._attached.append(run)
+        self.size += len(run)
+
+    def save(self, path):
+        """把挂载文件以外的指纹归并为一个有序的.npy文件，返回写入的指纹个数"""
+        runs = [np.asarray(run) for run in self._disk_runs + self._runs]
+        merged = np.sort(np.concatenate(runs), kind='mergesort') if runs else np.empty(0, self.dtype)
+        np.save(path, merged)
+        return len(merged)
+
+    def close(self):
+        """释放内存映射并删除溢写文件"""
+        self._runs = []
+        self._disk_runs = []
+        self._attached = []
+        self.size = 0
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+
+class FingerprintDeduplicator:
+    """基于行指纹的去重 - 可跨块、跨文件使用
+
+    keep='first' 单遍即可判定；keep='last'/False 需先对全部数据调用 scan()，
+    之后按相同顺序调用 duplicated()。
+    """
+
+    def __init__(self, subset=None, keep='first', bits=64,
+                 memory_budget=DEDUP_MEMORY_BUDGET, spill_dir=None):
+        if bits not in FINGERPRINT_BITS:
+            raise ValueError(f"指纹位数必须为 {FINGERPRINT_BITS} 之一")
+        self.subset = subset
+        self.keep = keep
+        self.bits = bits
+        dtype = np.uint64 if bits == 64 else FINGERPRINT_128
+        self.seen = FingerprintSet(dtype, memory_budget, spill_dir)
+        self._scan_rows = 0
+        self._rows = 0
+        self._dup_parts = []
+        self._dup_keys = None
+        self._dup_last = None
+
+    @property
+    def needs_scan(self):
+        return self.keep != 'first'
+
+    def scan(self, df):
+        """预扫描: 记录重复指纹及其最后出现的位置 (keep='last'/False使用)"""
+        if not len(df.columns):
+            self._scan_rows += len(df)
+            return
+        fingerprints = row_fingerprints(df, self.subset, self.bits)
+        positions = np.arange(self._scan_rows, self._scan_rows + len(df), dtype=np.int64)
+        self._scan_rows += len(df)
+        seen = self.seen.add(fingerprints)
+        if seen.any():
+            # 首次出现的位置无需记录: 重复指纹的最后位置必然来自后续出现
+            self._dup_parts.append((fingerprints[seen], positions[seen]))
+        self._dup_keys = None
+
+    def _finish_scan(self):
+        if self._dup_parts:
+            keys = np.concatenate([part[0] for part in self._dup_parts])
+            positions = np.concatenate([part[1] for part in self._dup_parts])
+            order = np.argsort(keys, kind='stable')
+            keys, positions = keys[order], positions[order]
+            is_last = np.ones(len(keys), dtype=bool)
+            is_last[:-1] = keys[1:] != keys[:-1]
+            self._dup_keys, self._dup_last = keys[is_last], positions[is_last]
+        else:
+            self._dup_keys = np.empty(0, dtype=self.seen.dtype)
+            self._dup_last = np.empty(0, dtype=np.int64)
+
+    def duplicated(self, df):
+        """返回当前块中各行是否为重复行
+
+        块中没有列时 (如缺失值步骤删掉了全部列) 与DataFrame.duplicated一致，不视为重复。
+        """
+        if not len(df.columns):
+            self._rows += len(df)
+            return np.zeros(len(df), dtype=bool)
+        fingerprints = row_fingerprints(df, self.subset, self.bits)
+        if not self.needs_scan:
+            mask = self.seen.add(fingerprints)
+        else:
+            if self._dup_keys is None:
+                self._finish_scan()
+            mask = np.zeros(len(df), dtype=bool)
+            if len(self._dup_keys):
+                idx = np.searchsorted(self._dup_keys, fingerprints)
+                idx_valid = np.minimum(idx, len(self._dup_keys) - 1)
+                mask = (idx < len(self._dup_keys)) & (self._dup_keys[idx_valid] == fingerprints)
+                if self.keep == 'last':
+                    positions = np.arange(self._rows, self._rows + len(df), dtype=np.int64)
+                    mask &= positions != self._dup_last[idx_valid]
+        self._rows += len(df)
+        return mask
+
+    def reset(self):
+        """重新开始一遍判定 (保留keep='last'/False的预扫描结果)"""
+        self._rows = 0
+        if not self.needs_scan:
+            self.seen.close()
+
+    def describe(self):
+        """指纹与碰撞安全性说明"""
+        n = len(self.seen)
+        text = f"指纹{self.bits}位, 唯一指纹 {n:,} 个, 碰撞概率≈{collision_probability(n, self.bits):.1e}"
+        if self.seen.spilled_runs:
+            text += f", 溢写磁盘 {self.seen.spilled_runs} 个文件"
+        return text
+
+    def close(self):
+        self.seen.close()
+
+
+# ---- 近似重复 (MinHash-LSH) ----
+
+NEAR_DUPLICATE_COLUMN = '重复簇'  # 标记近似重复时写入的簇编号列 (不属于任何簇的行为空)
+NEAR_DUP_THRESHOLD = 0.85  # 候选对的相似度 (difflib比值) 达到该值才归入同一簇
+NEAR_DUP_SHINGLE = 3  # MinHash使用的字符n-gram长度
+NEAR_DUP_BANDS = 8
+NEAR_DUP_BAND_ROWS = 3  # 每个band的MinHash个数: n-gram的Jaccard相似度约0.5起成为候选
+NEAR_DUP_WINDOW = 8  # 同一LSH桶内每个键只与前面最多这么多个键比较，大桶也保持线性开销
+NEAR_DUP_SORT_WINDOW = 2  # 排序邻近分块: 按键及反转后的键排序，各与前这么多个键组成候选对
+NEAR_DUP_MIN_AGREEMENT = 0.2  # 签名一致比例 (估计的Jaccard相似度) 低于该值的候选对不再逐对比较
+NEAR_DUP_MAX_KEY_CHARS = 256  # 计算签名时键的最大长度 (比较相似度时使用完整的键)
+NEAR_DUP_BATCH_ROWS = 20_000  # 计算签名时每批的键数
+NEAR_DUP_SEED = 20240601
+
+
+def normalize_keys(columns):
+    """把键列规范化后以\\x1f拼接为每行一个字符串
+
+    NFKC (全角转半角)、忽略大小写、连续空白合并为一个空格并去掉首尾空白；缺失值为空串。
+    """
+    key = None
+    for series in columns:
+        text = series.astype(object).where(series.notna(), '').astype(str)
+        text = (text.str.normalize('NFKC').str.casefold()
+                .str.replace(r'\s+', ' ', regex=True).str.strip())
+        key = text if key is None else key + '\x1f' + text
+    return key
+
+
+def minhash_signatures(keys, num_perm, shingle=NEAR_DUP_SHINGLE):
+    """各字符串字符n-gram集合的MinHash签名 (len(keys)×num_perm 的uint64数组)
+
+    按批把字符串转为定长码点矩阵，滚动哈希出全部n-gram后对每个哈希函数 (奇数乘数的
+    仿射变换，是2^64上的置换) 逐行取最小值，不在Python中逐个生成n-gram。
+    """
+    rng = np.random.default_rng(NEAR_DUP_SEED)
+    mults = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    offsets = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    base = np.uint64(1_000_003)
+    empty = np.uint64(np.iinfo(np.uint64).max)
+    signatures = np.empty((len(keys), num_perm), dtype=np.uint64)
+    for start in range(0, len(keys), NEAR_DUP_BATCH_ROWS):
+        batch = np.array([key[:NEAR_DUP_MAX_KEY_CHARS] for key in keys[start:start + NEAR_DUP_BATCH_ROWS]],
+                         dtype=str)
+        width = max(batch.dtype.itemsize // 4, shingle)
+        chars = np.zeros((len(batch), width), dtype=np.uint64)
+        if batch.dtype.itemsize:
+            chars[:, :batch.dtype.itemsize // 4] = batch.view(np.uint32).reshape(len(batch), -1)
+        positions = width - shingle + 1
+        grams = chars[:, :positions].copy()
+        for k in range(1, shingle):
+            grams = grams * base + chars[:, k:k + positions]
+        # 短于n-gram长度的字符串 (含空串) 以补零后的整串作为唯一的n-gram
+        lengths = np.char.str_len(batch)
+        valid = np.arange(positions) < np.maximum(lengths - shingle + 1, 1)[:, None]
+        for p in range(num_perm):
+            hashed = np.where(valid, grams * mults[p] + offsets[p], empty)
+            signatures[start:start + len(batch), p] = hashed.min(axis=1)
+    return signatures
+
+
+def lsh_candidate_pairs(signatures, bands=NEAR_DUP_BANDS, rows=NEAR_DUP_BAND_ROWS,
+                        window=NEAR_DUP_WINDOW):
+    """MinHash-LSH候选对 (两个索引数组，未去重)
+
+    每个band的签名片段哈希为桶号，同桶的键按位置排序后只与前window个同桶键组成候选对。
+    """
+    n = len(signatures)
+    left, right = [], []
+    for band in range(bands):
+        columns = signatures[:, band * rows:(band + 1) * rows]
+        buckets = hash_columns([pd.Series(columns[:, k]) for k in range(rows)])
+        order = np.argsort(buckets, kind='stable')
+        sorted_buckets = buckets[order]
+        for d in range(1, min(window, n - 1) + 1):
+            same = sorted_buckets[d:] == sorted_buckets[:-d]
+            left.append(order[:-d][same])
+            right.append(order[d:][same])
+    return left, right
+
+
+def candidate_pairs(keys, signatures, min_agreement=NEAR_DUP_MIN_AGREEMENT):
+    """合并LSH与排序邻近分块的候选对，去重后按签名一致比例过滤，返回 (i, j) 索引数组 (i < j)"""
+    n = len(keys)
+    left, right = lsh_candidate_pairs(signatures)
+    sorted_left, sorted_right = sorted_neighbor_pairs(keys)
+    left = np.concatenate(left + sorted_left).astype(np.int64)
+    right = np.concatenate(right + sorted_right).astype(np.int64)
+    codes = np.unique(np.minimum(left, right) * n + np.maximum(left, right))
+    left, right = codes // n, codes % n
+    agree = np.zeros(len(codes), dtype=np.int32)
+    for column in np.ascontiguousarray(signatures.T):
+        agree += column[left] == column[right]
+    keep = agree >= min_agreement * signatures.shape[1]
+    return left[keep], right[keep]
+
+
+def sorted_neighbor_pairs(keys, window=NEAR_DUP_SORT_WINDOW):
+    """排序邻近分块的候选对: 键按字典序及反转后的字典序排序，与相邻window个键配对
+
+    补充LSH对短键的漏检 (短键错一个字符时n-gram的Jaccard相似度已经很低)。
+    """
+    n = len(keys)
+    left, right = [], []
+    for sort_keys in (keys, [key[::-1] for key in keys]):
+        order = np.argsort(np.array(sort_keys, dtype=object), kind='stable')
+        for d in range(1, min(window, n - 1) + 1):
+            left.append(order[:-d])
+            right.append(order[d:])
+    return left, right
+
+
+def near_duplicate_clusters(columns, threshold=NEAR_DUP_THRESHOLD, n_rows=0):
+    """近似重复簇: 返回每行的簇编号 (按首次出现从1开始，不属于任何簇为0) 和候选对数
+
+    规范化后完全相同的键直接归为一簇；不同的规范化键只在候选对 (MinHash-LSH同桶或排序后相邻，
+    且签名一致比例不低于NEAR_DUP_MIN_AGREEMENT) 中比较相似度 (即difflib的ratio，安装rapidfuzz时
+    用其实现)，相似度达到threshold的键以并查集合并，开销随行数近似线性增长。
+    没有键列时n_rows行都不属于任何簇。
+    """
+    keys = normalize_keys(columns)
+    if keys is None:
+        return np.zeros(n_rows, dtype=np.int64), 0
+    codes, uniques = pd.factorize(keys)
+    uniques = list(uniques)
+    parent = list(range(len(uniques)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def similar(a, b):
+        if fuzz is not None:
+            return fuzz.ratio(a, b, score_cutoff=threshold * 100) > 0
+        matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+        return matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold
+
+    candidates = 0
+    if len(uniques) > 1:
+        signatures = minhash_signatures(uniques, NEAR_DUP_BANDS * NEAR_DUP_BAND_ROWS)
+        left, right = candidate_pairs(uniques, signatures)
+        candidates = len(left)
+        # 相似度上限为 2×较短长度/长度之和，长度相差过大的候选对无需逐对比较
+        lengths = np.array([len(key) for key in uniques], dtype=np.int64)
+        short, total = np.minimum(lengths[left], lengths[right]), lengths[left] + lengths[right]
+        possible = 2 * short >= threshold * np.maximum(total, 1)
+        left, right = left[possible], right[possible]
+        for i, j in zip(left.tolist(), right.tolist()):
+            root_i, root_j = find(i), find(j)
+            if root_i == root_j:
+                continue
+            if not similar(uniques[i], uniques[j]):
+                continue
+            # 两个簇的代表键也须相似，避免 a≈b≈c≈… 沿链条合并成一个大簇
+            if (root_i != i or root_j != j) and not similar(uniques[root_i], uniques[root_j]):
+                continue
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    roots = np.array([find(i) for i in range(len(uniques))], dtype=np.int64)
+    row_roots = roots[codes]
+    in_cluster = np.bincount(row_roots, minlength=len(uniques))[row_roots] > 1
+    cluster_ids = np.zeros(len(row_roots), dtype=np.int64)
+    cluster_ids[in_cluster] = pd.factorize(row_roots[in_cluster])[0] + 1
+    return cluster_ids, candidates
+
+
+def near_duplicated(cluster_ids, keep='first'):
+    """簇内的重复标记 (keep与DataFrame.duplicated相同)，不属于任何簇的行为False"""
+    return pd.Series(cluster_ids).duplicated(keep=keep).to_numpy() & (cluster_ids > 0)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""编码检测: 只读取有界样本判断文本文件的编码"""
+
+import codecs
+
+from .lazy import LazyModule
+from .formats import open_compressed, split_compression
+
+chardet = LazyModule('chardet', 'chardet', globals())
+
+
+ENCODING_BLOCK_SIZE = 64 * 1024
+ENCODING_MAX_BYTES = 4 * 1024 * 1024
+ENCODING_CONFIDENCE = 0.8
+ENCODING_AUTO = "自动检测"
+ENCODING_CHOICES = [ENCODING_AUTO, "utf-8", "utf-8-sig", "gb18030", "big5", "utf-16", "latin-1"]
+
+# BOM按长度从长到短匹配 (UTF-32 LE的BOM以UTF-16 LE的BOM开头)
+ENCODING_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# chardet返回的子集编码统一映射为超集，避免样本之外的字符解码失败
+ENCODING_SUPERSETS = {
+    'ascii': 'utf-8',
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'iso-8859-1': 'cp1252',
+}
+
+
+def detect_encoding(file_path, max_bytes=ENCODING_MAX_BYTES, block_size=ENCODING_BLOCK_SIZE,
+                    threshold=ENCODING_CONFIDENCE):
+    """有界采样检测文件编码，返回 (编码, 置信度)
+
+    1. BOM快速路径
+    2. 增量UTF-8校验，读完文件或字节预算内全部合法即判定为UTF-8
+    3. 否则将已读样本分块送入chardet.UniversalDetector，检测器确定或预算耗尽即停止
+    置信度低于threshold时尝试以gb18030解码样本作为兜底
+    压缩文件 (如 .csv.gz) 对解压后的内容采样。
+    """
+    with open_compressed(file_path, 'rb', split_compression(file_path)[1]) as (_, f):
+        head = f.read(block_size)
+        for bom, encoding in ENCODING_BOMS:
+            if head.startswith(bom):
+                return encoding, 1.0
+
+        blocks = [head]
+        read_bytes = len(head)
+        utf8_decoder = codecs.getincrementaldecoder('utf-8')()
+        utf8_valid = True
+        block = head
+        while True:
+            try:
+                utf8_decoder.decode(block, final=not block)
+            except UnicodeDecodeError:
+                utf8_valid = False
+                break
+            if not block or read_bytes >= max_bytes:
+                break
+            block = f.read(min(block_size, max_bytes - read_bytes))
+            blocks.append(block)
+            read_bytes += len(block)
+        if utf8_valid:
+            return 'utf-8', 1.0 if not block else 0.99
+
+        detector = chardet.UniversalDetector()
+        for block in blocks:
+            detector.feed(block)
+            if detector.done:
+                break
+        while not detector.done and read_bytes < max_bytes:
+            block = f.read(min(block_size, max_bytes - read_bytes))
+            if not block:
+                break
+            read_bytes += len(block)
+            blocks.append(block)
+            detector.feed(block)
+        result = detector.close()
+
+    encoding = (result.get('encoding') or '').lower()
+    confidence = result.get('confidence') or 0.0
+    encoding = ENCODING_SUPERSETS.get(encoding, encoding)
+    if encoding and confidence >= threshold:
+        return encoding, confidence
+
+    # 置信度不足时以gb18030兜底 (去掉末尾4字节，样本可能截断了多字节字符)
+    try:
+        b''.join(blocks)[:-4].decode('gb18030')
+        return 'gb18030', confidence
+    except UnicodeDecodeError:
+        return encoding or 'latin-1', confidence
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Excel: 只读/只写模式分批读写工作表，可选calamine引擎"""
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+import os
+
+from .lazy import LazyModule, optional_module
+from .formats import file_format
+from .dedup import parse_column_list
+
+pd = LazyModule('pandas', 'pd', globals())
+
+# 可选依赖: python-calamine (pandas>=2.2时用Rust引擎读取Excel，未安装时用openpyxl只读模式分批读取)
+python_calamine = optional_module('python_calamine', 'python_calamine', globals())
+
+
+EXCEL_MAX_ROWS = 1_048_576  # 单个工作表的行数上限 (含表头)
+EXCEL_BATCH_ROWS = 50_000  # 只读/只写模式每批处理的行数
+SHEETS_ALL = '*'
+SHEET_COLUMN = '工作表'  # 读取多个工作表时记录来源的列
+SHEET_FIRST = "第一个工作表"
+SHEET_ALL_LABEL = "全部工作表"
+
+
+@lru_cache(maxsize=None)
+def calamine_available():
+    """是否可用calamine引擎读取Excel (需python-calamine且pandas>=2.2)"""
+    return python_calamine is not None and \
+        tuple(int(part) for part in pd.__version__.split('.')[:2]) >= (2, 2)
+
+
+def parse_sheet(text):
+    """解析工作表选择: 空白为None(第一个工作表)，'*'为全部，逗号分隔的多个名称返回列表"""
+    if text is None:
+        return None
+    if str(text).strip() == SHEETS_ALL:
+        return SHEETS_ALL
+    names = parse_column_list(str(text))
+    if names is None:
+        return None
+    return names if len(names) > 1 else names[0]
+
+
+def excel_sheet_names(file_path):
+    """返回工作簿中的工作表名称 (不加载单元格数据)"""
+    if calamine_available():
+        return list(python_calamine.CalamineWorkbook.from_path(str(file_path)).sheet_names)
+    if file_format(file_path) != '.xlsx':
+        with pd.ExcelFile(file_path) as book:
+            return list(book.sheet_names)
+    import openpyxl
+    book = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        return list(book.sheetnames)
+    finally:
+        book.close()
+
+
+def excel_header(values):
+    """表头行转为列名: 空单元格为 'Unnamed: i'，重名追加 .1/.2 (与pd.read_excel一致)"""
+    columns, seen = [], {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None else value
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        columns.append(name if count == 0 else f"{name}.{count}")
+    return columns
+
+
+def iter_excel_chunks(file_path, sheet=None, chunksize=EXCEL_BATCH_ROWS, progress=None):
+    """以openpyxl只读模式逐批读取xlsx工作表 (首行为表头)，产出DataFrame
+
+    内存只与批大小有关；跳过空行。progress(已读取行数, 总行数或None) 在每批之后调用。
+    """
+    import openpyxl
+    book = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet_obj = book[sheet] if isinstance(sheet, str) else book.worksheets[sheet or 0]
+        rows = sheet_obj.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = excel_header(header)
+        width = len(columns)
+        total = sheet_obj.max_row - 1 if sheet_obj.max_row else None
+        batch, done = [], 0
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch.append(row[:width] if len(row) >= width else row + (None,) * (width - len(row)))
+            if len(batch) >= chunksize:
+                chunk = pd.DataFrame.from_records(batch, columns=columns)
+                chunk.index = range(done, done + len(chunk))
+                done += len(chunk)
+                batch = []
+                yield chunk
+                if progress:
+                    progress(done, total)
+        if batch or done == 0:
+            chunk = pd.DataFrame.from_records(batch, columns=columns)
+            chunk.index = range(done, done + len(chunk))
+            yield chunk
+            if progress:
+                progress(done + len(chunk), total)
+    finally:
+        book.close()
+
+
+def read_excel_sheet(file_path, sheet=None, progress=None):
+    """读取单个工作表: 有calamine时使用calamine引擎，xlsx否则只读模式分批读取后合并"""
+    if calamine_available():
+        return pd.read_excel(file_path, sheet_name=sheet or 0, engine='calamine')
+    if file_format(file_path) != '.xlsx':
+        return pd.read_excel(file_path, sheet_name=sheet or 0)
+    chunks = list(iter_excel_chunks(file_path, sheet, progress=progress))
+    return pd.concat(chunks) if chunks else pd.DataFrame()
+
+
+def read_excel_sheets(file_path, sheet=None, progress_callback=None):
+    """读取Excel: sheet为None(第一个工作表)、名称/序号、名称列表或'*'(全部工作表)
+
+    多个工作表在进程池中并行读取，按工作表顺序合并，首列 SHEET_COLUMN 记录来源。
+    progress_callback(百分比) 单表时按已读行数、多表时按已完成的工作表数报告。
+    """
+    if sheet == SHEETS_ALL:
+        sheet = excel_sheet_names(file_path)
+    if not isinstance(sheet, list):
+        progress = None if progress_callback is None else \
+            lambda done, total: progress_callback(min(done / total, 1.0) * 100 if total else 0)
+        return read_excel_sheet(file_path, sheet, progress)
+
+    frames = [None] * len(sheet)
+    with ProcessPoolExecutor(max_workers=max(min(len(sheet), os.cpu_count() or 1), 1)) as executor:
+        futures = {executor.submit(read_excel_sheet, str(file_path), name): i
+                   for i, name in enumerate(sheet)}
+        for done, future in enumerate(as_completed(futures), 1):
+            frames[futures[future]] = future.result()
+            if progress_callback:
+                progress_callback(done / len(sheet) * 100)
+    for name, frame in zip(sheet, frames):
+        frame.insert(0, SHEET_COLUMN, name)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+class ExcelChunkWriter:
+    """以openpyxl只写模式逐批写出xlsx，内存与总行数无关
+
+    单个工作表写满 EXCEL_MAX_ROWS 行 (含表头) 后自动续写到 Sheet2、Sheet3…，每个工作表都带表头。
+    """
+
+    def __init__(self, file_path, max_rows=EXCEL_MAX_ROWS):
+        import openpyxl
+        self.file_path = file_path
+        self.max_rows = max_rows
+        self.book = openpyxl.Workbook(write_only=True)
+        self.sheets = 0
+        self.rows = 0
+        self._sheet = None
+        self._sheet_rows = 0
+        self._columns = None
+
+    def _new_sheet(self):
+        self.sheets += 1
+        self._sheet = self.book.create_sheet(f"Sheet{self.sheets}")
+        self._sheet.append([str(col) for col in self._columns])
+        self._sheet_rows = 1
+
+    def write(self, df):
+        """追加一批行 (缺失值写为空单元格)"""
+        if self._columns is None:
+            self._columns = list(df.columns)
+            self._new_sheet()
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if self._sheet_rows >= self.max_rows:
+                self._new_sheet()
+            self._sheet.append(row)
+            self._sheet_rows += 1
+        self.rows += len(df)
+
+    def close(self):
+        if self._sheet is None:
+            self._columns = []
+            self._new_sheet()
+        self.book.save(self.file_path)
+
+
+def write_excel(df, file_path, progress_callback=None):
+    """按EXCEL_BATCH_ROWS行分批流式写出xlsx，超过单表行数上限时拆分到多个工作表，返回工作表数
+
+    回调抛出异常(如任务取消)时删除写了一半的文件。
+    """
+    writer = ExcelChunkWriter(file_path)
+    total = max(len(df), 1)
+    try:
+        for start in range(0, len(df), EXCEL_BATCH_ROWS):
+            writer.write(df.iloc[start:start + EXCEL_BATCH_ROWS])
+            if progress_callback:
+                progress_callback(min(writer.rows / total, 1.0) * 100, rows=writer.rows)
+        writer.close()
+    except BaseException:
+        Path(file_path).unlink(missing_ok=True)
+        raise
+    return writer.sheets
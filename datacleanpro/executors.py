@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""并行执行器: 按列分批 (ColumnExecutor) 和按行分片 (RowExecutor) 的线程池/进程池 + 共享内存"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+from multiprocessing import shared_memory
+
+from .lazy import LazyModule
+from .fileio import widen_arrow_integers
+
+np = LazyModule('numpy', 'np', globals())
+pd = LazyModule('pandas', 'pd', globals())
+
+
+# ==================== 列并行统计 ====================
+
+COLUMN_WORKERS = int(os.environ.get('DATACLEANPRO_COLUMN_WORKERS', 0)) or os.cpu_count() or 1
+COLUMN_PROCESSES = os.environ.get('DATACLEANPRO_COLUMN_PROCESSES', '') == '1'
+COLUMN_PARALLEL_MIN = 64  # 列数少于此值时直接串行计算
+COLUMN_BATCHES_PER_WORKER = 4
+
+
+def column_batches(n_cols, workers):
+    """将列位置切分为连续的切片 (切片取列不复制数据)"""
+    size = max(1, -(-n_cols // (workers * COLUMN_BATCHES_PER_WORKER)))
+    return [slice(start, min(start + size, n_cols)) for start in range(0, n_cols, size)]
+
+
+def frame_null_counts(frame):
+    return frame.isnull().sum()
+
+
+def frame_memory_usage(frame):
+    return frame.memory_usage(index=False, deep=True)
+
+
+def frame_numeric_summary(frame):
+    return frame.agg(['count', 'mean', 'std', 'min', 'max'])
+
+
+def frame_distinct_counts(frame):
+    """各列唯一值个数 (基于64位哈希，不含缺失值)"""
+    counts = []
+    for position in range(frame.shape[1]):
+        series = frame.iloc[:, position].dropna()
+        hashes = pd.util.hash_pandas_object(series, index=False).to_numpy()
+        counts.append(int(np.unique(hashes).size))
+    return pd.Series(counts, index=frame.columns, dtype='int64')
+
+
+def frame_fill_values(frame, action):
+    """各列的填充值 (均值/中位数/众数)，无法计算时为NaN"""
+    if action == "均值填充":
+        return frame.mean()
+    if action == "中位数填充":
+        return frame.median()
+    values = []
+    for position in range(frame.shape[1]):
+        mode_val = frame.iloc[:, position].mode()
+        values.append(mode_val.iloc[0] if not mode_val.empty else np.nan)
+    return pd.Series(values, index=frame.columns, dtype=object)
+
+
+def frame_outlier_stats(frame, method):
+    """异常值边界所需的统计量: IQR为0.25/0.75分位数，Z-score为均值和标准差"""
+    if method == "IQR方法":
+        return frame.quantile([0.25, 0.75])
+    return frame.agg(['mean', 'std'])
+
+
+def _shared_columns_task(name, offset, shape, columns, func, args):
+    """进程池任务: 挂载共享内存中的列块 (每行一列)，零拷贝包装为DataFrame后计算"""
+    # 进程池子进程与主进程共用resource_tracker，共享内存由主进程在计算结束后释放
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=offset)
+        return func(pd.DataFrame(block.T, columns=columns, copy=False), *args).copy()
+    finally:
+        block = None
+        shm.close()
+
+
+class ColumnExecutor:
+    """按列分批并行计算各列统计量
+
+    列切分为连续切片后交给线程池 (NumPy/pandas的排序、归约内核会释放GIL)；
+    processes=True时数值列改为一次性写入共享内存，由进程池按列块零拷贝读取，
+    适合列数极多、Python层循环占主导的统计 (如逐列众数)。
+    """
+
+    def __init__(self, workers=COLUMN_WORKERS, processes=COLUMN_PROCESSES,
+                 min_columns=COLUMN_PARALLEL_MIN):
+        self.workers = max(1, int(workers))
+        self.processes = processes
+        self.min_columns = min_columns
+        self._threads = None
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def map(self, func, df, *args):
+        """对每批列调用func(子表, *args)，按列拼接结果 (Series按索引，DataFrame按列)"""
+        n_cols = df.shape[1]
+        if self.workers == 1 or n_cols < self.min_columns:
+            return func(df, *args)
+        batches = column_batches(n_cols, self.workers)
+        if self.processes and len(df) and df.select_dtypes(include=[np.number]).shape[1] == n_cols:
+            parts = self._map_processes(func, df, batches, args)
+        else:
+            parts = list(self._thread_pool().map(lambda batch: func(df.iloc[:, batch], *args),
+                                                 batches))
+        return pd.concat(parts, axis=1 if isinstance(parts[0], pd.DataFrame) else 0)
+
+    def _thread_pool(self):
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(max_workers=self.workers)
+            return self._threads
+
+    def _process_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _map_processes(self, func, df, batches, args):
+        """数值列按列连续写入共享内存 (转为float64)，各进程只读取自己的列块"""
+        n_rows, n_cols = df.shape
+        shm = shared_memory.SharedMemory(create=True, size=n_rows * n_cols * 8)
+        try:
+            block = np.ndarray((n_cols, n_rows), dtype=np.float64, buffer=shm.buf)
+            for batch in batches:
+                block[batch] = df.iloc[:, batch].to_numpy(dtype=np.float64, na_value=np.nan).T
+            block = None
+            pool = self._process_pool()
+            futures = [pool.submit(_shared_columns_task, shm.name, batch.start * n_rows * 8,
+                                   (batch.stop - batch.start, n_rows), list(df.columns[batch]),
+                                   func, args)
+                       for batch in batches]
+            return [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def close(self):
+        with self._lock:
+            for pool in (self._threads, self._pool):
+                if pool is not None:
+                    pool.shutdown()
+            self._threads = self._pool = None
+
+
+_column_executor = None
+
+
+def get_column_executor():
+    """进程内共享的列并行执行器"""
+    global _column_executor
+    if _column_executor is None:
+        _column_executor = ColumnExecutor()
+    return _column_executor
+
+
+def _reset_column_executor():
+    """fork出的子进程不继承父进程的线程池/进程池"""
+    global _column_executor
+    _column_executor = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_column_executor)
+
+
+def set_column_workers(workers, processes=None):
+    """重新配置列并行执行器的并行度 (命令行和批量工作进程使用)"""
+    global _column_executor
+    if _column_executor is not None:
+        _column_executor.close()
+    _column_executor = ColumnExecutor(workers, COLUMN_PROCESSES if processes is None else processes)
+    return _column_executor
+
+
+# ==================== 行分片并行 ====================
+
+ROW_WORKERS = int(os.environ.get('DATACLEANPRO_ROW_WORKERS', 0)) or os.cpu_count() or 1
+ROW_PROCESSES = os.environ.get('DATACLEANPRO_ROW_PROCESSES', '') == '1'
+ROW_PARALLEL_MIN = 500_000  # 行数少于此值时直接串行计算
+
+
+def row_shards(n_rows, workers):
+    """将行切分为连续的区间 [start, stop)"""
+    size = max(1, -(-n_rows // workers))
+    return [(start, min(start + size, n_rows)) for start in range(0, n_rows, size)]
+
+
+def float64_values(series):
+    """数值列转为float64数组供行分片计算
+
+    float32、整数、可空及Arrow数值类型先转为float64 (缺失值为NaN)，计算后再由调用方转回原类型；
+    非数值列、布尔列和超出±2**53的64位整数列 (转换会丢失精度) 返回None，由调用方串行处理。
+    """
+    dtype = series.dtype
+    if dtype == np.float64:
+        return series.to_numpy()
+    if getattr(dtype, 'kind', None) not in ('i', 'u', 'f'):
+        return None
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    if dtype.kind in 'iu' and dtype.itemsize >= 8:
+        with np.errstate(invalid='ignore'):
+            if (np.abs(values) >= 2.0 ** 53).any():
+                return None
+    return values
+
+
+def fill_rows_kernel(arrays, start, stop, fill_values):
+    """填充分片: 输入列values的缺失位置写入填充值，结果写到输出列filled"""
+    for x, y, value in zip(arrays['values'], arrays['filled'], fill_values):
+        part, out = x[start:stop], y[start:stop]
+        np.copyto(out, part)
+        np.copyto(out, value, where=np.isnan(part))
+
+
+def _shared_rows_task(name, layout, kernel, start, stop, args):
+    """进程池任务: 挂载共享内存中的各数组，零拷贝处理[start, stop)行后只返回小结果"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        arrays = {key: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+                  for key, offset, shape, dtype in layout}
+        return kernel(arrays, start, stop, *args)
+    finally:
+        arrays = None
+        shm.close()
+
+
+class RowExecutor:
+    """按行分片并行执行逐行计算 (缺失值填充、异常值掩码和截断)
+
+    填充值、异常值边界等全局统计量仍整表计算一次，之后的逐元素比较和替换按连续行区间分片：
+    默认交给线程池 (NumPy的逐元素运算会释放GIL，各分片直接读写原数组的切片，不复制数据)；
+    processes=True时输入列一次性写入共享内存，进程池中的各进程挂载后只处理自己的行区间并把结果
+    写回共享内存，主进程按原顺序取回，数据不经pickle传递。分片互不重叠，结果与串行计算一致。
+    """
+
+    def __init__(self, workers=ROW_WORKERS, processes=ROW_PROCESSES, min_rows=None):
+        self.workers = max(1, int(workers))
+        self.processes = processes
+        self.min_rows = ROW_PARALLEL_MIN if min_rows is None else min_rows
+        self._threads = None
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def enabled(self, n_rows):
+        """该行数是否值得分片并行"""
+        return self.workers > 1 and n_rows >= self.min_rows
+
+    def run(self, kernel, inputs, outputs, *args):
+        """对每个行分片调用 kernel(数组字典, start, stop, *args)
+
+        inputs为 名称 → 一维数组或等长一维数组的列表；outputs为 名称 → (列数, dtype)，列数为None时是一维数组。
+        返回 (数组字典 (含输出), 各分片的返回值列表)。
+        """
+        first = next(iter(inputs.values()))
+        n_rows = len(first[0] if isinstance(first, list) else first)
+        shards = row_shards(n_rows, self.workers)
+        if self.processes:
+            return self._run_processes(kernel, inputs, outputs, n_rows, shards, args)
+        arrays = dict(inputs)
+        for key, (count, dtype) in outputs.items():
+            arrays[key] = np.empty(n_rows, dtype) if count is None else \
+                [np.empty(n_rows, dtype) for _ in range(count)]
+        results = list(self._thread_pool().map(lambda shard: kernel(arrays, *shard, *args), shards))
+        return arrays, results
+
+    def _run_processes(self, kernel, inputs, outputs, n_rows, shards, args):
+        """各数组依次排布在一块共享内存中 (列表按行堆叠为二维)，输出在子进程中直接写入"""
+        specs = []
+        for key, value in inputs.items():
+            if isinstance(value, list):
+                dtype = value[0].dtype if value else np.dtype(np.float64)
+                specs.append((key, (len(value), n_rows), dtype))
+            else:
+                specs.append((key, (n_rows,), value.dtype))
+        for key, (count, dtype) in outputs.items():
+            specs.append((key, (n_rows,) if count is None else (count, n_rows), np.dtype(dtype)))
+        layout, size = [], 0
+        for key, shape, dtype in specs:
+            layout.append((key, size, shape, dtype.str))
+            size += -(-int(np.prod(shape)) * dtype.itemsize // 8) * 8
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            views = {key: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+                     for key, offset, shape, dtype in layout}
+            for key, value in inputs.items():
+                if isinstance(value, list):
+                    for i, column in enumerate(value):
+                        views[key][i] = column
+                else:
+                    views[key][:] = value
+            pool = self._process_pool()
+            futures = [pool.submit(_shared_rows_task, shm.name, layout, kernel, start, stop, args)
+                       for start, stop in shards]
+            results = [future.result() for future in futures]
+            arrays = dict(inputs)
+            for key, (count, _) in outputs.items():
+                arrays[key] = views[key].copy() if count is None else [row.copy() for row in views[key]]
+            return arrays, results
+        finally:
+            views = None
+            shm.close()
+            shm.unlink()
+
+    def _thread_pool(self):
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(max_workers=self.workers)
+            return self._threads
+
+    def _process_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def close(self):
+        with self._lock:
+            for pool in (self._threads, self._pool):
+                if pool is not None:
+                    pool.shutdown()
+            self._threads = self._pool = None
+
+
+_row_executor = None
+
+
+def get_row_executor():
+    """进程内共享的行分片执行器"""
+    global _row_executor
+    if _row_executor is None:
+        _row_executor = RowExecutor()
+    return _row_executor
+
+
+def _reset_row_executor():
+    global _row_executor
+    _row_executor = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_row_executor)
+
+
+def set_row_workers(workers, processes=None):
+    """重新配置行分片执行器的并行度 (命令行和批量工作进程使用)"""
+    global _row_executor
+    if _row_executor is not None:
+        _row_executor.close()
+    _row_executor = RowExecutor(workers, ROW_PROCESSES if processes is None else processes)
+    return _row_executor
+
+
+def _fill_target(series, value):
+    """按行分片填充该列时的 (float64数组, 结果dtype)，不适合分片时返回None
+
+    结果dtype取串行fillna填充一个缺失值后的类型 (如float32列填入无法精确表示的值时升级为float64)；
+    没有缺失值、无法无损转为float64或串行fillna也会报错 (如可空整数列填入小数) 的列交给串行路径。
+    """
+    dtype = series.dtype
+    if dtype == np.float64:
+        return series.to_numpy(), dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+        return None  # NumPy整数列没有缺失值
+    values = float64_values(series)
+    if values is None or not np.isnan(values).any():
+        return None
+    try:
+        target = widen_arrow_integers(pd.Series([None], dtype=dtype), value).fillna(value).dtype
+    except (TypeError, ValueError):
+        return None
+    return values, target
+
+
+def fill_missing_columns(columns, fill_values):
+    """各列(Series)按对应的填充值填充缺失值，返回新Series列表
+
+    行数足够多时数值列按行分片并行填充 (非float64列转为float64计算后转回串行fillna的结果类型，
+    见_fill_target)，其余列串行fillna。
+    """
+    results = [None] * len(columns)
+    executor = get_row_executor()
+    parallel, values, targets = [], [], []
+    if columns and executor.enabled(len(columns[0])):
+        for i, series in enumerate(columns):
+            target = _fill_target(series, fill_values[i])
+            if target is not None:
+                parallel.append(i)
+                values.append(target[0])
+                targets.append(target[1])
+    if parallel:
+        arrays, _ = executor.run(fill_rows_kernel, {'values': values},
+                                 {'filled': (len(parallel), np.float64)},
+                                 [fill_values[i] for i in parallel])
+        for i, filled, target in zip(parallel, arrays['filled'], targets):
+            result = pd.Series(filled, index=columns[i].index, name=columns[i].name)
+            results[i] = result if target == np.float64 else result.astype(target)
+    for i, series in enumerate(columns):
+        if results[i] is None:
+            results[i] = widen_arrow_integers(series, fill_values[i]).fillna(fill_values[i])
+    return results
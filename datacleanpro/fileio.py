@@ -0,0 +1,560 @@
+# -*- coding: utf-8 -*-
+"""分块读写: 分块/按字节区间读取、Arrow解析引擎、各格式的整表读写和抽样加载"""
+
+import time
+from pathlib import Path
+import codecs
+import io
+from concurrent.futures import ThreadPoolExecutor
+import os
+import gzip
+import bz2
+import lzma
+from collections import deque
+from contextlib import contextmanager
+
+from .lazy import LazyModule, optional_module
+from .tracing import stage
+from .formats import (JSON_EXTENSIONS, JSON_LINES_EXTENSIONS, file_format, is_json_lines, open_compressed,
+                      split_compression)
+from .encoding import detect_encoding
+from .excel import SHEETS_ALL, iter_excel_chunks, read_excel_sheets, write_excel
+from .jobs import ProgressReader
+
+np = LazyModule('numpy', 'np', globals())
+pd = LazyModule('pandas', 'pd', globals())
+
+# 可选依赖: pyarrow (列式缓存使用Feather格式，未安装时退回pickle；Parquet/Arrow输出和多线程CSV解析需要)
+pa = optional_module('pyarrow', 'pa', globals())
+pa_csv = optional_module('pyarrow.csv', 'pa_csv', globals())
+pq = optional_module('pyarrow.parquet', 'pq', globals())
+
+# 可选依赖: zstandard (读写 .zst 压缩的JSON文件)
+zstandard = optional_module('zstandard', 'zstandard', globals())
+
+
+# ==================== 分块读写 ====================
+
+DEFAULT_CHUNK_SIZE = 100000
+
+
+class ByteRangeReader(io.RawIOBase):
+    """只读文件包装: 从当前位置起最多读取limit个字节，tell()为已读取的字节数"""
+
+    def __init__(self, f, limit):
+        self._f = f
+        self._remaining = limit
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._remaining <= 0:
+            return 0
+        n = self._f.readinto(memoryview(buffer)[:self._remaining])
+        self._remaining -= n
+        self.bytes_read += n
+        return n
+
+    def tell(self):
+        return self.bytes_read
+
+
+@contextmanager
+def open_byte_range(file_path, start, end):
+    """以二进制只读方式打开未压缩文件的 [start, end) 字节区间，产出 (区间读取器, 缓冲流)
+
+    区间读取器的tell()为已读取的区间字节数，与open_compressed产出的磁盘文件用法相同。
+    """
+    if split_compression(file_path)[1] is not None:
+        raise ValueError("按字节区间读取只支持未压缩的文件")
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        reader = ByteRangeReader(f, end - start)
+        yield reader, io.BufferedReader(reader)
+
+
+def complete_lines_end(file_path, start=0, block_size=64 * 1024):
+    """文件最后一个换行符之后的字节偏移 (不早于start)，即只含完整行的部分的结尾
+
+    仍在写入的文件末尾可能是半行，按行追加读取时只读到该偏移。
+    """
+    pos = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        while pos > start:
+            begin = max(start, pos - block_size)
+            f.seek(begin)
+            index = f.read(pos - begin).rfind(b'\n')
+            if index >= 0:
+                return begin + index + 1
+            pos = begin
+    return start
+
+
+def iter_data_chunks(file_path, chunksize, encoding=None, progress=None, sheet=None,
+                     byte_range=None, names=None):
+    """按块读取CSV、JSON Lines或xlsx工作表，产出DataFrame
+
+    progress(已读取的磁盘字节数) 在每块之后调用 (xlsx按已读行数比例估算)；CSV未指定encoding时自动检测。
+    byte_range=(起始, 结束) 时只读取未压缩CSV/JSON Lines文件的该字节区间 (须位于行边界)，
+    起始不为0的CSV区间没有表头，以names为列名。
+    """
+    if file_format(file_path) == '.xlsx':
+        file_size = os.path.getsize(file_path)
+        report = None if progress is None else \
+            lambda done, total: progress(int(file_size * min(done / total, 1.0)) if total else 0)
+        yield from iter_excel_chunks(file_path, sheet, chunksize, report)
+        return
+    if byte_range is not None:
+        opener = open_byte_range(file_path, *byte_range)
+    else:
+        opener = open_compressed(file_path, 'rb', split_compression(file_path)[1])
+    if is_json_lines(file_path):
+        with opener as (raw, stream):
+            text = io.TextIOWrapper(stream, encoding='utf-8-sig')
+            for chunk in pd.read_json(text, lines=True, chunksize=chunksize):
+                yield chunk
+                if progress:
+                    progress(raw.tell())
+        return
+    encoding = encoding or detect_encoding(file_path)[0]
+    header = {} if byte_range is None or byte_range[0] == 0 else {'header': None, 'names': names}
+    with opener as (raw, stream):
+        for chunk in pd.read_csv(stream, encoding=encoding, chunksize=chunksize, **header):
+            yield chunk
+            if progress:
+                progress(raw.tell())
+
+
+def can_stream(file_path):
+    """能否按块读取 (CSV、JSON Lines或xlsx)"""
+    return file_format(file_path) in ['.csv', '.xlsx'] or is_json_lines(file_path)
+
+
+# ==================== Arrow解析引擎 ====================
+
+CSV_ENGINES = ['pandas', 'pyarrow']
+DEFAULT_CSV_ENGINE = os.environ.get('DATACLEANPRO_CSV_ENGINE', 'pandas')
+ARROW_BLOCK_SIZE = 16 * 1024 * 1024  # pyarrow每个解析线程处理的块大小
+
+
+def resolve_csv_engine(engine=None):
+    """返回实际使用的CSV解析引擎: 选择pyarrow但未安装时退回pandas"""
+    engine = engine or DEFAULT_CSV_ENGINE
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"未知的CSV解析引擎: {engine}")
+    return 'pandas' if engine == 'pyarrow' and pa_csv is None else engine
+
+
+def read_csv_arrow(source, encoding=None):
+    """用pyarrow多线程解析CSV，列保持Arrow类型 (pd.ArrowDtype，字符串为string[pyarrow])
+
+    source为路径或二进制文件对象；空字符串等与pandas相同的标记解析为缺失值。
+    非UTF-8编码由pyarrow按块转码。
+    """
+    if encoding is None or codecs.lookup(encoding).name in ('utf-8', 'utf-8-sig'):
+        encoding = 'utf8'  # pyarrow原生解析UTF-8并跳过BOM
+    table = pa_csv.read_csv(
+        source,
+        read_options=pa_csv.ReadOptions(use_threads=True, block_size=ARROW_BLOCK_SIZE,
+                                        encoding=encoding),
+        convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def widen_arrow_integers(series, *values):
+    """Arrow整数列要写入非整数值 (填充值、截断边界) 时先转为double[pyarrow]
+
+    pyarrow会把2.5静默截断为2，NumPy整数列在同样操作下则自动转为float。
+    """
+    dtype = series.dtype
+    if not isinstance(dtype, pd.ArrowDtype) or not pa.types.is_integer(dtype.pyarrow_dtype):
+        return series
+    if all(pd.isna(value) or float(value).is_integer() for value in values):
+        return series
+    return series.astype(pd.ArrowDtype(pa.float64()))
+
+
+# ==================== 输出格式 ====================
+
+COLUMNAR_EXTENSIONS = ['.parquet', '.feather', '.arrow']
+CSV_SHARD_ROWS = 100_000  # 分片编码/压缩CSV时每个分片的行数
+CSV_WRITE_WORKERS = int(os.environ.get('DATACLEANPRO_WRITE_WORKERS', 0)) or os.cpu_count() or 1
+PARQUET_ROW_GROUP_ROWS = 500_000
+COLUMNAR_COMPRESSION = 'zstd'  # Parquet/Arrow默认压缩算法
+COLUMNAR_BATCH_ROWS = 100_000  # 分批写出Arrow IPC时每批的行数
+
+DEFAULT_WRITE_OPTIONS = {
+    'workers': CSV_WRITE_WORKERS,
+    'row_group_rows': PARQUET_ROW_GROUP_ROWS,
+    'compression': COLUMNAR_COMPRESSION,
+    'column_compression': None,  # {列名: 压缩算法}，仅Parquet
+}
+
+
+def parse_column_compression(text):
+    """解析 "列=算法,列=算法" 形式的逐列压缩设置，空白返回None"""
+    if not text:
+        return None
+    result = {}
+    for item in text.replace('，', ',').split(','):
+        if not item.strip():
+            continue
+        col, sep, codec = item.rpartition('=')
+        if not sep or not col.strip() or not codec.strip():
+            raise ValueError(f"逐列压缩格式应为 列名=算法: {item.strip()}")
+        result[col.strip()] = codec.strip().lower()
+    return result or None
+
+
+def compress_bytes(data, compression):
+    """把一段数据压缩为独立的gzip成员/zstd帧等，多段依次拼接后仍是合法的压缩文件"""
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    if compression == 'bz2':
+        return bz2.compress(data)
+    if compression == 'xz':
+        return lzma.compress(data)
+    if zstandard is None:
+        raise ValueError("读写 .zst 文件需要安装 zstandard")
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def write_csv(df, file_path, progress_callback=None, workers=CSV_WRITE_WORKERS,
+              shard_rows=CSV_SHARD_ROWS):
+    """写出CSV (utf-8-sig)：按行分片编码，压缩输出时各分片在线程池中并行压缩，按原顺序拼接
+
+    to_csv编码持有GIL，因此在当前线程中逐片进行；文件名为 .csv.gz/.csv.zst 等时每个分片独立压缩，
+    压缩 (zlib/bz2/lzma/zstd释放GIL) 与下一分片的编码重叠执行，workers只用于压缩。
+    排队压缩的分片数不超过2倍线程数，内存只与分片大小有关。回调抛出异常(如任务取消)时删除写了一半的文件。
+    """
+    compression = split_compression(file_path)[1]
+    starts = range(0, max(len(df), 1), shard_rows)
+    workers = max(1, min(int(workers), len(starts)))
+
+    def encode(start):
+        part = df.iloc[start:start + shard_rows]
+        text = part.to_csv(index=False, header=start == 0)
+        return len(part), text.encode('utf-8-sig' if start == 0 else 'utf-8')  # BOM只写在文件开头
+
+    def compress(shard):
+        part_rows, data = shard
+        return part_rows, compress_bytes(data, compression)
+
+    def encoded():
+        shards = map(encode, starts)
+        if compression is None:
+            yield from shards
+            return
+        if workers == 1:
+            yield from map(compress, shards)
+            return
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for shard in shards:
+                pending.append(pool.submit(compress, shard))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    try:
+        with open(file_path, 'wb') as out:
+            rows = 0
+            for part_rows, data in encoded():
+                out.write(data)
+                rows += part_rows
+                if progress_callback:
+                    progress_callback(rows / max(len(df), 1) * 100, rows=rows, nbytes=out.tell())
+    except BaseException:
+        Path(file_path).unlink(missing_ok=True)
+        raise
+
+
+def _arrow_batches(df, schema, batch_rows):
+    """按batch_rows行分批转换为Arrow表 (统一使用整表推断的schema)"""
+    for start in range(0, len(df), batch_rows):
+        yield start, pa.Table.from_pandas(df.iloc[start:start + batch_rows], schema=schema,
+                                          preserve_index=False)
+
+
+def write_columnar(df, file_path, progress_callback=None, row_group_rows=PARQUET_ROW_GROUP_ROWS,
+                   compression=COLUMNAR_COMPRESSION, column_compression=None):
+    """分批写出Parquet (.parquet) 或 Arrow IPC (.feather/.arrow)，需要pyarrow
+
+    Parquet每row_group_rows行一个行组，column_compression可为个别列指定压缩算法；
+    Arrow IPC支持 zstd/lz4 压缩。回调抛出异常时删除写了一半的文件。
+    """
+    if pa is None:
+        raise ValueError("写出Parquet/Arrow需要安装 pyarrow")
+    file_ext = file_format(file_path)
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    # ParquetWriter每次write_table至少生成一个行组，因此Parquet按行组大小分批
+    batch_rows = row_group_rows if file_ext == '.parquet' else COLUMNAR_BATCH_ROWS
+    compression = compression or 'none'
+    try:
+        if file_ext == '.parquet':
+            codec = compression
+            if column_compression:
+                codec = {name: column_compression.get(name, compression) for name in schema.names}
+            writer = pq.ParquetWriter(file_path, schema, compression=codec)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=None if compression == 'none' else compression)
+            writer = pa.ipc.new_file(file_path, schema, options=options)
+        with writer:
+            for start, table in _arrow_batches(df, schema, batch_rows):
+                if file_ext == '.parquet':
+                    writer.write_table(table, row_group_size=row_group_rows)
+                else:
+                    writer.write_table(table)
+                if progress_callback:
+                    rows = start + table.num_rows
+                    progress_callback(rows / max(len(df), 1) * 100, rows=rows)
+    except BaseException:
+        Path(file_path).unlink(missing_ok=True)
+        raise
+
+
+# ==================== 整表读写 ====================
+
+SUPPORTED_EXTENSIONS = ['.csv', '.xlsx', '.xls'] + JSON_EXTENSIONS + COLUMNAR_EXTENSIONS
+READ_BUFFER_SIZE = 1 << 20  # 带进度读取时的缓冲区大小
+READ_JSON_CHUNK_ROWS = 100_000  # 整表读取JSON Lines时每块解析的行数
+WRITE_CHUNK_ROWS = 100_000  # 分批写出JSON时每批的行数
+
+
+def _read_csv_source(file_path, compression, progress_callback, total_bytes, parse):
+    """以二进制流打开CSV (按需解压并按已读字节数报告进度) 后交给parse解析"""
+    if progress_callback is None and not compression:
+        return parse(str(file_path))
+    with open_compressed(file_path, 'rb', compression) as (f, stream):
+        if progress_callback is not None:
+            stream = io.BufferedReader(ProgressReader(stream, lambda nbytes: progress_callback(
+                min(f.tell() / total_bytes, 1.0) * 100, nbytes=nbytes)), READ_BUFFER_SIZE)
+        return parse(stream)
+
+
+def read_data_file(file_path, encoding=None, cache=None, progress_callback=None, sheet=None,
+                   engine=None):
+    """读取CSV/Excel/JSON/JSON Lines文件，返回 (DataFrame, 加载信息)
+
+    传入LoadCache时先查缓存，命中则跳过编码检测和文本解析。
+    engine为CSV解析引擎 (见CSV_ENGINES)，pyarrow解析失败时退回pandas。
+    JSON Lines (含压缩的 .jsonl.gz 等) 按块解析后合并，不会先把整个文档读成一个字符串。
+    Excel的sheet见read_excel_sheets (默认第一个工作表)。
+    progress_callback(百分比, rows=None, nbytes=None): CSV/JSON Lines按已读取字节数报告，其他格式读取完成后报告。
+    """
+    file_path = Path(file_path)
+    file_ext, compression = split_compression(file_path)
+    engine = resolve_csv_engine(engine) if file_ext == '.csv' else None
+    info = {'encoding': None, 'detect_seconds': 0.0, 'cache': None, 'engine': engine}
+    cache_options = {'encoding': encoding}
+    if sheet is not None:
+        cache_options['sheet'] = sheet
+    if engine == 'pyarrow':
+        cache_options['engine'] = engine
+
+    file_size = file_path.stat().st_size
+
+    start = time.perf_counter()
+    if cache is not None:
+        with stage('load.cache_read') as record:
+            df = cache.get(file_path, cache_options)
+            if df is not None:
+                record.rows_out = len(df)
+        if df is not None:
+            info['cache'] = 'hit'
+            info['parse_seconds'] = time.perf_counter() - start
+            return df, info
+        info['cache'] = 'miss'
+
+    if file_ext == '.csv':
+        if encoding is None:
+            with stage('load.detect_encoding'):
+                encoding, _ = detect_encoding(file_path)
+        info['encoding'] = encoding
+        info['detect_seconds'] = time.perf_counter() - start
+    elif file_ext not in ['.xlsx', '.xls'] + JSON_EXTENSIONS + COLUMNAR_EXTENSIONS:
+        raise ValueError(f"不支持的文件格式: {file_ext}")
+
+    start = time.perf_counter()
+    total_bytes = max(file_size, 1)
+    with stage(f'load.parse{file_ext}', bytes_read=file_size) as record:
+        if file_ext in JSON_EXTENSIONS and is_json_lines(file_path):
+            report = None if progress_callback is None else lambda nbytes: progress_callback(
+                min(nbytes / total_bytes, 1.0) * 100, nbytes=nbytes)
+            chunks = list(iter_data_chunks(file_path, READ_JSON_CHUNK_ROWS, progress=report))
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        elif file_ext == '.json':
+            df = pd.read_json(file_path, compression=compression)
+        elif file_ext == '.parquet':
+            df = pd.read_parquet(file_path)
+        elif file_ext in ['.feather', '.arrow']:
+            df = pd.read_feather(file_path)
+        elif file_ext != '.csv':
+            df = read_excel_sheets(file_path, sheet, progress_callback)
+        else:
+            df = None
+            if engine == 'pyarrow':
+                try:
+                    df = _read_csv_source(file_path, compression, progress_callback, total_bytes,
+                                          lambda source: read_csv_arrow(source, encoding))
+                except (pa.ArrowInvalid, UnicodeDecodeError) as e:
+                    info.update(engine='pandas', engine_error=str(e))
+            if df is None:
+                df = _read_csv_source(file_path, compression, progress_callback, total_bytes,
+                                      lambda source: pd.read_csv(source, encoding=encoding))
+        record.rows_out = len(df)
+    info['parse_seconds'] = time.perf_counter() - start
+    if progress_callback:
+        progress_callback(100, rows=len(df), nbytes=file_size)
+
+    if cache is not None:
+        start = time.perf_counter()
+        with stage('load.cache_write', rows_in=len(df)):
+            try:
+                cache.put(file_path, df, cache_options)
+            except OSError:
+                pass  # 缓存写入失败(如磁盘已满)不影响加载
+        info['cache_write_seconds'] = time.perf_counter() - start
+    return df, info
+
+
+def write_json_lines_chunk(df, out):
+    """把一批记录以JSON Lines格式写入文本流 (每行一个对象，无缩进)"""
+    text = df.to_json(orient='records', lines=True, force_ascii=False, date_format='iso')
+    out.write(text if text.endswith('\n') or not text else text + '\n')
+
+
+def write_json_records(df, file_path, progress_callback=None):
+    """按WRITE_CHUNK_ROWS行分批写出JSON记录，输出不会整体拼成一个字符串
+
+    .jsonl/.ndjson 写出JSON Lines，.json 写出无缩进的记录数组；
+    文件名带 .gz/.bz2/.xz/.zst 扩展名时压缩写出。回调抛出异常时删除写了一半的文件。
+    """
+    file_ext, compression = split_compression(file_path)
+    lines = file_ext in JSON_LINES_EXTENSIONS
+    total = max(len(df), 1)
+    try:
+        with open_compressed(file_path, 'wb', compression) as (raw, stream), \
+                io.TextIOWrapper(stream, encoding='utf-8', newline='') as out:
+            if not lines:
+                out.write('[')
+            for start in range(0, len(df), WRITE_CHUNK_ROWS):
+                part = df.iloc[start:start + WRITE_CHUNK_ROWS]
+                if lines:
+                    write_json_lines_chunk(part, out)
+                else:
+                    # 每批为 [{...},{...}]，去掉方括号后以逗号衔接
+                    text = part.to_json(orient='records', force_ascii=False, date_format='iso')
+                    out.write((',\n' if start else '') + text[1:-1])
+                if progress_callback:
+                    out.flush()
+                    progress_callback(min(start + WRITE_CHUNK_ROWS, len(df)) / total * 100,
+                                      rows=start + len(part), nbytes=raw.tell())
+            if not lines:
+                out.write(']\n')
+    except BaseException:
+        Path(file_path).unlink(missing_ok=True)
+        raise
+
+
+def write_data_file(df, file_path, progress_callback=None, options=None):
+    """按扩展名将DataFrame写入CSV(可压缩)/Excel/JSON/JSON Lines/Parquet/Arrow文件
+
+    options覆盖DEFAULT_WRITE_OPTIONS (CSV压缩线程数、Parquet行组大小和压缩算法)。
+    传入progress_callback时逐段报告进度；回调抛出异常(如任务取消)时删除写了一半的文件。
+    """
+    options = {**DEFAULT_WRITE_OPTIONS, **(options or {})}
+    file_ext = file_format(file_path)
+    if file_ext not in ['.csv', '.xlsx'] + JSON_EXTENSIONS + COLUMNAR_EXTENSIONS:
+        raise ValueError(f"不支持的输出格式: {file_ext}")
+    with stage(f'save{file_ext}', rows_in=len(df)) as record:
+        if file_ext == '.csv':
+            write_csv(df, file_path, progress_callback, options['workers'])
+        elif file_ext == '.xlsx':
+            write_excel(df, file_path, progress_callback)
+        elif file_ext in COLUMNAR_EXTENSIONS:
+            write_columnar(df, file_path, progress_callback, options['row_group_rows'],
+                           options['compression'], options['column_compression'])
+        else:
+            write_json_records(df, file_path, progress_callback)
+        record.bytes_written = os.path.getsize(file_path)
+
+
+# ==================== 抽样加载 ====================
+
+SAMPLE_METHODS = {"完整加载": None, "前N行": 'head', "随机抽样": 'reservoir'}
+DEFAULT_SAMPLE_ROWS = 100_000
+SAMPLE_HEAD_PREVIEW_ROWS = 10_000  # 随机抽样需要读完整个文件，先以前这么多行给出预览
+
+
+def read_data_sample(file_path, rows=DEFAULT_SAMPLE_ROWS, method='head', encoding=None, sheet=None,
+                     progress_callback=None, chunksize=DEFAULT_CHUNK_SIZE, seed=None):
+    """抽样读取数据文件，返回 (样本DataFrame, 抽样信息)
+
+    method='head' 只读取前rows行，耗时与文件大小无关；method='reservoir' 流式读取整个文件，
+    为每行分配一个随机键并保留键最小的rows行 (与蓄水池抽样等价的无放回均匀抽样)，内存只与rows有关，
+    样本按原文件顺序排列。不能按块读取的格式 (Parquet、Feather、JSON数组等) 整表读取后再抽样。
+    抽样信息: method、rows_read (已读取的行数)、complete (是否读完整个文件，即行数不超过rows时样本就是全部数据)。
+    """
+    start = time.perf_counter()
+    file_size = max(os.path.getsize(file_path), 1)
+
+    def report(nbytes):
+        if progress_callback:
+            percent = nbytes / file_size * 100 if method == 'reservoir' else rows_read / rows * 100
+            progress_callback(percent, rows=rows_read, nbytes=nbytes)
+
+    rows_read = 0
+    streamed = can_stream(file_path) and not isinstance(sheet, list) and sheet != SHEETS_ALL
+    if not streamed:
+        df, _ = read_data_file(file_path, encoding, progress_callback=progress_callback, sheet=sheet)
+        rows_read = len(df)
+        if method == 'head':
+            sample = df.head(rows)
+        else:
+            sample = df.sample(min(rows, len(df)), random_state=seed).sort_index()
+    elif method == 'head':
+        parts = []
+        for chunk in iter_data_chunks(file_path, min(rows, chunksize), encoding, report, sheet):
+            parts.append(chunk.iloc[:rows - rows_read])
+            rows_read += len(parts[-1])
+            if rows_read >= rows:
+                break
+        sample = pd.concat(parts) if parts else pd.DataFrame()
+    else:
+        rng = np.random.default_rng(seed)
+        sample, keys = None, np.empty(0)
+        for chunk in iter_data_chunks(file_path, chunksize, encoding, report, sheet):
+            chunk.index = pd.RangeIndex(rows_read, rows_read + len(chunk))
+            rows_read += len(chunk)
+            chunk_keys = rng.random(len(chunk))
+            if len(keys) >= rows:
+                # 样本已满时只有键小于当前最大键的行可能入选
+                candidate = chunk_keys < keys.max()
+                chunk, chunk_keys = chunk[candidate], chunk_keys[candidate]
+            sample = chunk if sample is None else pd.concat([sample, chunk])
+            keys = np.concatenate([keys, chunk_keys])
+            if len(keys) > rows:
+                keep = np.sort(np.argpartition(keys, rows)[:rows])
+                sample, keys = sample.iloc[keep], keys[keep]
+        sample = sample.sort_index() if sample is not None else pd.DataFrame()
+    # 按块读取前N行时读满即停止，不知道后面是否还有数据
+    complete = rows_read < rows if streamed and method == 'head' else rows_read <= rows
+    info = {'method': method, 'rows': len(sample), 'rows_read': rows_read, 'complete': complete,
+            'seconds': time.perf_counter() - start}
+    return sample.reset_index(drop=True), info
+
+
+def sample_note_text(info):
+    """抽样数据的说明文字 (统计信息和质量报告中标注为估计值)"""
+    if info['complete']:
+        return f"样本即全部数据 ({info['rows_read']:,} 行)\n"
+    if info['method'] == 'head':
+        text = f"前 {info['rows']:,} 行 (文件其余部分未读取)\n"
+    else:
+        text = (f"随机抽样 {info['rows']:,} 行 / 共 {info['rows_read']:,} 行 "
+                f"(抽样比例 {info['rows'] / max(info['rows_read'], 1):.2%})\n")
+    return text + "以下数值基于样本，均为估计值；保存时按完整文件重新执行清洗\n"
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""文件格式与压缩: 按扩展名识别数据格式，透明读写gzip/bz2/xz/zstd压缩流"""
+
+from pathlib import Path
+import json
+import gzip
+import bz2
+import lzma
+from contextlib import contextmanager
+
+from .lazy import optional_module
+
+# 可选依赖: zstandard (读写 .zst 压缩的JSON文件)
+zstandard = optional_module('zstandard', 'zstandard', globals())
+
+
+JSON_LINES_EXTENSIONS = ['.jsonl', '.ndjson']
+JSON_EXTENSIONS = ['.json'] + JSON_LINES_EXTENSIONS
+COMPRESSIBLE_EXTENSIONS = ['.csv'] + JSON_EXTENSIONS  # 可带 .gz/.zst 等压缩扩展名的格式
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd'}
+JSON_SNIFF_BYTES = 64 * 1024  # 判断.json是否为JSON Lines时读取的字节数
+
+
+def split_data_suffix(file_path):
+    """拆分文件名为 (主名, 扩展名)，CSV/JSON文件的压缩扩展名计入扩展名
+
+    events.jsonl.gz → ('events', '.jsonl.gz')，data.csv → ('data', '.csv')
+    """
+    name = Path(file_path).name
+    suffixes = [suffix.lower() for suffix in Path(name).suffixes]
+    if len(suffixes) >= 2 and suffixes[-1] in COMPRESSION_EXTENSIONS \
+            and suffixes[-2] in COMPRESSIBLE_EXTENSIONS:
+        suffix = suffixes[-2] + suffixes[-1]
+    else:
+        suffix = Path(name).suffix.lower()
+    return name[:len(name) - len(suffix)], suffix
+
+
+def split_compression(file_path):
+    """返回 (数据格式扩展名, 压缩方式)，如 events.jsonl.gz → ('.jsonl', 'gzip')，未压缩时为None"""
+    suffix = split_data_suffix(file_path)[1]
+    for extension, compression in COMPRESSION_EXTENSIONS.items():
+        if suffix != extension and suffix.endswith(extension):
+            return suffix[:-len(extension)], compression
+    return suffix, None
+
+
+def file_format(file_path):
+    """数据格式扩展名 (不含压缩扩展名)"""
+    return split_compression(file_path)[0]
+
+
+@contextmanager
+def open_compressed(file_path, mode, compression=None):
+    """以二进制模式('rb'/'wb')打开文件，产出 (磁盘文件, 解压/压缩流)
+
+    磁盘文件的tell()为已读写的磁盘字节数，用于按字节报告进度；未压缩时两者为同一对象。
+    """
+    with open(file_path, mode) as raw:
+        if compression is None:
+            yield raw, raw
+            return
+        if compression == 'gzip':
+            stream = gzip.GzipFile(fileobj=raw, mode=mode)
+        elif compression == 'bz2':
+            stream = bz2.BZ2File(raw, mode)
+        elif compression == 'xz':
+            stream = lzma.LZMAFile(raw, mode)
+        elif zstandard is None:
+            raise ValueError("读写 .zst 文件需要安装 zstandard")
+        elif mode == 'rb':
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+        try:
+            yield raw, stream
+        finally:
+            stream.close()
+
+
+def is_json_lines(file_path):
+    """是否为JSON Lines文件 (.jsonl/.ndjson，或前两行各为一个JSON对象的.json)"""
+    file_ext, compression = split_compression(file_path)
+    if file_ext in JSON_LINES_EXTENSIONS:
+        return True
+    if file_ext != '.json':
+        return False
+    with open_compressed(file_path, 'rb', compression) as (_, stream):
+        head = stream.read(JSON_SNIFF_BYTES).decode('utf-8', errors='ignore')
+    lines = [line for line in head.lstrip('\ufeff').splitlines() if line.strip()]
+    if len(lines) < 2 or not lines[0].lstrip().startswith('{'):
+        return False
+    try:
+        return isinstance(json.loads(lines[0]), dict) and lines[1].lstrip().startswith('{')
+    except ValueError:
+        return False
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""撤销/重做历史: 按步骤保存差量，超出内存预算时溢出到磁盘"""
+
+from pathlib import Path
+import os
+import shutil
+import tempfile
+
+from .lazy import LazyModule
+from .tracing import stage
+
+np = LazyModule('numpy', 'np', globals())
+pd = LazyModule('pandas', 'pd', globals())
+
+
+HISTORY_MEMORY_BUDGET = int(os.environ.get('DATACLEANPRO_HISTORY_MB', 512)) * 1024 * 1024
+
+
+def _changed_cells(old, new):
+    """比较同类型的两列，返回值发生变化的行布尔数组；无法比较时返回None"""
+    old = old.reset_index(drop=True)
+    new = new.reset_index(drop=True)
+    both_na = old.isna().to_numpy() & new.isna().to_numpy()
+    try:
+        equal = old.eq(new).to_numpy(dtype=bool, na_value=False)
+    except (TypeError, ValueError):
+        return None
+    return ~(equal | both_na)
+
+
+class StepDelta:
+    """单个清洗步骤的双向增量: 保留行位图、删除的行和列、被修改单元格的新旧值及新增列
+
+    apply()由前一状态得到后一状态 (重做)，revert()由后一状态还原前一状态 (撤销)，
+    两者都只处理发生变化的部分；无法表示为增量时 (如行顺序改变) 退化为前后两份整表快照。
+    """
+
+    def __init__(self, before, after):
+        self.n_rows_before = len(before)
+        self.columns_before = before.columns
+        # RangeIndex不占内存，还原删除的行后直接恢复
+        self.range_index = before.index if isinstance(before.index, pd.RangeIndex) else None
+        self.row_bitmap = None
+        self.dropped_rows = None     # 被删除的行 (前一状态的全部列)
+        self.dropped_columns = {}    # 列名 → 被删除的列在保留行上的取值
+        self.changed_cells = {}      # 列名 → (行位置, 新值, 原值)
+        self.replaced_columns = {}   # 列名 → (新列, 原列)，均为保留行上的取值
+        self.added_columns = {}
+        self.snapshot = None
+        self.snapshot_before = None
+        if not self._diff(before, after):
+            self._use_snapshot(before, after)
+
+    def _use_snapshot(self, before, after):
+        self.row_bitmap = None
+        self.dropped_rows = None
+        self.dropped_columns = {}
+        self.changed_cells = {}
+        self.replaced_columns = {}
+        self.added_columns = {}
+        self.snapshot = after
+        self.snapshot_before = before
+
+    def _diff(self, before, after):
+        if not (before.index.is_unique and before.columns.is_unique and after.columns.is_unique):
+            return False
+        kept = before.index.get_indexer(after.index)
+        if (kept < 0).any() or (len(kept) > 1 and (np.diff(kept) <= 0).any()):
+            return False
+
+        dropped = [col for col in before.columns if col not in after.columns]
+        added = [col for col in after.columns if col not in before.columns]
+        expected = [col for col in before.columns if col not in dropped] + added
+        if list(after.columns) != expected:
+            return False
+
+        rows = slice(None)
+        if len(kept) < len(before):
+            keep = np.zeros(len(before), dtype=bool)
+            keep[kept] = True
+            self.row_bitmap = np.packbits(keep)
+            self.dropped_rows = before[~keep]
+            rows = kept
+        self.dropped_columns = {col: before[col].iloc[rows].reset_index(drop=True) for col in dropped}
+
+        for col in after.columns:
+            if col in added:
+                self.added_columns[col] = after[col].to_numpy()
+                continue
+            old = before[col].iloc[rows]
+            new = after[col]
+            changed = _changed_cells(old, new) if old.dtype == new.dtype else None
+            if changed is None:
+                self.replaced_columns[col] = (new.reset_index(drop=True), old.reset_index(drop=True))
+            elif changed.any():
+                positions = np.flatnonzero(changed)
+                self.changed_cells[col] = (positions, new.iloc[positions].reset_index(drop=True),
+                                           old.iloc[positions].reset_index(drop=True))
+        return True
+
+    @property
+    def nbytes(self):
+        if self.snapshot is not None:
+            return int(self.snapshot.memory_usage(deep=True).sum()
+                       + self.snapshot_before.memory_usage(deep=True).sum())
+        total = 0 if self.row_bitmap is None else self.row_bitmap.nbytes
+        if self.dropped_rows is not None:
+            total += int(self.dropped_rows.memory_usage(deep=True).sum())
+        for values in self.dropped_columns.values():
+            total += int(values.memory_usage(deep=True, index=False))
+        for positions, values, old in self.changed_cells.values():
+            total += positions.nbytes + int(values.memory_usage(deep=True, index=False)
+                                            + old.memory_usage(deep=True, index=False))
+        for values, old in self.replaced_columns.values():
+            total += int(values.memory_usage(deep=True, index=False) + old.memory_usage(deep=True, index=False))
+        for values in self.added_columns.values():
+            total += values.nbytes
+        return total
+
+    def _keep_mask(self):
+        return np.unpackbits(self.row_bitmap, count=self.n_rows_before).astype(bool)
+
+    def apply(self, df):
+        """由前一状态重放得到后一状态 (不修改传入的DataFrame)"""
+        if self.snapshot is not None:
+            return self.snapshot.copy()
+        if self.row_bitmap is not None:
+            df = df[self._keep_mask()]
+        else:
+            df = df.copy()
+        if self.dropped_columns:
+            df = df.drop(columns=list(self.dropped_columns))
+        for col, (positions, values, _) in self.changed_cells.items():
+            df.iloc[positions, df.columns.get_loc(col)] = values.to_numpy()
+        for col, (values, _) in self.replaced_columns.items():
+            df[col] = values.set_axis(df.index)
+        for col, values in self.added_columns.items():
+            df[col] = values
+        return df
+
+    def revert(self, df):
+        """由后一状态还原前一状态 (不修改传入的DataFrame)"""
+        if self.snapshot is not None:
+            return self.snapshot_before.copy()
+        df = df.drop(columns=list(self.added_columns))
+        for col, (positions, _, old) in self.changed_cells.items():
+            df.iloc[positions, df.columns.get_loc(col)] = old.to_numpy()
+        for col, (_, old) in self.replaced_columns.items():
+            df[col] = old.set_axis(df.index)
+        for col, values in self.dropped_columns.items():
+            df[col] = values.set_axis(df.index)
+        df = df.reindex(columns=self.columns_before)
+        if self.row_bitmap is not None:
+            # 保留行与删除的行拼接后按原位置排回
+            keep = self._keep_mask()
+            order = np.argsort(np.concatenate([np.flatnonzero(keep), np.flatnonzero(~keep)]), kind='stable')
+            df = pd.concat([df, self.dropped_rows]).iloc[order]
+            if self.range_index is not None:
+                df.index = self.range_index
+        return df
+
+
+class SnapshotHistory:
+    """增量式撤销/重做历史
+
+    基准数据为加载时的原始数据；撤销时在当前数据上反向应用最后一步的增量 (撤销到第0步时
+    直接返回基准数据)，重做时在当前数据上应用下一增量，耗时只与该步的变化量有关，
+    都不重新计算清洗统计量。增量总大小超过内存预算时，最早的增量溢写到临时目录，需要时再读回。
+    """
+
+    def __init__(self, base_df, memory_budget=HISTORY_MEMORY_BUDGET, spill_dir=None):
+        self.base_df = base_df
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self._steps = []     # [(StepDelta 或 溢写文件路径, 操作记录列表)]
+        self.position = 0    # 已应用的步骤数
+        self._tmpdir = None
+
+    @property
+    def can_undo(self):
+        return self.position > 0
+
+    @property
+    def can_redo(self):
+        return self.position < len(self._steps)
+
+    @property
+    def memory_bytes(self):
+        return sum(delta.nbytes for delta, _ in self._steps if isinstance(delta, StepDelta))
+
+    @property
+    def spilled_steps(self):
+        return sum(1 for delta, _ in self._steps if not isinstance(delta, StepDelta))
+
+    def entries(self):
+        """全部步骤: [(操作记录列表, 是否已应用)]"""
+        return [(ops, index < self.position) for index, (_, ops) in enumerate(self._steps)]
+
+    def operations(self):
+        """已应用步骤的操作记录 (按顺序展开)"""
+        return [op for _, ops in self._steps[:self.position] for op in ops]
+
+    @staticmethod
+    def diff(before, after):
+        """计算一个清洗步骤的增量 (不修改历史，可在后台线程中执行)"""
+        with stage('history.record', rows_in=len(before), rows_out=len(after)):
+            return StepDelta(before, after)
+
+    def record(self, before, after, operations, delta=None):
+        """记录一个清洗步骤，丢弃当前位置之后可重做的步骤
+
+        delta为已用diff(before, after)算好的增量时直接使用，界面只需在主线程中修改历史。
+        """
+        for step, _ in self._steps[self.position:]:
+            if not isinstance(step, StepDelta):
+                Path(step).unlink(missing_ok=True)
+        self._steps = self._steps[:self.position]
+        self._steps.append((self.diff(before, after) if delta is None else delta, list(operations)))
+        self.position += 1
+        self._enforce_budget()
+
+    def _load(self, index):
+        delta, _ = self._steps[index]
+        if isinstance(delta, StepDelta):
+            return delta
+        return pd.read_pickle(delta)
+
+    def _enforce_budget(self):
+        """从最早的步骤开始溢写，直到内存中的增量不超过预算"""
+        total = self.memory_bytes
+        for index, (delta, operations) in enumerate(self._steps):
+            if total <= self.memory_budget:
+                break
+            if not isinstance(delta, StepDelta):
+                continue
+            if self._tmpdir is None:
+                self._tmpdir = tempfile.mkdtemp(prefix='datacleanpro_history_', dir=self.spill_dir)
+            path = os.path.join(self._tmpdir, f"step_{index}_{id(delta)}.pkl")
+            size = delta.nbytes
+            pd.to_pickle(delta, path)
+            self._steps[index] = (path, operations)
+            total -= size
+
+    def undo(self, current_df):
+        """撤销最后一步，返回撤销后的数据"""
+        if not self.can_undo:
+            raise IndexError("没有可撤销的步骤")
+        self.position -= 1
+        if self.position == 0:
+            return self.base_df
+        return self._load(self.position).revert(current_df)
+
+    def redo(self, current_df):
+        """重做下一步，返回重做后的数据"""
+        if not self.can_redo:
+            raise IndexError("没有可重做的步骤")
+        df = self._load(self.position).apply(current_df)
+        self.position += 1
+        return df
+
+    def close(self):
+        self._steps = []
+        self.position = 0
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""后台任务: 可取消的任务调度和按字节计算的进度"""
+
+import time
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+JOB_WORKERS = 2  # 同时运行的后台任务数 (同组任务始终按提交顺序逐个执行)
+JOB_POLL_MS = 200  # 界面刷新任务进度的间隔
+
+
+class JobCancelled(Exception):
+    """任务在检查点被取消"""
+
+
+class ProgressReader(io.RawIOBase):
+    """只读文件包装: 每次底层读取后报告累计字节数 (回调同时作为取消检查点)"""
+
+    def __init__(self, f, callback):
+        self._f = f
+        self._callback = callback
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self._f.readinto(buffer)
+        self.bytes_read += n
+        self._callback(self.bytes_read)
+        return n
+
+
+def format_duration(seconds):
+    """秒数格式化为 H:MM:SS / M:SS"""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class Job:
+    """后台任务 - 记录状态、进度和吞吐量，支持协作式取消
+
+    任务函数以Job为第一个参数，通过progress()报告进度；每次报告都是取消检查点，
+    已请求取消时抛出JobCancelled。
+    """
+
+    STATUS_TEXT = {'pending': "等待中", 'running': "运行中", 'done': "已完成",
+                   'failed': "失败", 'cancelled': "已取消"}
+
+    def __init__(self, name, func, args=(), group=None, on_success=None, on_error=None,
+                 on_cancel=None):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.group = group
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.status = 'pending'
+        self.percent = 0.0
+        self.rows = None
+        self.nbytes = None
+        self.started = self.finished = None
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check(self):
+        """取消检查点"""
+        if self._cancel_event.is_set():
+            raise JobCancelled(self.name)
+
+    def progress(self, percent, rows=None, nbytes=None):
+        """报告进度 (百分比，可附带已处理行数/字节数用于计算吞吐量)"""
+        self.percent = min(max(float(percent), 0.0), 100.0)
+        if rows is not None:
+            self.rows = rows
+        if nbytes is not None:
+            self.nbytes = nbytes
+        self.check()
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def eta(self):
+        """按当前进度线性外推的剩余秒数，进度未知时为None"""
+        if not 0 < self.percent < 100:
+            return None
+        return self.elapsed * (100 - self.percent) / self.percent
+
+    def describe(self):
+        """进度说明: 名称 百分比 · 行/s · MB/s · 剩余时间"""
+        parts = [f"{self.name} {self.percent:.0f}%"]
+        elapsed = max(self.elapsed, 1e-6)
+        if self.rows:
+            parts.append(f"{self.rows / elapsed:,.0f} 行/s")
+        if self.nbytes:
+            parts.append(f"{self.nbytes / 1024 / 1024 / elapsed:.1f} MB/s")
+        if self.eta is not None and self.elapsed > 1:
+            parts.append(f"剩余 {format_duration(self.eta)}")
+        if self.cancelled:
+            parts.append("正在取消...")
+        return " · ".join(parts)
+
+
+class JobScheduler:
+    """有界后台任务调度器
+
+    最多max_workers个任务同时运行；同一group的任务按提交顺序逐个执行 (如读写当前数据的加载、清洗、保存)，
+    并且在完成回调执行完毕后才开始下一个，保证后续任务看到前一任务的结果。
+    回调通过dispatch转交给界面线程 (如 root.after)，任务函数本身不接触界面。
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, dispatch=None):
+        self.max_workers = max_workers
+        self.dispatch = dispatch or (lambda fn, *args: fn(*args))
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._pending = []
+        self._running = []
+        self._lock = threading.Lock()
+
+    def submit(self, name, func, *args, group=None, on_success=None, on_error=None,
+               on_cancel=None):
+        """加入任务队列，返回Job"""
+        job = Job(name, func, args, group, on_success, on_error, on_cancel)
+        with self._lock:
+            self._pending.append(job)
+        self._schedule()
+        return job
+
+    def _schedule(self):
+        with self._lock:
+            busy_groups = {job.group for job in self._running if job.group is not None}
+            for job in list(self._pending):
+                if len(self._running) >= self.max_workers:
+                    break
+                if job.group is not None and job.group in busy_groups:
+                    continue
+                self._pending.remove(job)
+                self._running.append(job)
+                if job.group is not None:
+                    busy_groups.add(job.group)
+                job.status = 'running'
+                job.started = time.perf_counter()
+                self._pool.submit(self._run, job)
+
+    def _run(self, job):
+        try:
+            job.check()
+            result = job.func(job, *job.args)
+            status, callback, args = 'done', job.on_success, (result,)
+        except JobCancelled:
+            status, callback, args = 'cancelled', job.on_cancel, ()
+        except Exception as e:
+            status, callback, args = 'failed', job.on_error, (str(e),)
+        job.finished = time.perf_counter()
+        self.dispatch(self._complete, job, status, callback, args)
+
+    def _complete(self, job, status, callback, args):
+        """(界面线程) 执行完成回调后释放任务槽位并启动后续任务"""
+        try:
+            job.status = status
+            if status == 'done':
+                job.percent = 100.0
+            if callback is not None:
+                callback(*args)
+        finally:
+            with self._lock:
+                if job in self._running:
+                    self._running.remove(job)
+            self._schedule()
+
+    def running(self):
+        with self._lock:
+            return list(self._running)
+
+    def pending(self):
+        with self._lock:
+            return list(self._pending)
+
+    def cancel(self, job):
+        """取消任务: 排队中的直接移除，运行中的在下一个检查点停止"""
+        with self._lock:
+            queued = job in self._pending
+            if queued:
+                self._pending.remove(job)
+        if queued:
+            job.status = 'cancelled'
+            if job.on_cancel is not None:
+                self.dispatch(job.on_cancel)
+        else:
+            job.cancel()
+
+    def cancel_all(self):
+        for job in self.pending() + self.running():
+            self.cancel(job)
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False)
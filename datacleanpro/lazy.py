@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""延迟导入: 首次使用时才导入的模块代理
+
+pandas/numpy/chardet/pyarrow导入耗时较长 (杀毒软件扫描时可达数秒)，改为首次使用时导入，
+图形界面先显示窗口，再由后台线程预热 (见warm_up_imports)。
+各模块以 np = LazyModule('numpy', 'np', globals()) 的形式声明自己的代理。
+"""
+
+import importlib
+import importlib.util
+import threading
+import time
+
+IMPORT_TIMES = {}  # 模块名 -> (导入耗时秒, 导入线程名)
+LAZY_MODULES = []
+CORE_MODULES = ['numpy', 'pandas']  # 预热时最先导入
+
+
+class LazyModule:
+    """首次访问属性时才导入的模块代理
+
+    导入后把模块写回使用方模块 (namespace为其globals()) 的全局变量alias，之后的访问不再经过代理。
+    多个线程同时访问时只导入一次，其余线程等待导入完成。
+    """
+
+    _lock = threading.RLock()
+
+    def __init__(self, name, alias, namespace):
+        self._name = name
+        self._alias = alias
+        self._namespace = namespace
+        self._module = None
+        LAZY_MODULES.append(self)
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        if self._module is None:
+            with LazyModule._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    # 各模块有各自的同名代理，只记录第一次 (实际) 导入的耗时
+                    IMPORT_TIMES.setdefault(self._name, (time.perf_counter() - start,
+                                                         threading.current_thread().name))
+                    self._namespace[self._alias] = module
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        return f"<LazyModule {self._name} ({'已导入' if self.loaded else '未导入'})>"
+
+
+def optional_module(name, alias, namespace):
+    """可选依赖: 已安装时返回LazyModule，否则返回None (只查找顶层包，不导入)"""
+    if importlib.util.find_spec(name.partition('.')[0]) is None:
+        return None
+    return LazyModule(name, alias, namespace)
+
+
+def warm_up_imports():
+    """按依赖顺序导入全部延迟模块 (在后台线程调用)，返回耗时秒数
+
+    先导入numpy/pandas，可选依赖的耗时不含二者 (代理按各模块的导入顺序登记)。
+    """
+    start = time.perf_counter()
+    for module in sorted(LAZY_MODULES, key=lambda module: module._name not in CORE_MODULES):
+        module.load()
+    return time.perf_counter() - start
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""内存优化: 数值列向下转换、低基数字符串列转为category"""
+
+from .lazy import LazyModule
+from .tracing import stage
+
+np = LazyModule('numpy', 'np', globals())
+pd = LazyModule('pandas', 'pd', globals())
+
+
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _downcast_series(series, category_ratio):
+    """单列类型优化: 整数向下转换、浮点数无损时转float32、低基数字符串转category"""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(dtype):
+        if dtype == np.float32 or not isinstance(dtype, np.dtype):
+            return series
+        narrow = series.astype(np.float32)
+        values = series.to_numpy()
+        # 仅在转换无损时使用float32，避免改变清洗统计结果
+        if np.array_equal(narrow.to_numpy().astype(np.float64), values, equal_nan=True):
+            return narrow
+        return series
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        non_null = series.count()
+        if non_null and pd.api.types.infer_dtype(series, skipna=True) == 'string':
+            if series.nunique() <= non_null * category_ratio:
+                return series.astype('category')
+    return series
+
+
+def optimize_dtypes(df, category_ratio=CATEGORY_MAX_RATIO):
+    """压缩DataFrame内存占用，返回 (优化后的DataFrame, 逐列报告)
+
+    报告列: 原类型、新类型、优化前字节、优化后字节
+    """
+    with stage('load.optimize_memory', rows_in=len(df)):
+        return _optimize_dtypes(df, category_ratio)
+
+
+def _optimize_dtypes(df, category_ratio):
+    """逐列压缩 (由optimize_dtypes计量)"""
+    columns = {}
+    rows = []
+    for position, col in enumerate(df.columns):
+        series = df.iloc[:, position]
+        optimized = _downcast_series(series, category_ratio)
+        columns[position] = optimized
+        rows.append((col, str(series.dtype), str(optimized.dtype),
+                     int(series.memory_usage(deep=True, index=False)),
+                     int(optimized.memory_usage(deep=True, index=False))))
+    result = pd.concat(columns, axis=1) if columns else df.copy()
+    result.columns = df.columns
+    result.index = df.index
+    report = pd.DataFrame(rows, columns=['列', '原类型', '新类型', '优化前字节', '优化后字节'])
+    return result, report.set_index('列')
+
+
+def describe_memory_report(report):
+    """生成内存优化报告文本"""
+    before = report['优化前字节'].sum()
+    after = report['优化后字节'].sum()
+    text = f"优化前: {before / 1024 / 1024:.1f} MB → 优化后: {after / 1024 / 1024:.1f} MB"
+    if before:
+        text += f" (节省 {(1 - after / before) * 100:.1f}%)"
+    text += "\n"
+    changed = report[report['原类型'] != report['新类型']]
+    for col, row in changed.iterrows():
+        text += (f"  {col}: {row['原类型']} → {row['新类型']} "
+                 f"({row['优化前字节'] / 1024:.1f} KB → {row['优化后字节'] / 1024:.1f} KB)\n")
+    return text
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""异常值处理: IQR/Z-score边界、异常单元格判定以及删除/截断/标记策略"""
+
+from .lazy import LazyModule
+from .executors import float64_values, frame_outlier_stats, get_column_executor, get_row_executor
+from .fileio import widen_arrow_integers
+
+np = LazyModule('numpy', 'np', globals())
+pd = LazyModule('pandas', 'pd', globals())
+
+
+OUTLIER_POLICIES = ["删除异常行", "截断到边界", "标记异常行"]
+OUTLIER_FLAG_COLUMN = '是否异常'
+
+
+def iqr_bounds(q1, q3):
+    """由四分位数计算IQR上下界 (闭区间)"""
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def zscore_bounds(mean, std):
+    """由均值和标准差计算|z|<3对应的上下界 (开区间)，标准差为0时不判定异常"""
+    std = std.where(std > 0) if isinstance(std, pd.Series) else (std if std > 0 else np.nan)
+    return mean - 3 * std, mean + 3 * std
+
+
+def compute_outlier_bounds(df, numeric_cols, method):
+    """按列并行计算所有数值列的上下界，返回 (lower, upper) 两个Series"""
+    stats = get_column_executor().map(frame_outlier_stats, df[numeric_cols], method)
+    if method == "IQR方法":
+        return iqr_bounds(stats.loc[0.25], stats.loc[0.75])
+    return zscore_bounds(stats.loc['mean'], stats.loc['std'])
+
+
+def outlier_cells(values, lower, upper, method):
+    """异常单元格判定 (数组与上下界按广播比较)，缺失值和无法计算的边界不视为异常"""
+    with np.errstate(invalid='ignore'):
+        if method == "IQR方法":
+            return (values < lower) | (values > upper)
+        return (values <= lower) | (values >= upper)
+
+
+def outlier_cell_mask(df, numeric_cols, lower, upper, method):
+    """返回异常单元格布尔矩阵 (行 × 数值列)，缺失值和无法计算边界的列不视为异常"""
+    values = df[numeric_cols].to_numpy(dtype=float, na_value=np.nan)
+    return outlier_cells(values, np.asarray(lower, dtype=float), np.asarray(upper, dtype=float), method)
+
+
+def apply_outlier_policy(df, numeric_cols, lower, upper, method, policy="删除异常行"):
+    """按策略处理异常值，只做一次整表筛选/赋值，返回 (DataFrame, 异常行数, 异常单元格数)"""
+    numeric_cols = list(numeric_cols)
+    if not numeric_cols:
+        return df, 0, 0
+    cells = outlier_cell_mask(df, numeric_cols, lower, upper, method)
+    rows = cells.any(axis=1)
+
+    if policy == "截断到边界":
+        df = df.copy()
+        df[numeric_cols] = df[numeric_cols].clip(lower=lower, upper=upper, axis=1)
+    elif policy == "标记异常行":
+        df = df.copy()
+        df[OUTLIER_FLAG_COLUMN] = rows
+    else:
+        df = df[~rows]
+    return df, int(rows.sum()), int(cells.sum())
+
+
+def describe_outlier_result(method, policy, row_count, cell_count):
+    """生成异常值处理的操作记录"""
+    if policy == "截断到边界":
+        return f"{method}处理异常值: 截断 {cell_count} 个单元格 ({row_count} 行)"
+    if policy == "标记异常行":
+        return f"{method}处理异常值: 标记 {row_count} 行"
+    return f"{method}处理异常值: 移除 {row_count} 行"
+
+
+def outlier_rows_kernel(arrays, start, stop, lower, upper, method, clip_index):
+    """异常值分片: 在保留行(keep)上判定异常单元格并写出异常行标记rows
+
+    clip_index[i]不为-1的列同时把截断到边界后的整列写到输出列clipped[clip_index[i]]。
+    返回 (各列异常单元格数, 各截断列低于下界/高于上界的元素数)。
+    """
+    keep = arrays['keep'][start:stop]
+    rows = arrays['rows'][start:stop]
+    rows[:] = False
+    counts = np.zeros(len(lower), dtype=np.int64)
+    sides = np.zeros((max(clip_index, default=-1) + 1, 2), dtype=np.int64)
+    for i, (x, lo, hi) in enumerate(zip(arrays['values'], lower, upper)):
+        part = x[start:stop]
+        cells = outlier_cells(part, lo, hi, method) & keep
+        counts[i] = np.count_nonzero(cells)
+        rows |= cells
+        if clip_index[i] >= 0:
+            # 与Series.clip一致: 缺失值和无法计算的边界保持不变
+            with np.errstate(invalid='ignore'):
+                below, above = part < lo, part > hi
+                clipped = np.where(below, lo, part)
+                np.copyto(arrays['clipped'][clip_index[i]][start:stop],
+                          np.where(clipped > hi, hi, clipped))
+            sides[clip_index[i]] = np.count_nonzero(below), np.count_nonzero(above)
+    return counts, sides
+
+
+def clipped_dtype(series, lower, upper, below, above):
+    """串行截断 (widen_arrow_integers后clip) 得到的dtype
+
+    clip逐侧用where替换越界元素，只有确有元素越界的一侧才按边界值决定是否升级类型，
+    因此在一个元素上按同样顺序替换即可得到结果类型；串行截断会报错时同样抛出异常。
+    """
+    probe = widen_arrow_integers(series.iloc[:1], lower, upper)
+    if below:
+        probe = probe.where([False], lower)
+    if above:
+        probe = probe.where([False], upper)
+    return probe.dtype
+
+
+def outlier_rows(columns, lower, upper, method, keep, clip=False):
+    """按行分片判定异常值 (columns为整列Series，keep为保留行掩码)
+
+    返回 (原表长度的异常行标记, 各列异常单元格数, 截断后的列列表)；clip=True时数值列并行截断
+    (非float64列转为float64计算后转回串行截断的结果类型)，无法无损转为float64或串行截断会报错的列
+    在截断后的列表中为None，由调用方串行截断。
+    """
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    values, clip_index, clip_count = [], [], 0
+    for series in columns:
+        exact = float64_values(series) if clip else None
+        values.append(series.to_numpy(dtype=np.float64, na_value=np.nan) if exact is None else exact)
+        if exact is not None:
+            clip_index.append(clip_count)
+            clip_count += 1
+        else:
+            clip_index.append(-1)
+    outputs = {'rows': (None, np.bool_)}
+    if clip_count:
+        outputs['clipped'] = (clip_count, np.float64)
+    arrays, results = get_row_executor().run(outlier_rows_kernel, {'values': values, 'keep': keep},
+                                             outputs, lower, upper, method, clip_index)
+    counts = np.sum([shard_counts for shard_counts, _ in results], axis=0)
+    sides = np.sum([shard_sides for _, shard_sides in results], axis=0)
+    clipped = [None] * len(columns)
+    for i, series in enumerate(columns):
+        if clip_index[i] < 0:
+            continue
+        result = pd.Series(arrays['clipped'][clip_index[i]], index=series.index, name=series.name)
+        if series.dtype != np.float64:
+            below, above = sides[clip_index[i]]
+            try:
+                result = result.astype(clipped_dtype(series, lower[i], upper[i], below, above))
+            except (TypeError, ValueError):
+                continue
+        clipped[i] = result
+    return arrays['rows'], counts, clipped
@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""清洗计划: 把清洗配置编译为惰性执行计划 (LazyFrame + CleaningPlan)，可导出/导入JSON配方"""
+
+import json
+
+from .lazy import LazyModule
+from .tracing import stage
+from .dedup import (DEDUP_KEEP_OPTIONS, DUPLICATE_FLAG_COLUMN, FINGERPRINT_BITS, NEAR_DUPLICATE_COLUMN,
+                    NEAR_DUP_THRESHOLD, column_fingerprints, duplicated_fingerprints, near_duplicate_clusters,
+                    near_duplicated)
+from .fileio import widen_arrow_integers
+from .executors import fill_missing_columns, frame_fill_values, get_column_executor, get_row_executor
+from .outliers import (OUTLIER_FLAG_COLUMN, OUTLIER_POLICIES, compute_outlier_bounds, describe_outlier_result,
+                       outlier_cell_mask, outlier_rows)
+
+np = LazyModule('numpy', 'np', globals())
+pd = LazyModule('pandas', 'pd', globals())
+
+
+FILL_ACTIONS = ["均值填充", "中位数填充", "众数填充"]
+MISSING_ACTIONS = ["无操作", "删除含缺失值的行", "删除含缺失值的列"] + FILL_ACTIONS
+DUPLICATE_ACTIONS = ["无操作", "删除重复行", "标记重复行", "删除近似重复行", "标记近似重复行"]
+NEAR_DUPLICATE_ACTIONS = ["删除近似重复行", "标记近似重复行"]  # 需要整表，不支持流式清洗
+OUTLIER_ACTIONS = ["无操作", "IQR方法", "Z-score方法"]
+
+DEFAULT_CLEANING_CONFIG = {
+    'missing_action': "无操作",
+    'duplicate_action': "无操作",
+    'outlier_action': "无操作",
+    'outlier_policy': OUTLIER_POLICIES[0],
+    'dedup_subset': None,
+    'dedup_keep': 'first',
+    'fingerprint_bits': 64,
+    'near_threshold': NEAR_DUP_THRESHOLD,
+}
+
+
+def clean_dataframe(df, config, progress_callback=None, null_counts=None):
+    """按清洗配置(或配方)执行缺失值、重复值、异常值处理
+
+    返回 (清洗后的DataFrame, 操作记录列表, 已知的数据概况结论)。
+    null_counts为已知的各列缺失值数量 (如数据概况中已计算的结果)，用于跳过无缺失的列。
+    """
+    return CleaningPlan.coerce(config).execute(df, null_counts, progress_callback)
+
+
+RECIPE_VERSION = 1
+RECIPE_STEPS = ['missing', 'duplicate', 'outlier']
+RECIPE_FILE_TYPES = [("清洗配方", "*.json")]
+
+
+class LazyFrame:
+    """清洗计划执行期间的惰性数据视图
+
+    原表不做修改: 删行只累积到布尔掩码，删列只更新列名列表，填充/截断/标记生成的列
+    记录为覆盖列，最后由materialize()一次完成行列筛选。
+    """
+
+    def __init__(self, df, null_counts=None):
+        self.df = df
+        self.columns = list(df.columns)
+        self.mask = np.ones(len(df), dtype=bool)
+        self.overrides = {}
+        self.numeric = set(df.select_dtypes(include=[np.number]).columns)
+        self.null_free = set()
+        if null_counts is not None:
+            self.null_free = {col for col, count in null_counts.items() if count == 0}
+
+    @property
+    def all_rows(self):
+        return bool(self.mask.all())
+
+    @property
+    def n_rows(self):
+        return int(self.mask.sum())
+
+    def numeric_columns(self):
+        return [col for col in self.columns if col in self.numeric]
+
+    def column(self, col):
+        """返回整列 (含已被掩码删除的行)"""
+        return self.overrides[col] if col in self.overrides else self.df[col]
+
+    def rows(self, col):
+        """返回该列在当前保留行上的取值"""
+        series = self.column(col)
+        return series if self.all_rows else series[self.mask]
+
+    def set_column(self, col, values, null_free=False):
+        """覆盖已有列或在末尾追加新列 (values为与原表等长的Series)"""
+        if col not in self.columns:
+            self.columns.append(col)
+        self.overrides[col] = values
+        if null_free:
+            self.null_free.add(col)
+        else:
+            self.null_free.discard(col)
+
+    def null_mask(self, col):
+        """返回该列在保留行中的缺失位置，已知无缺失时返回None"""
+        if col in self.null_free:
+            return None
+        isna = self.column(col).isna().to_numpy() & self.mask
+        if not isna.any():
+            self.null_free.add(col)
+            return None
+        return isna
+
+    def expand(self, values):
+        """将保留行上的布尔结果展开为原表长度 (被删除的行为False)"""
+        if self.all_rows:
+            return np.asarray(values, dtype=bool)
+        full = np.zeros(len(self.mask), dtype=bool)
+        full[self.mask] = values
+        return full
+
+    def drop_rows(self, drop):
+        """从保留行中删除drop为True的行，返回实际删除的行数"""
+        drop = drop & self.mask
+        self.mask &= ~drop
+        return int(drop.sum())
+
+    def materialize(self):
+        """一次性按掩码和列名列表生成结果表，再写入覆盖列 (新增列追加在末尾)"""
+        rows = slice(None) if self.all_rows else np.flatnonzero(self.mask)
+        original = [col for col in self.columns if col in self.df.columns]
+        result = self.df.iloc[rows, [self.df.columns.get_loc(col) for col in original]]
+        for position, col in enumerate(self.columns):
+            if col not in self.overrides:
+                continue
+            values = self.overrides[col].iloc[rows].array
+            if position < len(original):
+                result.isetitem(position, values)
+            else:
+                # insert不触发pandas 2.x对切片赋值的SettingWithCopyWarning
+                result.insert(len(result.columns), col, values)
+        return result
+
+
+class CleaningPlan:
+    """惰性清洗计划
+
+    清洗步骤是JSON友好的字典列表 (可保存为配方文件在界面或命令行中重放)。执行时不逐步复制整表:
+    删除缺失值行、删除重复行、删除异常行融合为同一个行掩码，删列只作用于列名列表，
+    填充/截断只生成受影响的列，已知无缺失值的列跳过缺失值计算，最后只做一次行列筛选。
+    """
+
+    def __init__(self, steps=None):
+        self.steps = [self.validate_step(step) for step in (steps or [])]
+
+    @staticmethod
+    def validate_step(step):
+        """检查单个步骤并补全默认参数"""
+        kind = step.get('step')
+        if kind == 'missing':
+            if step.get('action') not in MISSING_ACTIONS:
+                raise ValueError(f"未知的缺失值处理: {step.get('action')}")
+            return {'step': kind, 'action': step['action']}
+        if kind == 'duplicate':
+            if step.get('action') not in DUPLICATE_ACTIONS:
+                raise ValueError(f"未知的重复值处理: {step.get('action')}")
+            keep = step.get('keep', 'first')
+            if keep not in DEDUP_KEEP_OPTIONS.values():
+                raise ValueError(f"未知的重复行保留方式: {keep}")
+            bits = int(step.get('bits', 64))
+            if bits not in FINGERPRINT_BITS:
+                raise ValueError(f"不支持的指纹位数: {bits}")
+            validated = {'step': kind, 'action': step['action'], 'subset': step.get('subset') or None,
+                         'keep': keep, 'bits': bits}
+            if step['action'] in NEAR_DUPLICATE_ACTIONS:
+                try:
+                    threshold = float(step.get('threshold', NEAR_DUP_THRESHOLD))
+                except (TypeError, ValueError):
+                    raise ValueError(f"近似重复的相似度阈值无效: {step.get('threshold')}") from None
+                if not 0 < threshold <= 1:
+                    raise ValueError(f"近似重复的相似度阈值必须在0和1之间: {threshold}")
+                validated['threshold'] = threshold
+            return validated
+        if kind == 'outlier':
+            if step.get('method') not in OUTLIER_ACTIONS:
+                raise ValueError(f"未知的异常值处理: {step.get('method')}")
+            policy = step.get('policy', OUTLIER_POLICIES[0])
+            if policy not in OUTLIER_POLICIES:
+                raise ValueError(f"未知的异常值策略: {policy}")
+            return {'step': kind, 'method': step['method'], 'policy': policy}
+        raise ValueError(f"未知的清洗步骤: {kind}")
+
+    @classmethod
+    def from_config(cls, config):
+        """由清洗配置(见DEFAULT_CLEANING_CONFIG)生成计划，无操作的步骤不进入计划"""
+        config = {**DEFAULT_CLEANING_CONFIG, **(config or {})}
+        steps = []
+        if config['missing_action'] != "无操作":
+            steps.append({'step': 'missing', 'action': config['missing_action']})
+        if config['duplicate_action'] != "无操作":
+            steps.append({'step': 'duplicate', 'action': config['duplicate_action'],
+                          'subset': config['dedup_subset'], 'keep': config['dedup_keep'],
+                          'bits': int(config['fingerprint_bits']),
+                          'threshold': config['near_threshold']})
+        if config['outlier_action'] != "无操作":
+            steps.append({'step': 'outlier', 'method': config['outlier_action'],
+                          'policy': config['outlier_policy']})
+        return cls(steps)
+
+    @classmethod
+    def from_recipe(cls, recipe):
+        """由配方字典生成计划"""
+        version = recipe.get('version', RECIPE_VERSION)
+        if version > RECIPE_VERSION:
+            raise ValueError(f"配方版本 {version} 高于当前支持的版本 {RECIPE_VERSION}")
+        return cls(recipe.get('steps', []))
+
+    @classmethod
+    def load(cls, path):
+        """读取JSON配方文件"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_recipe(json.load(f))
+
+    @classmethod
+    def coerce(cls, obj):
+        """接受CleaningPlan、配方字典或清洗配置字典"""
+        if isinstance(obj, cls):
+            return obj
+        if obj and 'steps' in obj:
+            return cls.from_recipe(obj)
+        return cls.from_config(obj)
+
+    @property
+    def streamable(self):
+        """能否由ChunkedCleaner分块执行 (近似去重需要整表)"""
+        return not any(step.get('action') in NEAR_DUPLICATE_ACTIONS for step in self.steps)
+
+    def to_recipe(self):
+        return {'version': RECIPE_VERSION, 'steps': [dict(step) for step in self.steps]}
+
+    def save(self, path):
+        """保存为JSON配方文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_recipe(), f, ensure_ascii=False, indent=2)
+
+    def to_config(self):
+        """转换回清洗配置 (界面选项和流式清洗使用)，每类步骤最多一个且按缺失值→重复值→异常值顺序"""
+        kinds = [step['step'] for step in self.steps]
+        if len(set(kinds)) != len(kinds) or kinds != sorted(kinds, key=RECIPE_STEPS.index):
+            raise ValueError("该配方的步骤顺序无法转换为清洗选项 (每类步骤最多一个，"
+                             "且按缺失值→重复值→异常值排列)")
+        config = dict(DEFAULT_CLEANING_CONFIG)
+        for step in self.steps:
+            if step['step'] == 'missing':
+                config['missing_action'] = step['action']
+            elif step['step'] == 'duplicate':
+                config.update(duplicate_action=step['action'], dedup_subset=step['subset'],
+                              dedup_keep=step['keep'], fingerprint_bits=step['bits'],
+                              near_threshold=step.get('threshold', NEAR_DUP_THRESHOLD))
+            else:
+                config.update(outlier_action=step['method'], outlier_policy=step['policy'])
+        return config
+
+    def describe(self):
+        """计划的文字说明 (每步一行)"""
+        lines = []
+        for i, step in enumerate(self.steps, 1):
+            if step['step'] == 'missing':
+                text = f"缺失值: {step['action']}"
+            elif step['step'] == 'duplicate':
+                keys = ", ".join(step['subset']) if step['subset'] else "全部列"
+                detail = (f"相似度≥{step['threshold']:.2f}" if step['action'] in NEAR_DUPLICATE_ACTIONS
+                          else f"{step['bits']}位指纹")
+                text = f"重复值: {step['action']} (键列: {keys}, 保留: {step['keep']}, {detail})"
+            else:
+                text = f"异常值: {step['method']} / {step['policy']}"
+            lines.append(f"{i}. {text}")
+        return lines or ["(空计划)"]
+
+    def execute(self, df, null_counts=None, progress_callback=None):
+        """单遍执行计划，返回 (清洗后的DataFrame, 操作记录列表, 已知的数据概况结论)"""
+        lazy = LazyFrame(df, null_counts)
+        operations = []
+        unique_rows = False
+        for i, step in enumerate(self.steps):
+            if progress_callback:
+                progress_callback(100 * i / (len(self.steps) + 1))
+            with stage(f"clean.{step['step']}", rows_in=int(lazy.mask.sum())) as record:
+                if step['step'] == 'missing':
+                    operation, changed = self._run_missing(lazy, step['action'])
+                elif step['step'] == 'duplicate':
+                    operation, changed = self._run_duplicate(lazy, step)
+                    if step['action'] == "删除重复行" and not step['subset']:
+                        unique_rows = True
+                else:
+                    operation, changed = self._run_outlier(lazy, step['method'], step['policy'])
+                record.rows_out = int(lazy.mask.sum())
+            if operation:
+                operations.append(operation)
+            # 改变取值或删列后，之前全表去重的结论不再成立
+            if changed:
+                unique_rows = False
+
+        if progress_callback:
+            progress_callback(100 * len(self.steps) / (len(self.steps) + 1))
+        with stage('clean.materialize', rows_in=len(df)) as record:
+            result = lazy.materialize()
+            record.rows_out = len(result)
+        if progress_callback:
+            progress_callback(100)
+
+        # 已知结论直接写入新版本的数据概况，避免重新全表扫描
+        known = {}
+        if all(col in lazy.null_free for col in result.columns):
+            known['null_counts'] = pd.Series(0, index=result.columns, dtype='int64')
+        if unique_rows:
+            known['duplicate_mask'] = np.zeros(len(result), dtype=bool)
+        return result, operations, known
+
+    @staticmethod
+    def _run_missing(lazy, action):
+        """缺失值步骤，返回 (操作记录, 是否改变了取值或列)"""
+        if action == "删除含缺失值的行":
+            drop = np.zeros(len(lazy.mask), dtype=bool)
+            for col in lazy.columns:
+                isna = lazy.null_mask(col)
+                if isna is not None:
+                    drop |= isna
+            count = lazy.drop_rows(drop)
+            lazy.null_free.update(lazy.columns)
+            return f"删除含缺失值的行: {count} 行", False
+
+        if action == "删除含缺失值的列":
+            dropped = [col for col in lazy.columns if lazy.null_mask(col) is not None]
+            lazy.columns = [col for col in lazy.columns if col not in dropped]
+            return f"删除含缺失值的列: {len(dropped)} 列", bool(dropped)
+
+        numeric_cols = lazy.numeric_columns()
+        if not numeric_cols:
+            return None, False
+        targets = [col for col in numeric_cols if lazy.null_mask(col) is not None]
+        data = pd.DataFrame({col: lazy.rows(col).array for col in targets})
+        fill_values = get_column_executor().map(frame_fill_values, data, action) if targets else {}
+        fills = [(col, value) for col, value in zip(targets, list(fill_values)) if not pd.isna(value)]
+        filled_columns = fill_missing_columns([lazy.column(col) for col, _ in fills],
+                                              [value for _, value in fills])
+        for (col, _), series in zip(fills, filled_columns):
+            lazy.set_column(col, series, null_free=True)
+        filled = len(fills)
+        if not filled:
+            return f"{action}: 数值列无可填充的缺失值，已跳过", False
+        return f"使用{action[:-2]}填充数值列缺失值 ({filled} 列)", True
+
+    @staticmethod
+    def _run_duplicate(lazy, step):
+        """重复值步骤: 只对保留行的键列求指纹"""
+        subset = step['subset'] or lazy.columns
+        missing = [col for col in subset if col not in lazy.columns]
+        if missing:
+            raise ValueError(f"去重键列不存在: {missing}")
+        if step['action'] in NEAR_DUPLICATE_ACTIONS:
+            return CleaningPlan._run_near_duplicate(lazy, step, subset)
+        if subset:
+            fingerprints = column_fingerprints((lazy.rows(col) for col in subset), step['bits'])
+            dup_mask = lazy.expand(duplicated_fingerprints(fingerprints, step['keep']))
+        else:
+            # 没有可比较的列 (如缺失值步骤删掉了全部列)，与DataFrame.duplicated一致不视为重复
+            dup_mask = np.zeros(len(lazy.mask), dtype=bool)
+        count = int(dup_mask.sum())
+        if step['action'] == "删除重复行":
+            lazy.drop_rows(dup_mask)
+            return f"删除重复行: {count} 行", False
+        lazy.set_column(DUPLICATE_FLAG_COLUMN, pd.Series(dup_mask, index=lazy.df.index),
+                        null_free=True)
+        return f"标记重复行: {count} 行", False
+
+    @staticmethod
+    def _run_near_duplicate(lazy, step, subset):
+        """近似重复: 在保留行的键列上聚类，标记时写入簇编号列，删除时每簇按keep保留"""
+        if not step['subset']:
+            subset = [col for col in subset if col != NEAR_DUPLICATE_COLUMN]
+        cluster_ids, candidates = near_duplicate_clusters((lazy.rows(col) for col in subset),
+                                                          step['threshold'], lazy.n_rows)
+        clusters = int(cluster_ids.max()) if len(cluster_ids) else 0
+        detail = f"{clusters} 个簇, 相似度≥{step['threshold']:.2f}, 候选对 {candidates:,} 个"
+        if step['action'] == "删除近似重复行":
+            count = lazy.drop_rows(lazy.expand(near_duplicated(cluster_ids, step['keep'])))
+            return f"删除近似重复行: {count} 行 ({detail})", False
+        full = np.zeros(len(lazy.mask), dtype=np.int64)
+        full[lazy.mask] = cluster_ids
+        column = pd.Series(full, index=lazy.df.index).where(full > 0).astype('Int64')
+        lazy.set_column(NEAR_DUPLICATE_COLUMN, column)
+        return f"标记近似重复行: {int((cluster_ids > 0).sum())} 行 ({detail})", False
+
+    @staticmethod
+    def _run_outlier(lazy, method, policy):
+        """异常值步骤: 只在保留行的数值列上计算边界"""
+        numeric_cols = lazy.numeric_columns()
+        if not numeric_cols:
+            return None, False
+        data = pd.DataFrame({col: lazy.rows(col).array for col in numeric_cols})
+        lower, upper = compute_outlier_bounds(data, numeric_cols, method)
+        clipped = [None] * len(numeric_cols)
+        if get_row_executor().enabled(len(lazy.mask)):
+            # 边界已由全表统计量确定，逐行判定和截断按行分片并行
+            rows, cell_counts, clipped = outlier_rows([lazy.column(col) for col in numeric_cols],
+                                                      lower, upper, method, lazy.mask,
+                                                      clip=policy == "截断到边界")
+        else:
+            cells = outlier_cell_mask(data, numeric_cols, lower, upper, method)
+            rows, cell_counts = lazy.expand(cells.any(axis=1)), cells.sum(axis=0)
+        row_count, cell_count = int(rows.sum()), int(cell_counts.sum())
+
+        if policy == "截断到边界":
+            for position, col in enumerate(numeric_cols):
+                if cell_counts[position]:
+                    null_free = col in lazy.null_free
+                    series = clipped[position]
+                    if series is None:
+                        series = widen_arrow_integers(lazy.column(col), lower[col], upper[col])
+                        series = series.clip(lower[col], upper[col])
+                    lazy.set_column(col, series, null_free)
+        elif policy == "标记异常行":
+            lazy.set_column(OUTLIER_FLAG_COLUMN, pd.Series(rows, index=lazy.df.index),
+                            null_free=True)
+        else:
+            lazy.drop_rows(rows)
+        return (describe_outlier_result(method, policy, row_count, cell_count),
+                policy == "截断到边界" and cell_count > 0)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""近似统计: 可合并的分位数 (KLL)、基数 (HyperLogLog) 和矩统计"""
+
+from .lazy import LazyModule
+
+np = LazyModule('numpy', 'np', globals())
+pd = LazyModule('pandas', 'pd', globals())
+
+
+def moments_of(values):
+    """一组数值(不含NaN)的(计数, 均值, M2)统计量"""
+    if not len(values):
+        return 0, 0.0, 0.0
+    mean = values.mean()
+    return len(values), mean, ((values - mean) ** 2).sum()
+
+
+def merge_moments(a, b):
+    """合并两组(计数, 均值, M2)统计量 (Chan并行算法)"""
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta ** 2 * n_a * n_b / n
+    return n, mean, m2
+
+
+SKETCH_RELATIVE_ERROR = 0.01  # 默认误差: 分位数的归一化秩误差 / 唯一值个数的相对标准误差
+KLL_RANK_FACTOR = 3.0  # 压缩参数 k = KLL_RANK_FACTOR / 误差
+
+
+class KLLSketch:
+    """KLL分位数草图 - 可合并，分位数的秩误差约为 relative_error × 值个数
+
+    第h层的每个元素代表2^h个原始值；某层超过容量时排序并随机保留奇数位或偶数位元素提升到上一层。
+    值个数不超过容量时保存全部原始值，分位数与pandas的线性插值结果一致。
+    """
+
+    def __init__(self, relative_error=SKETCH_RELATIVE_ERROR, seed=0):
+        self.relative_error = relative_error
+        self.k = max(8, int(np.ceil(KLL_RANK_FACTOR / relative_error)))
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def exact(self):
+        return len(self.levels) == 1
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self.levels)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        """加入一批数值 (忽略NaN)"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """合并另一个草图 (如其他数据块或其他进程的结果)"""
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        """自底向上压缩超出容量的层: 排序后保留一半元素 (权重加倍) 提升到上一层"""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            items = np.sort(items)
+            even = len(items) - len(items) % 2
+            self.levels[level] = items[even:]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            promoted = items[self._rng.integers(2):even:2]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantile(self, q):
+        """近似q分位数 (线性插值意义下的第 q×(n-1) 个值)"""
+        if self.n == 0:
+            return np.nan
+        if self.exact:
+            return float(np.percentile(self.levels[0], q * 100))
+        if q <= 0:
+            return float(self.min)
+        if q >= 1:
+            return float(self.max)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cum = np.cumsum(weights[order])
+        position = min(int(np.searchsorted(cum, q * (self.n - 1), side='right')), len(order) - 1)
+        return float(items[order[position]])
+
+
+class HyperLogLog:
+    """HyperLogLog唯一值个数估计 - 相对标准误差约为 1.04/√m，寄存器逐位取最大值即可合并"""
+
+    def __init__(self, relative_error=SKETCH_RELATIVE_ERROR):
+        # 2^11~2^18个寄存器 (误差约2.3%~0.2%)，保证64位哈希的剩余位数不超过53位以便用frexp精确求位长
+        self.p = int(np.clip(np.ceil(np.log2((1.04 / relative_error) ** 2)), 11, 18))
+        self.registers = np.zeros(1 << self.p, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update_hashes(self, hashes):
+        """加入一批64位哈希值"""
+        if not len(hashes):
+            return self
+        width = 64 - self.p
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        rest = hashes & np.uint64((1 << width) - 1)
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        np.maximum.at(self.registers, index, (width - bit_length + 1).astype(np.uint8))
+        return self
+
+    def update(self, series):
+        """加入一列取值 (不含缺失值)"""
+        values = series.dropna()
+        return self.update_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # 小基数时改用线性计数
+        return int(round(estimate))
+
+
+class ColumnSketch:
+    """单列的流式统计: 计数/缺失/均值/标准差/最值精确，分位数和唯一值个数近似"""
+
+    def __init__(self, relative_error=SKETCH_RELATIVE_ERROR):
+        self.count = 0
+        self.nulls = 0
+        self.numeric = True
+        self.moments = (0, 0.0, 0.0)
+        self.quantiles = KLLSketch(relative_error)
+        self.distinct = HyperLogLog(relative_error)
+
+    def update(self, series):
+        nulls = int(series.isnull().sum())
+        self.nulls += nulls
+        self.count += len(series) - nulls
+        self.distinct.update(series)
+        dtype = series.dtype
+        if not pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            self.numeric = False
+        if self.numeric:
+            values = series.to_numpy(dtype=float, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            self.moments = merge_moments(self.moments, moments_of(values))
+            self.quantiles.update(values)
+
+    def merge(self, other):
+        self.count += other.count
+        self.nulls += other.nulls
+        self.numeric = self.numeric and other.numeric
+        self.moments = merge_moments(self.moments, other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        return self
+
+    def summary(self):
+        summary = {'non_null': self.count, 'missing': self.nulls,
+                   'distinct_approx': self.distinct.estimate(), 'numeric': self.numeric}
+        if self.numeric and self.count:
+            n, mean, m2 = self.moments
+            summary.update(mean=float(mean), std=float(np.sqrt(m2 / (n - 1))) if n > 1 else None,
+                           min=float(self.quantiles.min), max=float(self.quantiles.max),
+                           q1=self.quantiles.quantile(0.25), median=self.quantiles.quantile(0.5),
+                           q3=self.quantiles.quantile(0.75), quantiles_exact=self.quantiles.exact)
+        return summary
@@ -0,0 +1,882 @@
+# -*- coding: utf-8 -*-
+"""流式清洗: 分块多遍扫描大文件的清洗 (ChunkedCleaner)、增量清洗和流式概况"""
+
+from pathlib import Path
+import io
+import os
+import shutil
+import hashlib
+import tempfile
+import contextlib
+
+from .lazy import LazyModule
+from .tracing import Stage, stage
+from .formats import JSON_LINES_EXTENSIONS, file_format, is_json_lines, open_compressed, split_compression
+from .encoding import detect_encoding
+from .dedup import DEDUP_MEMORY_BUDGET, DUPLICATE_FLAG_COLUMN, FingerprintDeduplicator, row_fingerprints
+from .fileio import (DEFAULT_CHUNK_SIZE, can_stream, complete_lines_end, iter_data_chunks, read_data_file,
+                     write_json_lines_chunk)
+from .outliers import apply_outlier_policy, describe_outlier_result, iqr_bounds, zscore_bounds
+from .sketches import ColumnSketch, HyperLogLog, KLLSketch, SKETCH_RELATIVE_ERROR, merge_moments, moments_of
+from .plan import DEFAULT_CLEANING_CONFIG, FILL_ACTIONS, NEAR_DUPLICATE_ACTIONS
+
+np = LazyModule('numpy', 'np', globals())
+pd = LazyModule('pandas', 'pd', globals())
+
+
+COUNTS_MEMORY_BUDGET = 256 * 1024 * 1024  # 精确中位数/众数/IQR的值计数在内存中的总预算 (按列平分)，超出时溢写到磁盘
+COUNTS_MIN_BLOCK = 4096  # 归并各run时每个run每次至少读入的值个数
+
+
+def merge_sorted_counts(values, counts):
+    """合并按值排序的 (值, 计数) 数组中相同的值"""
+    if len(values) == 0:
+        return values, counts
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    return values[starts], np.add.reduceat(counts, starts)
+
+
+class ValueCounts:
+    """单列数值的精确值计数 (LSM结构)
+
+    每批值的计数为按值排序的 (值, 计数) run，按大小逐级归并；内存超过预算时归并写入磁盘
+    成为有序run文件，之后以内存映射方式读取。分位数和众数按值从小到大分块多路归并各run得出，
+    结果与全部在内存中计数一致，所需内存只取决于预算而与不同值的个数无关。
+    """
+
+    def __init__(self, memory_budget=COUNTS_MEMORY_BUDGET, spill_dir=None):
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.total = 0
+        self._runs = []
+        self._disk_runs = []
+        self._attached = []
+        self._tmpdir = None
+
+    @property
+    def memory_bytes(self):
+        return sum(values.nbytes + counts.nbytes for values, counts in self._runs)
+
+    @property
+    def spilled_runs(self):
+        return len(self._disk_runs)
+
+    def update(self, values):
+        """加入一批值 (忽略缺失值)"""
+        values = np.asarray(values, dtype=float)
+        values, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+        if not len(values):
+            return
+        self.total += int(counts.sum())
+        self._runs.append((values, counts.astype(np.int64)))
+        # 相邻run大小相近时归并，保持run数量为O(log n)
+        while len(self._runs) > 1 and len(self._runs[-2][0]) <= 2 * len(self._runs[-1][0]):
+            right = self._runs.pop()
+            left = self._runs.pop()
+            self._runs.append(self._merge([left, right]))
+        if self.memory_bytes > self.memory_budget:
+            self._spill()
+
+    @staticmethod
+    def _merge(runs):
+        values = np.concatenate([run[0] for run in runs])
+        counts = np.concatenate([run[1] for run in runs])
+        order = np.argsort(values, kind='stable')
+        return merge_sorted_counts(values[order], counts[order])
+
+    @staticmethod
+    def _load(path):
+        return np.load(f"{path}_values.npy", mmap_mode='r'), np.load(f"{path}_counts.npy", mmap_mode='r')
+
+    def _spill(self):
+        """将内存中的run归并写入磁盘"""
+        values, counts = self._merge(self._runs)
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.mkdtemp(prefix='datacleanpro_counts_', dir=self.spill_dir)
+        path = os.path.join(self._tmpdir, f"run_{len(self._disk_runs)}")
+        np.save(f"{path}_values.npy", values)
+        np.save(f"{path}_counts.npy", counts)
+        self._disk_runs.append(self._load(path))
+        self._runs = []
+
+    def iter_sorted(self):
+        """按值从小到大分块产出合并了各run的 (值, 计数)"""
+        runs = self._attached + self._disk_runs + ([self._merge(self._runs)] if self._runs else [])
+        block = max(self.memory_budget // (16 * max(len(runs), 1)), COUNTS_MIN_BLOCK)
+        pos = [0] * len(runs)
+        while True:
+            active = [i for i, (values, _) in enumerate(runs) if pos[i] < len(values)]
+            if not active:
+                return
+            # 本轮上界取各run本块末尾值的最小值: 不超过上界的值在各run中都落在本块内 (run内的值互不相同)
+            bound = min(runs[i][0][min(pos[i] + block, len(runs[i][0])) - 1] for i in active)
+            parts = []
+            for i in active:
+                values, counts = runs[i]
+                end = pos[i] + int(np.searchsorted(values[pos[i]:pos[i] + block], bound, side='right'))
+                parts.append((np.asarray(values[pos[i]:end]), np.asarray(counts[pos[i]:end])))
+                pos[i] = end
+            yield self._merge(parts)
+
+    def quantiles(self, qs):
+        """计算各分位数，与pandas线性插值结果一致 (没有值时为NaN)"""
+        if self.total == 0:
+            return [np.nan] * len(qs)
+        positions = [(self.total - 1) * q for q in qs]
+        found = {}
+        for pos in positions:
+            found[int(np.floor(pos))] = found[int(np.ceil(pos))] = None
+        pending = sorted(found)
+        seen = 0
+        for values, counts in self.iter_sorted():
+            cum = seen + np.cumsum(counts)
+            while pending and pending[0] < cum[-1]:
+                rank = pending.pop(0)
+                found[rank] = values[np.searchsorted(cum, rank, side='right')]
+            if not pending:
+                break
+            seen = int(cum[-1])
+        result = []
+        for pos in positions:
+            v_lo, v_hi = found[int(np.floor(pos))], found[int(np.ceil(pos))]
+            result.append(v_lo + (v_hi - v_lo) * (pos - int(np.floor(pos))))
+        return result
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def mode(self):
+        """众数 (并列时取最小值，与Series.mode().iloc[0]一致；没有值时为NaN)"""
+        best, best_count = np.nan, 0
+        for values, counts in self.iter_sorted():
+            i = int(np.argmax(counts))
+            if counts[i] > best_count:
+                best, best_count = values[i], counts[i]
+        return best
+
+    def save(self, path):
+        """把全部计数归并为一对有序的.npy文件 (path + '_values.npy' / '_counts.npy')"""
+        size = sum(len(values) for values, _ in self.iter_sorted())
+        if size == 0:
+            np.save(f"{path}_values.npy", np.empty(0, dtype=float))
+            np.save(f"{path}_counts.npy", np.empty(0, dtype=np.int64))
+            return
+        out_values = np.lib.format.open_memmap(f"{path}_values.npy", mode='w+', dtype=float, shape=(size,))
+        out_counts = np.lib.format.open_memmap(f"{path}_counts.npy", mode='w+', dtype=np.int64, shape=(size,))
+        start = 0
+        for values, counts in self.iter_sorted():
+            out_values[start:start + len(values)] = values
+            out_counts[start:start + len(values)] = counts
+            start += len(values)
+        out_values.flush()
+        out_counts.flush()
+        del out_values, out_counts
+
+    def attach(self, path):
+        """以内存映射方式挂载save()保存的计数文件 (只读，close时不删除)"""
+        run = self._load(path)
+        self._attached.append(run)
+        self.total += int(run[1].sum())
+
+    def close(self):
+        """释放内存映射并删除溢写文件"""
+        self._runs = []
+        self._disk_runs = []
+        self._attached = []
+        self.total = 0
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+
+class ChunkedCleaner:
+    """分块流式清洗 - 峰值内存取决于块大小而非文件大小
+
+    统计遍: 统计列类型、缺失值数量及填充值
+    去重扫描遍: (仅keep='last'/全部删除需要) 预扫描全部行指纹
+    异常值统计遍: (仅异常值处理需要) 重放缺失值/重复值步骤并统计异常值边界
+    输出遍: 逐块清洗并追加写入输出文件
+
+    可同时传入多个输入文件 (CSV、JSON Lines或xlsx的一个工作表)，按顺序合并输出并跨文件去重；
+    输出路径为 .jsonl/.ndjson (可加 .gz 等压缩扩展名) 时写出JSON Lines，否则写出CSV。
+    中位数/众数填充和IQR边界默认按精确值计数计算，计数超过counts_memory_budget时溢写到磁盘；
+    sketch_error不为None时，中位数填充和IQR边界改用KLL分位数草图 (内存与文件大小无关，结果为近似值)。
+    """
+
+    def __init__(self, missing_action="无操作", duplicate_action="无操作",
+                 outlier_action="无操作", chunksize=DEFAULT_CHUNK_SIZE,
+                 encoding=None, progress_callback=None, outlier_policy="删除异常行",
+                 dedup_subset=None, dedup_keep='first', fingerprint_bits=64,
+                 memory_budget=DEDUP_MEMORY_BUDGET, sketch_error=None, sheet=None,
+                 counts_memory_budget=COUNTS_MEMORY_BUDGET):
+        self.missing_action = missing_action
+        self.duplicate_action = duplicate_action
+        self.outlier_action = outlier_action
+        self.outlier_policy = outlier_policy
+        self.chunksize = chunksize
+        self.progress_callback = progress_callback
+        self.sketch_error = sketch_error
+        self.sheet = sheet
+        self.counts_memory_budget = counts_memory_budget
+
+        self.encoding = encoding
+        self.encodings = {}
+        self.columns = None
+        self.dtypes = {}
+        self.numeric_cols = []
+        self.null_counts = None
+        self.fill_values = {}
+        self.outlier_bounds = None
+        self.rows_in = self.rows_out = 0
+        self.columns_out = None
+        self.byte_ranges = {}  # 文件路径 → 只读取的 (起始, 结束) 字节区间
+        # 跨块累计的统计量 (增量清洗时从上次的状态恢复)
+        self._non_numeric = set()
+        self._sums, self._counts, self._value_counts, self._sketches = {}, {}, {}, {}
+        self._moments, self._distributions = {}, {}
+
+        if duplicate_action in NEAR_DUPLICATE_ACTIONS:
+            raise ValueError(f"流式清洗不支持{duplicate_action} (需要整表聚类)，请加载后清洗")
+        self.deduplicator = None
+        if duplicate_action in ["删除重复行", "标记重复行"]:
+            self.deduplicator = FingerprintDeduplicator(dedup_subset, dedup_keep, fingerprint_bits,
+                                                        memory_budget)
+        self._passes = 2
+        if self.deduplicator is not None and self.deduplicator.needs_scan:
+            self._passes += 1
+        if outlier_action != "无操作":
+            self._passes += 1
+        self._pass_index = 0
+        self._rows_read = 0
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """由清洗配置(见DEFAULT_CLEANING_CONFIG)创建"""
+        config = {**DEFAULT_CLEANING_CONFIG, **(config or {})}
+        return cls(config['missing_action'], config['duplicate_action'], config['outlier_action'],
+                   outlier_policy=config['outlier_policy'], dedup_subset=config['dedup_subset'],
+                   dedup_keep=config['dedup_keep'],
+                   fingerprint_bits=int(config['fingerprint_bits']), **kwargs)
+
+    def _iter_chunks(self, file_paths, stage_name=None):
+        """按块依次读取各CSV/JSON Lines文件，并按已读取字节数报告进度
+
+        progress_callback(百分比, rows=累计行数, nbytes=累计字节数)，计数跨多遍累加。
+        指定stage_name时整遍 (含调用方对各块的处理) 计为一个阶段。
+        """
+        total_bytes = max(sum(self._input_bytes(path) for path in file_paths), 1)
+        done_bytes = 0
+
+        def report(nbytes):
+            if self.progress_callback:
+                done = min((done_bytes + nbytes) / total_bytes, 1.0)
+                self.progress_callback((self._pass_index + done) / self._passes * 100,
+                                       rows=self._rows_read,
+                                       nbytes=int((self._pass_index + done) * total_bytes))
+
+        with (stage(stage_name, rows_in=0, bytes_read=total_bytes) if stage_name
+              else contextlib.nullcontext(Stage(None, rows_in=0))) as record:
+            for file_path in file_paths:
+                for chunk in iter_data_chunks(file_path, self.chunksize, self.encodings[file_path],
+                                              report, self.sheet, self.byte_ranges.get(file_path),
+                                              self.columns):
+                    yield chunk
+                    record.rows_in += len(chunk)
+                    self._rows_read += len(chunk)
+                done_bytes += self._input_bytes(file_path)
+        self._pass_index += 1
+
+    def _input_bytes(self, file_path):
+        if file_path in self.byte_ranges:
+            start, end = self.byte_ranges[file_path]
+            return end - start
+        return os.path.getsize(file_path)
+
+    def _harmonize(self, chunk):
+        """统一各块的数值列类型，避免同一列在不同块中为int/float"""
+        for col in self.numeric_cols:
+            if col in chunk.columns and chunk[col].dtype != self.dtypes[col]:
+                chunk[col] = chunk[col].astype(self.dtypes[col])
+        return chunk
+
+    def collect_stats(self, file_paths):
+        """统计遍: 统计全局列类型、缺失值和填充值"""
+        for file_path in file_paths:
+            if file_path in self.encodings:
+                continue
+            if file_format(file_path) == '.csv':
+                self.encodings[file_path] = self.encoding or detect_encoding(file_path)[0]
+            else:
+                self.encodings[file_path] = None
+        dtypes = dict(self.dtypes)
+        non_numeric = self._non_numeric
+        null_counts = self.null_counts
+        sums, counts, value_counts, sketches = self._sums, self._counts, self._value_counts, self._sketches
+        need_counts = self.missing_action in ["中位数填充", "众数填充"]
+        use_sketch = self.missing_action == "中位数填充" and self.sketch_error is not None
+
+        for chunk in self._iter_chunks(file_paths, 'stream.stats'):
+            if self.columns is None:
+                self.columns = list(chunk.columns)
+            elif list(chunk.columns) != self.columns:
+                raise ValueError(f"输入文件的列不一致: {list(chunk.columns)} ≠ {self.columns}")
+            chunk_nulls = chunk.isnull().sum()
+            null_counts = chunk_nulls if null_counts is None else null_counts + chunk_nulls
+
+            for col in chunk.columns:
+                if col in non_numeric:
+                    continue
+                dtype = chunk[col].dtype
+                if not pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+                    non_numeric.add(col)
+                    dtypes.pop(col, None)
+                    continue
+                dtypes[col] = dtype if col not in dtypes else np.result_type(dtypes[col], dtype)
+
+                if self.missing_action == "均值填充":
+                    sums[col] = sums.get(col, 0.0) + chunk[col].sum()
+                    counts[col] = counts.get(col, 0) + chunk[col].count()
+                elif use_sketch:
+                    if col not in sketches:
+                        sketches[col] = KLLSketch(self.sketch_error)
+                    sketches[col].update(chunk[col].to_numpy(dtype=float, na_value=np.nan))
+                elif need_counts:
+                    if col not in value_counts:
+                        value_counts[col] = self._new_counts()
+                    value_counts[col].update(chunk[col].to_numpy(dtype=float, na_value=np.nan))
+
+        self.dtypes = dtypes
+        self.numeric_cols = [col for col in self.columns if col in dtypes]
+        self.null_counts = null_counts
+
+        if self.missing_action in FILL_ACTIONS:
+            for col in self.numeric_cols:
+                if self.missing_action == "均值填充":
+                    self.fill_values[col] = sums[col] / counts[col] if counts.get(col) else np.nan
+                elif use_sketch:
+                    self.fill_values[col] = sketches[col].quantile(0.5) if col in sketches else np.nan
+                elif col not in value_counts:
+                    self.fill_values[col] = np.nan
+                elif self.missing_action == "中位数填充":
+                    self.fill_values[col] = value_counts[col].quantile(0.5)
+                else:
+                    self.fill_values[col] = value_counts[col].mode()
+
+    def _new_counts(self):
+        """新建一列的精确值计数，内存预算按列平分"""
+        return ValueCounts(self.counts_memory_budget // max(len(self.columns or ()), 1))
+
+    def _all_counts(self):
+        return [counts for counts in list(self._value_counts.values()) + list(self._distributions.values())
+                if isinstance(counts, ValueCounts)]
+
+    def close_counts(self):
+        """删除值计数的溢写文件"""
+        for counts in self._all_counts():
+            counts.close()
+
+    def _apply_missing(self, chunk):
+        if self.missing_action == "删除含缺失值的行":
+            return chunk.dropna()
+        if self.missing_action == "删除含缺失值的列":
+            keep = [col for col in chunk.columns if self.null_counts[col] == 0]
+            return chunk[keep]
+        if self.missing_action in FILL_ACTIONS and self.fill_values:
+            return chunk.fillna(self.fill_values)
+        return chunk
+
+    def _apply_duplicates(self, chunk):
+        if self.deduplicator is None:
+            return chunk
+        dup_mask = self.deduplicator.duplicated(chunk)
+        if self.duplicate_action == "删除重复行":
+            return chunk[~dup_mask]
+        chunk = chunk.copy()
+        chunk[DUPLICATE_FLAG_COLUMN] = dup_mask
+        return chunk
+
+    def scan_duplicates(self, file_paths):
+        """去重扫描遍: keep='last'/全部删除时预先扫描全部行指纹"""
+        if self.deduplicator is None or not self.deduplicator.needs_scan:
+            return
+        for chunk in self._iter_chunks(file_paths, 'stream.scan_duplicates'):
+            self.deduplicator.scan(self._apply_missing(self._harmonize(chunk)))
+
+    def _outlier_cols(self, chunk):
+        return [col for col in self.numeric_cols if col in chunk.columns]
+
+    def collect_outlier_stats(self, file_paths):
+        """异常值统计遍: 在缺失值/重复值处理后的数据上统计异常值边界"""
+        if self.outlier_action == "无操作":
+            return
+        moments, distributions = self._moments, self._distributions
+        for chunk in self._iter_chunks(file_paths, 'stream.outlier_stats'):
+            chunk = self._apply_duplicates(self._apply_missing(self._harmonize(chunk)))
+            for col in self._outlier_cols(chunk):
+                series = chunk[col].astype(float)
+                if self.outlier_action == "IQR方法" and self.sketch_error is not None:
+                    if col not in distributions:
+                        distributions[col] = KLLSketch(self.sketch_error)
+                    distributions[col].update(series.to_numpy())
+                elif self.outlier_action == "IQR方法":
+                    if col not in distributions:
+                        distributions[col] = self._new_counts()
+                    distributions[col].update(series.to_numpy())
+                else:
+                    moments[col] = merge_moments(moments.get(col, (0, 0.0, 0.0)),
+                                                 moments_of(series.dropna().to_numpy()))
+        if self.deduplicator is not None:
+            self.deduplicator.reset()
+
+        cols = [col for col in self.numeric_cols if col in distributions or col in moments]
+        if self.outlier_action == "IQR方法":
+            q1, q3 = [], []
+            for col in cols:
+                if self.sketch_error is not None:
+                    q1.append(distributions[col].quantile(0.25))
+                    q3.append(distributions[col].quantile(0.75))
+                    continue
+                lo, hi = distributions[col].quantiles([0.25, 0.75])
+                q1.append(lo)
+                q3.append(hi)
+            lower, upper = iqr_bounds(pd.Series(q1, index=cols, dtype=float),
+                                      pd.Series(q3, index=cols, dtype=float))
+        else:
+            stats = [moments[col] for col in cols]
+            mean = pd.Series([m[1] if m[0] else np.nan for m in stats], index=cols, dtype=float)
+            std = pd.Series([np.sqrt(m[2] / (m[0] - 1)) if m[0] > 1 else np.nan for m in stats],
+                            index=cols, dtype=float)
+            lower, upper = zscore_bounds(mean, std)
+        self.outlier_bounds = (lower, upper)
+
+    def _apply_outliers(self, chunk):
+        """按全局边界处理当前块的异常值，返回 (块, 异常行数, 异常单元格数)"""
+        if self.outlier_action == "无操作" or self.outlier_bounds is None:
+            return chunk, 0, 0
+        lower, upper = self.outlier_bounds
+        cols = [col for col in lower.index if col in chunk.columns]
+        return apply_outlier_policy(chunk, cols, lower[cols], upper[cols],
+                                    self.outlier_action, self.outlier_policy)
+
+    def run(self, file_paths, output_path):
+        """执行流式清洗，file_paths可为单个路径或路径列表，返回操作记录列表"""
+        if isinstance(file_paths, (str, Path)):
+            file_paths = [file_paths]
+        file_paths = [str(path) for path in file_paths]
+        try:
+            return self._run(file_paths, output_path)
+        finally:
+            if self.deduplicator is not None:
+                self.deduplicator.close()
+            self.close_counts()
+
+    def _run(self, file_paths, output_path, append=False):
+        """依次执行各遍；append=True时追加到已有输出文件末尾 (不写表头，列须与self.columns_out一致)"""
+        self.collect_stats(file_paths)
+        self.scan_duplicates(file_paths)
+        self.collect_outlier_stats(file_paths)
+
+        rows_in = 0
+        rows_after_missing = rows_after_duplicates = rows_out = 0
+        duplicate_marked = outlier_rows = outlier_cells = 0
+        columns_out = self.columns_out if append else None
+        input_bytes = sum(self._input_bytes(path) for path in file_paths)
+        output_format, compression = split_compression(output_path)
+        json_lines = output_format in JSON_LINES_EXTENSIONS
+        output_size = os.path.getsize(output_path) if append else 0
+        mode = 'ab' if append else 'wb'
+        try:
+            # 追加时文件开头已有BOM，不再写入
+            with stage('stream.output', bytes_read=input_bytes) as record, \
+                    open_compressed(output_path, mode, compression) as (raw, stream), \
+                    io.TextIOWrapper(stream, encoding='utf-8' if json_lines or append else 'utf-8-sig',
+                                     newline='') as out:
+                for chunk in self._iter_chunks(file_paths):
+                    rows_in += len(chunk)
+                    chunk = self._apply_missing(self._harmonize(chunk))
+                    rows_after_missing += len(chunk)
+                    chunk = self._apply_duplicates(chunk)
+                    rows_after_duplicates += len(chunk)
+                    if DUPLICATE_FLAG_COLUMN in chunk.columns:
+                        duplicate_marked += int(chunk[DUPLICATE_FLAG_COLUMN].sum())
+                    chunk, chunk_rows, chunk_cells = self._apply_outliers(chunk)
+                    outlier_rows += chunk_rows
+                    outlier_cells += chunk_cells
+                    rows_out += len(chunk)
+                    if append and list(chunk.columns) != columns_out:
+                        raise ValueError(f"清洗后的列与已有输出文件不一致: {list(chunk.columns)} ≠ {columns_out}")
+                    if json_lines:
+                        write_json_lines_chunk(chunk, out)
+                    else:
+                        chunk.to_csv(out, index=False, header=columns_out is None)
+                    columns_out = list(chunk.columns)
+                out.flush()
+                record.rows_in, record.rows_out = rows_in, rows_out
+                record.bytes_written = raw.tell() - output_size
+        except BaseException:
+            # 取消或出错时不留下半个输出文件 (追加时截断回原有内容)
+            if append:
+                os.truncate(output_path, output_size)
+            else:
+                Path(output_path).unlink(missing_ok=True)
+            raise
+
+        operations = []
+        if self.missing_action == "删除含缺失值的行":
+            operations.append(f"删除含缺失值的行: {rows_in - rows_after_missing} 行")
+        elif self.missing_action == "删除含缺失值的列":
+            dropped = int((self.null_counts > 0).sum()) if self.null_counts is not None else 0
+            operations.append(f"删除含缺失值的列: {dropped} 列")
+        elif self.missing_action in FILL_ACTIONS and self.numeric_cols:
+            operations.append(f"使用{self.missing_action[:-2]}填充数值列缺失值")
+        if self.duplicate_action == "删除重复行":
+            operations.append(f"删除重复行: {rows_after_missing - rows_after_duplicates} 行 "
+                              f"({self.deduplicator.describe()})")
+        elif self.duplicate_action == "标记重复行":
+            operations.append(f"标记重复行: {duplicate_marked} 行 ({self.deduplicator.describe()})")
+        if self.outlier_action != "无操作" and self.outlier_bounds is not None:
+            operations.append(describe_outlier_result(self.outlier_action, self.outlier_policy,
+                                                      outlier_rows, outlier_cells))
+        if self.sketch_error is not None and (self.missing_action == "中位数填充"
+                                              or self.outlier_action == "IQR方法"):
+            operations.append(f"分位数为KLL草图近似值 (秩误差≈{self.sketch_error:.1%})")
+        spilled = sum(counts.spilled_runs for counts in self._all_counts())
+        if spilled:
+            operations.append(f"值计数超出内存预算，溢写 {spilled} 个有序run到磁盘后归并 (中位数/众数/IQR仍为精确值)")
+        self.rows_in, self.rows_out, self.columns_out = rows_in, rows_out, columns_out
+        operations.append(f"{'追加' if append else '流式'}输出: {rows_out} 行 → {Path(output_path).name}")
+        return operations
+
+
+# ---- 增量清洗 ----
+
+INCREMENTAL_STATE_SUFFIX = '.state'  # 状态目录: 输出文件路径 + 该后缀
+INCREMENTAL_STATE_FILE = 'state.pkl'
+INCREMENTAL_STATE_VERSION = 2
+INCREMENTAL_CHECK_BYTES = 64 * 1024  # 校验已处理部分未被改写: 比对开头及偏移之前各这么多字节的摘要
+INCREMENTAL_MAX_FINGERPRINT_FILES = 8  # 每次运行新增一个指纹文件，超过该个数时合并为一个
+
+
+def byte_digest(file_path, start, end):
+    """文件 [start, end) 字节区间的SHA-1摘要"""
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(end - start)).hexdigest()
+
+
+class IncrementalCleaner(ChunkedCleaner):
+    """只追加写入的文件的增量流式清洗 - 再次运行时只解析并清洗上次之后追加的行
+
+    状态目录 (默认为 输出路径 + '.state') 保存已处理的字节偏移和行数、列类型、去重指纹、
+    填充值的累计量 (均值的和与计数、中位数/众数的值计数或KLL草图) 及异常值边界的累计量
+    (Z-score的矩、IQR的值计数或草图)。新追加的行按合并新数据后的统计量清洗并追加到输出文件，
+    已写出的行不再改写，因此均值等统计量变化时与重新全量清洗的结果可能略有不同。
+    清洗配置变化、输入文件的已处理部分被改写或截断、输出文件被改动时自动改为全量清洗。
+    末尾没有换行符的行视为仍在写入，留待下次处理。
+    """
+
+    def __init__(self, *args, state_dir=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.missing_action == "删除含缺失值的列":
+            raise ValueError("增量清洗不支持删除含缺失值的列 (已写出的行无法再删除列)")
+        if self.deduplicator is not None and self.deduplicator.needs_scan:
+            raise ValueError("增量清洗的去重只支持保留首次出现 (已写出的行无法再删除)")
+        self.state_dir = state_dir
+        self.state_path = None
+        self.state = None
+        self.full_reason = None  # 本次为全量清洗时的原因
+        self.rows_total = 0
+
+    def recipe(self):
+        """影响清洗结果的设置，变化时需要全量清洗"""
+        return {
+            'missing_action': self.missing_action,
+            'duplicate_action': self.duplicate_action,
+            'outlier_action': self.outlier_action,
+            'outlier_policy': self.outlier_policy,
+            'dedup_subset': self.deduplicator.subset if self.deduplicator else None,
+            'fingerprint_bits': self.deduplicator.bits if self.deduplicator else None,
+            'sketch_error': self.sketch_error,
+            'encoding': self.encoding,
+        }
+
+    def _load_state(self, state_dir, file_path, output_path):
+        """读取上次的状态并校验，不能增量时返回 (None, 原因)"""
+        path = state_dir / INCREMENTAL_STATE_FILE
+        if not path.exists():
+            return None, "首次运行"
+        try:
+            state = pd.read_pickle(path)
+        except Exception:
+            return None, "状态文件损坏"
+        if state.get('version') != INCREMENTAL_STATE_VERSION or state['recipe'] != self.recipe():
+            return None, "清洗配置已变化"
+        if state['input'] != str(Path(file_path).resolve()):
+            return None, "输入文件已变化"
+        offset = state['offset']
+        head = min(offset, INCREMENTAL_CHECK_BYTES)
+        if os.path.getsize(file_path) < offset \
+                or byte_digest(file_path, 0, head) != state['head_digest'] \
+                or byte_digest(file_path, offset - INCREMENTAL_CHECK_BYTES if offset > head else 0,
+                               offset) != state['tail_digest']:
+            return None, "输入文件已被改写或截断"
+        if not Path(output_path).exists() or os.path.getsize(output_path) != state['output_size']:
+            return None, "输出文件已被改动"
+        return state, None
+
+    def _attach_fingerprints(self):
+        if self.deduplicator is not None and self.state is not None:
+            for name in self.state['fingerprint_files']:
+                self.deduplicator.seen.attach(self.state_path / name)
+
+    def _restore(self, file_path):
+        """由状态恢复列信息和各项累计量"""
+        state = self.state
+        self.columns = state['columns']
+        self.columns_out = state['columns_out']
+        self.dtypes = state['dtypes']
+        self.null_counts = state['null_counts']
+        self.encodings[file_path] = state['encoding']
+        self._non_numeric = state['non_numeric']
+        self._sums, self._counts, value_counts, self._sketches = state['fill_stats']
+        self._moments, distributions = state['outlier_stats']
+        self._value_counts = self._attach_counts(value_counts)
+        self._distributions = self._attach_counts(distributions)
+        self._attach_fingerprints()
+
+    def _attach_counts(self, saved):
+        """挂载状态目录中保存的值计数文件 (KLL草图原样返回)"""
+        restored = {}
+        for col, value in saved.items():
+            if isinstance(value, str):
+                restored[col] = self._new_counts()
+                restored[col].attach(self.state_path / value)
+            else:
+                restored[col] = value
+        return restored
+
+    def collect_outlier_stats(self, file_paths):
+        super().collect_outlier_stats(file_paths)
+        # 统计遍结束时已重置去重状态，重新挂载已保存的指纹
+        if self.outlier_action != "无操作":
+            self._attach_fingerprints()
+
+    def run(self, file_paths, output_path):
+        """执行增量清洗 (只支持单个未压缩的CSV/JSON Lines输入和输出)，返回操作记录列表"""
+        if not isinstance(file_paths, (str, Path)):
+            if len(file_paths) != 1:
+                raise ValueError("增量清洗只支持单个输入文件")
+            file_paths = file_paths[0]
+        file_path = str(file_paths)
+        if split_compression(file_path)[1] is not None \
+                or not (file_format(file_path) == '.csv' or is_json_lines(file_path)):
+            raise ValueError("增量清洗的输入只支持未压缩的CSV或JSON Lines文件")
+        if split_compression(output_path)[1] is not None \
+                or file_format(output_path) not in ['.csv'] + JSON_LINES_EXTENSIONS:
+            raise ValueError("增量清洗的输出只支持未压缩的CSV或JSON Lines文件")
+        self.state_path = Path(self.state_dir or str(output_path) + INCREMENTAL_STATE_SUFFIX)
+        self.state, self.full_reason = self._load_state(self.state_path, file_path, output_path)
+        start = self.state['offset'] if self.state else 0
+        end = complete_lines_end(file_path, start)
+        try:
+            if self.state is None:
+                self.byte_ranges[file_path] = (0, end)
+                operations = [f"全量清洗 ({self.full_reason})"]
+                operations += self._run([file_path], output_path)
+                self.rows_total = self.rows_out
+            elif end == start:
+                self.rows_in = self.rows_out = 0
+                self.columns, self.columns_out = self.state['columns'], self.state['columns_out']
+                self.rows_total = self.state['rows_out']
+                return [f"增量清洗: 没有新追加的完整行 (已处理 {self.state['rows_in']} 行)"]
+            else:
+                self._restore(file_path)
+                self.byte_ranges[file_path] = (start, end)
+                operations = [f"增量清洗: 新追加 {end - start:,} 字节 "
+                              f"(已处理 {self.state['rows_in']} 行)"]
+                operations += self._run([file_path], output_path, append=True)
+                self.rows_total = self.state['rows_out'] + self.rows_out
+            self._save_state(file_path, output_path, end)
+        finally:
+            if self.deduplicator is not None:
+                self.deduplicator.close()
+            self.close_counts()
+        if end < os.path.getsize(file_path):
+            operations.append("末尾未完成的行 (无换行符) 留待下次处理")
+        operations.append(f"输出文件累计 {self.rows_total} 行")
+        return operations
+
+    def _save_state(self, file_path, output_path, offset):
+        """保存本次运行后的状态: 新增的指纹写为一个文件，文件过多时合并；各列的值计数归并为一对文件"""
+        previous = self.state
+        state_path = self.state_path
+        if previous is None and state_path.exists():
+            shutil.rmtree(state_path)
+        state_path.mkdir(parents=True, exist_ok=True)
+        generation = previous['generation'] + 1 if previous else 1
+        files = list(previous['fingerprint_files']) if previous else []
+        obsolete = []
+        if self.deduplicator is not None:
+            name = f"fingerprints_{generation}.npy"
+            if self.deduplicator.seen.save(state_path / name):
+                files.append(name)
+            else:
+                (state_path / name).unlink()
+            self.deduplicator.close()  # 释放内存映射后才能在Windows上删除或合并
+            if len(files) > INCREMENTAL_MAX_FINGERPRINT_FILES:
+                merged = np.concatenate([np.load(state_path / f) for f in files])
+                name = f"fingerprints_{generation}_merged.npy"
+                np.save(state_path / name, np.sort(merged, kind='mergesort'))
+                obsolete, files = files, [name]
+
+        saved_counts, counts_files = [], []
+        for kind, store in (('fill', self._value_counts), ('outlier', self._distributions)):
+            names = {}
+            for i, (col, counts) in enumerate(store.items()):
+                if isinstance(counts, ValueCounts):
+                    names[col] = f"counts_{kind}_{i}_{generation}"
+                    counts.save(state_path / names[col])
+                    counts_files += [f"{names[col]}_values.npy", f"{names[col]}_counts.npy"]
+                else:
+                    names[col] = counts
+            saved_counts.append(names)
+        self.close_counts()  # 释放上次挂载的计数文件后才能在Windows上删除
+        if previous:
+            obsolete += previous['counts_files']
+
+        head = min(offset, INCREMENTAL_CHECK_BYTES)
+        state = {
+            'version': INCREMENTAL_STATE_VERSION,
+            'generation': generation,
+            'recipe': self.recipe(),
+            'input': str(Path(file_path).resolve()),
+            'offset': offset,
+            'head_digest': byte_digest(file_path, 0, head),
+            'tail_digest': byte_digest(file_path, offset - INCREMENTAL_CHECK_BYTES
+                                       if offset > head else 0, offset),
+            'rows_in': (previous['rows_in'] if previous else 0) + self.rows_in,
+            'rows_out': self.rows_total,
+            'output_size': os.path.getsize(output_path),
+            'columns': self.columns,
+            'columns_out': self.columns_out,
+            'dtypes': self.dtypes,
+            'null_counts': self.null_counts,
+            'encoding': self.encodings.get(file_path),
+            'non_numeric': self._non_numeric,
+            'fill_stats': (self._sums, self._counts, saved_counts[0], self._sketches),
+            'outlier_stats': (self._moments, saved_counts[1]),
+            'fingerprint_files': files,
+            'counts_files': counts_files,
+        }
+        tmp_path = state_path / f"{INCREMENTAL_STATE_FILE}.tmp"
+        pd.to_pickle(state, tmp_path)
+        os.replace(tmp_path, state_path / INCREMENTAL_STATE_FILE)
+        for name in obsolete:
+            (state_path / name).unlink(missing_ok=True)
+        self.state = state
+
+
+class StreamProfiler:
+    """单遍流式数据概况 - 内存只与列数和误差参数有关，与文件大小无关
+
+    不同数据块、不同文件或不同进程得到的概况可以用merge()合并。
+    """
+
+    def __init__(self, relative_error=SKETCH_RELATIVE_ERROR):
+        self.relative_error = relative_error
+        self.rows = 0
+        self.columns = {}
+        self.row_distinct = HyperLogLog(relative_error)
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        self.row_distinct.update_hashes(row_fingerprints(chunk))
+        for position, col in enumerate(chunk.columns):
+            if col not in self.columns:
+                self.columns[col] = ColumnSketch(self.relative_error)
+            self.columns[col].update(chunk.iloc[:, position])
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.row_distinct.merge(other.row_distinct)
+        for col, sketch in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(sketch)
+            else:
+                self.columns[col] = sketch
+        return self
+
+    @property
+    def nbytes(self):
+        return self.row_distinct.registers.nbytes + sum(
+            sketch.quantiles.nbytes + sketch.distinct.registers.nbytes
+            for sketch in self.columns.values())
+
+    def summary(self):
+        """JSON友好的概况 (近似值以 _approx 结尾)
+
+        重复行数 = 总行数 - 不同行数估计，其误差按不同行数计 (约2倍相对标准误差，即95%置信)。
+        """
+        distinct_rows = min(self.row_distinct.estimate(), self.rows)
+        return {
+            'rows': self.rows,
+            'relative_error': self.relative_error,
+            'missing_cells': sum(sketch.nulls for sketch in self.columns.values()),
+            'duplicate_rows_approx': self.rows - distinct_rows,
+            'duplicate_rows_error': int(2 * self.row_distinct.relative_error * distinct_rows),
+            'sketch_bytes': self.nbytes,
+            'columns': {str(col): sketch.summary() for col, sketch in self.columns.items()},
+        }
+
+    def report_text(self):
+        """与质量报告格式一致的文字报告"""
+        summary = self.summary()
+        n_rows = max(summary['rows'], 1)
+        total_cells = max(summary['rows'] * len(summary['columns']), 1)
+        completeness = (1 - summary['missing_cells'] / total_cells) * 100
+        consistency = 100 - summary['duplicate_rows_approx'] / n_rows * 100
+        text = "=== 近似数据概况 (流式草图) ===\n\n"
+        text += f"总行数: {summary['rows']:,}    草图内存: {summary['sketch_bytes'] / 1024 / 1024:.1f} MB\n"
+        text += f"误差参数: 分位数秩误差≈{self.relative_error:.1%}, 唯一值相对误差≈{self.row_distinct.relative_error:.1%}\n\n"
+        text += f"数据完整性: {completeness:.1f}%\n"
+        text += (f"数据一致性: ≈{consistency:.1f}% (重复行≈{summary['duplicate_rows_approx']:,}"
+                 f" ±{summary['duplicate_rows_error']:,})\n\n")
+        text += "各列统计:\n"
+        for col, stats in summary['columns'].items():
+            text += f"  {col}: 缺失{stats['missing'] / n_rows * 100:.1f}% 唯一值≈{stats['distinct_approx']:,}"
+            if 'median' in stats:
+                text += (f"\n      均值={stats['mean']:.4g} 最小={stats['min']:.4g} Q1≈{stats['q1']:.4g} "
+                         f"中位数≈{stats['median']:.4g} Q3≈{stats['q3']:.4g} 最大={stats['max']:.4g}")
+            text += "\n"
+        return text
+
+
+def profile_files(file_paths, chunksize=DEFAULT_CHUNK_SIZE, encoding=None,
+                  relative_error=SKETCH_RELATIVE_ERROR, progress_callback=None):
+    """单遍读取文件生成近似概况 (CSV/JSON Lines按块读取，Excel/JSON整表读取)，返回StreamProfiler"""
+    if isinstance(file_paths, (str, Path)):
+        file_paths = [file_paths]
+    profiler = StreamProfiler(relative_error)
+    total_bytes = max(sum(os.path.getsize(path) for path in file_paths), 1)
+    done_bytes = 0
+    for file_path in file_paths:
+        rows_before = profiler.rows
+        with stage('profile.scan', bytes_read=os.path.getsize(file_path)) as record:
+            if not can_stream(file_path):
+                profiler.update(read_data_file(file_path)[0])
+            else:
+                def report(nbytes):
+                    if progress_callback:
+                        nbytes = min(done_bytes + nbytes, total_bytes)
+                        progress_callback(nbytes / total_bytes * 100, rows=profiler.rows,
+                                          nbytes=nbytes)
+
+                for chunk in iter_data_chunks(file_path, chunksize, encoding, report):
+                    profiler.update(chunk)
+            record.rows_in = profiler.rows - rows_before
+        done_bytes += os.path.getsize(file_path)
+        if progress_callback:
+            progress_callback(done_bytes / total_bytes * 100, rows=profiler.rows,
+                              nbytes=done_bytes)
+    return profiler
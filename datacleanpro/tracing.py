@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""阶段计量: 各阶段的墙钟/CPU时间、行数、字节数和峰值内存，可导出为JSON或Chrome Trace"""
+
+import time
+import io
+import json
+from datetime import datetime
+import threading
+import os
+import contextvars
+from contextlib import contextmanager
+import cProfile
+import pstats
+import tracemalloc
+
+
+TRACE_FILE_TYPES = [("JSON计时文件", "*.json"), ("Chrome Trace", "*.trace.json")]
+PROFILE_TOP_FUNCTIONS = 25  # cProfile报告列出的函数数
+TRACEMALLOC_TOP_LINES = 15  # tracemalloc报告列出的分配位置数
+TRACE_HISTORY_LIMIT = 50  # 界面保留的最近计时记录数
+
+
+def rss_mb():
+    """当前进程RSS (MB)，无法获取时返回None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        return None
+
+
+def peak_rss_mb():
+    """自上次reset_peak_rss()以来的峰值RSS (MB)，仅Linux可用，否则返回None"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """重置峰值RSS (Linux写 /proc/self/clear_refs)，成功返回True"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class Stage:
+    """一个计量阶段: 墙钟/CPU时间、行数、字节数和峰值内存增量"""
+
+    def __init__(self, name, depth=0, **counters):
+        self.name = name
+        self.depth = depth
+        self.thread = threading.get_ident()
+        self.start = self.wall_seconds = self.cpu_seconds = None
+        self.memory_start = self.memory_peak = None
+        self.rows_in = counters.get('rows_in')
+        self.rows_out = counters.get('rows_out')
+        self.bytes_read = counters.get('bytes_read')
+        self.bytes_written = counters.get('bytes_written')
+
+    @property
+    def peak_delta_mb(self):
+        if self.memory_peak is None or self.memory_start is None:
+            return None
+        return max(self.memory_peak - self.memory_start, 0.0)
+
+    def to_dict(self):
+        record = {'name': self.name, 'depth': self.depth, 'thread': self.thread,
+                  'start_seconds': round(self.start, 6),
+                  'wall_seconds': round(self.wall_seconds, 6), 'cpu_seconds': round(self.cpu_seconds, 6)}
+        for key in ('rows_in', 'rows_out', 'bytes_read', 'bytes_written'):
+            if getattr(self, key) is not None:
+                record[key] = int(getattr(self, key))
+        if self.peak_delta_mb is not None:
+            record['peak_delta_mb'] = round(self.peak_delta_mb, 2)
+        return record
+
+    def describe(self):
+        """单行说明: 缩进表示嵌套层级"""
+        text = f"{'  ' * self.depth}{self.name}: {self.wall_seconds:.3f}s (CPU {self.cpu_seconds:.3f}s)"
+        if self.rows_in is not None or self.rows_out is not None:
+            text += f" | 行 {'-' if self.rows_in is None else self.rows_in}→" \
+                    f"{'-' if self.rows_out is None else self.rows_out}"
+        if self.bytes_read:
+            text += f" | 读 {self.bytes_read / 1024 / 1024:.1f} MB"
+        if self.bytes_written:
+            text += f" | 写 {self.bytes_written / 1024 / 1024:.1f} MB"
+        if self.peak_delta_mb is not None:
+            text += f" | 峰值内存 +{self.peak_delta_mb:.1f} MB"
+        return text
+
+
+_active_trace = contextvars.ContextVar('datacleanpro_trace', default=None)
+
+
+class StageTrace:
+    """一次运行(加载/清洗/保存等)的阶段计量记录
+
+    作为上下文管理器使用，期间各热点路径中的 stage() 自动记录到本对象 (按线程上下文区分)。
+    峰值内存默认取进程RSS (Linux按阶段重置VmHWM，并发任务时为近似值)；
+    deep=True 时改用tracemalloc精确统计Python/NumPy分配，并同时用cProfile剖析本次运行，开销较大。
+    """
+
+    def __init__(self, label, deep=False):
+        self.label = label
+        self.deep = deep
+        self.stages = []
+        self.created = datetime.now()
+        self.profile_text = None
+        self.allocation_text = None
+        self._open = []
+        self._root = self._root_context = None
+        self._origin = None
+        self._profiler = None
+        self._token = None
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        self._origin = time.perf_counter()
+        self._token = _active_trace.set(self)
+        if self.deep:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:  # 其他线程已在剖析 (cProfile同一时间只能有一个)
+                self._profiler = None
+        self._root_context = self._measure(self.label)
+        self._root = self._root_context.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self._root_context.__exit__(*exc)
+        finally:
+            _active_trace.reset(self._token)
+            if self._profiler is not None:
+                self._profiler.disable()
+            if self.deep and tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot().filter_traces(
+                    [tracemalloc.Filter(False, module.__file__) for module in (tracemalloc, cProfile)])
+                top = snapshot.statistics('lineno')[:TRACEMALLOC_TOP_LINES]
+                self.allocation_text = "\n".join(str(stat) for stat in top)
+                if self._started_tracemalloc:
+                    tracemalloc.stop()
+            if self._profiler is not None:
+                out = io.StringIO()
+                pstats.Stats(self._profiler, stream=out).sort_stats('cumulative').print_stats(
+                    PROFILE_TOP_FUNCTIONS)
+                self.profile_text = out.getvalue()
+                self._profiler = None
+        return False
+
+    def _memory(self):
+        """(当前, 峰值) 内存 MB"""
+        if self.deep and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            return current / 1024 / 1024, peak / 1024 / 1024
+        return rss_mb(), peak_rss_mb()
+
+    def _reset_peak(self):
+        """重置峰值计数前把已达到的峰值记入所有未结束的外层阶段"""
+        _, peak = self._memory()
+        if peak is not None:
+            for stage in self._open:
+                stage.memory_peak = max(stage.memory_peak or 0.0, peak)
+        if self.deep and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        else:
+            reset_peak_rss()
+
+    @contextmanager
+    def _measure(self, name, **counters):
+        stage = Stage(name, len(self._open), **counters)
+        self._reset_peak()
+        stage.memory_start = self._memory()[0]
+        self._open.append(stage)
+        stage.start = time.perf_counter() - self._origin
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stage
+        finally:
+            stage.wall_seconds = time.perf_counter() - wall
+            stage.cpu_seconds = time.process_time() - cpu
+            self._open.pop()
+            peak = self._memory()[1]
+            if peak is not None:
+                stage.memory_peak = max(stage.memory_peak or 0.0, peak)
+            self.stages.append(stage)
+
+    @property
+    def wall_seconds(self):
+        return self._root.wall_seconds
+
+    def ordered(self):
+        """按开始时间排列的阶段 (外层在前)"""
+        return sorted(self.stages, key=lambda stage: (stage.start, stage.depth))
+
+    def to_dict(self):
+        record = {'label': self.label, 'created': self.created.isoformat(timespec='seconds'),
+                  'timestamp': self.created.timestamp(), 'pid': os.getpid(), 'deep': self.deep,
+                  'stages': [stage.to_dict() for stage in self.ordered()]}
+        if self.profile_text:
+            record['cprofile'] = self.profile_text
+        if self.allocation_text:
+            record['tracemalloc'] = self.allocation_text
+        return record
+
+    def describe(self):
+        """多行说明: 标题 + 每个阶段一行"""
+        lines = [f"[{self.created:%H:%M:%S}] {self.label} - {self.wall_seconds:.3f}s"]
+        lines += ["  " + stage.describe() for stage in self.ordered() if stage.depth > 0]
+        return lines
+
+
+def chrome_trace_events(record):
+    """由StageTrace.to_dict()的结果生成Chrome Trace事件 (chrome://tracing / Perfetto 可直接打开)"""
+    origin = record['timestamp'] * 1e6
+    return [{'name': stage['name'], 'cat': record['label'], 'ph': 'X', 'pid': record['pid'],
+             'tid': stage['thread'], 'ts': origin + stage['start_seconds'] * 1e6,
+             'dur': stage['wall_seconds'] * 1e6,
+             'args': {key: value for key, value in stage.items()
+                      if key not in ('name', 'depth', 'thread', 'start_seconds', 'wall_seconds')}}
+            for stage in record['stages']]
+
+
+def save_traces(traces, file_path):
+    """导出计时记录 (StageTrace或其to_dict()结果): *.trace.json 为Chrome Trace格式，其余为JSON"""
+    records = [trace if isinstance(trace, dict) else trace.to_dict() for trace in traces]
+    if str(file_path).lower().endswith('.trace.json'):
+        data = {'traceEvents': [event for record in records for event in chrome_trace_events(record)],
+                'displayTimeUnit': 'ms'}
+    else:
+        data = records
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+@contextmanager
+def stage(name, **counters):
+    """计量一个阶段 (rows_in/rows_out/bytes_read/bytes_written可先传入或在with块内设置)
+
+    没有活动的StageTrace时只返回占位对象，开销可忽略。
+    """
+    trace = _active_trace.get()
+    if trace is None:
+        yield Stage(name, **counters)
+    else:
+        with trace._measure(name, **counters) as record:
+            yield record
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""测试共用的脏数据"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_dirty_frame(rows=2000, seed=0):
+    """含缺失值、完全重复行和离群值的混合类型表 (重复行打乱后分散在各处)"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'id': rng.integers(0, rows // 4, rows),
+        'amount': rng.normal(100, 15, rows).round(2),
+        'score': rng.integers(0, 50, rows).astype(float),
+        'city': rng.choice(['北京', '上海', '广州', '深圳'], rows),
+    })
+    df.loc[rng.random(rows) < 0.05, 'amount'] = np.nan
+    df.loc[rng.random(rows) < 0.01, 'amount'] = 1e4
+    df.loc[rng.random(rows) < 0.05, 'score'] = np.nan
+    df.loc[rng.random(rows) < 0.03, 'city'] = None
+    df = pd.concat([df, df.sample(frac=0.1, random_state=seed)])
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+@pytest.fixture
+def dirty_frame():
+    return make_dirty_frame()
+
+
+@pytest.fixture
+def dirty_csv(tmp_path, dirty_frame):
+    path = tmp_path / 'dirty.csv'
+    dirty_frame.to_csv(path, index=False)
+    return path
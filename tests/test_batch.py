@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""批量清洗: 命令行的并行选项传到每个工作进程"""
+
+import pytest
+
+from datacleanpro import executors
+from datacleanpro.batch import run_batch
+from datacleanpro.executors import ColumnExecutor, RowExecutor
+from datacleanpro.plan import CleaningPlan
+
+
+@pytest.fixture
+def fresh_executors(monkeypatch):
+    """4路线程执行器替换进程内共享的执行器，测试结束后关闭被重新配置出的执行器"""
+    monkeypatch.setattr(executors, '_column_executor', ColumnExecutor(workers=4, processes=False))
+    monkeypatch.setattr(executors, '_row_executor', RowExecutor(workers=4, processes=False))
+    yield
+    executors.get_column_executor().close()
+    executors.get_row_executor().close()
+
+
+@pytest.fixture
+def batch_inputs(tmp_path, dirty_frame):
+    paths = []
+    for i in range(2):
+        path = tmp_path / f'part{i}.csv'
+        dirty_frame.iloc[i * 500:(i + 1) * 500].to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def run(batch_inputs, tmp_path, workers, **options):
+    config = CleaningPlan.from_config({'missing_action': "删除含缺失值的行"}).to_recipe()
+    summaries = run_batch(batch_inputs, tmp_path / 'out', config, workers, log=lambda message: None, **options)
+    assert all(summary['status'] == 'ok' for summary in summaries)
+    return [summary['workers'] for summary in summaries]
+
+
+def test_single_process_applies_options(batch_inputs, tmp_path, fresh_executors):
+    settings = run(batch_inputs, tmp_path, 1, column_workers=2, column_processes=True,
+                   row_workers=3, row_processes=True)
+    assert settings == [{'column': 2, 'column_processes': True, 'row': 3, 'row_processes': True}] * 2
+
+
+def test_single_process_keeps_current_executors(batch_inputs, tmp_path, fresh_executors):
+    settings = run(batch_inputs, tmp_path, 1)
+    assert settings == [{'column': 4, 'column_processes': False, 'row': 4, 'row_processes': False}] * 2
+
+
+def test_worker_processes_get_options_and_share_of_workers(batch_inputs, tmp_path, fresh_executors):
+    settings = run(batch_inputs, tmp_path, 2, column_workers=8, column_processes=True,
+                   row_workers=6, row_processes=True)
+    assert settings == [{'column': 4, 'column_processes': True, 'row': 3, 'row_processes': True}] * 2
+
+
+def test_worker_processes_default_to_share_of_current_executors(batch_inputs, tmp_path, fresh_executors):
+    settings = run(batch_inputs, tmp_path, 2, row_processes=False)
+    assert settings == [{'column': 2, 'column_processes': executors.COLUMN_PROCESSES,
+                         'row': 2, 'row_processes': False}] * 2
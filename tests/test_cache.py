@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""加载缓存: 命中/未命中、源文件修改后失效、按最近使用时间淘汰"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datacleanpro import cache as cache_module
+from datacleanpro.cache import LoadCache
+from datacleanpro.fileio import read_data_file
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LoadCache(tmp_path / 'cache')
+
+
+@pytest.fixture(params=['feather', 'pickle'])
+def storage(request, monkeypatch):
+    """Feather缓存 (需要pyarrow) 和无pyarrow时的pickle缓存"""
+    if request.param == 'feather':
+        pytest.importorskip('pyarrow')
+    else:
+        monkeypatch.setattr(cache_module, 'feather', None)
+    return request.param
+
+
+def test_hit_and_miss(cache, dirty_csv, dirty_frame, storage):
+    assert cache.get(dirty_csv) is None
+    cache.put(dirty_csv, dirty_frame)
+    assert cache.usage()[0] == 1
+    assert next(cache.cache_dir.iterdir()).suffix == ('.feather' if storage == 'feather' else '.pkl')
+    pd.testing.assert_frame_equal(cache.get(dirty_csv), dirty_frame)
+    # 解析选项不同视为另一条目
+    assert cache.get(dirty_csv, {'encoding': 'gbk'}) is None
+
+
+def test_modified_source_invalidates_entry(cache, dirty_csv, dirty_frame):
+    cache.put(dirty_csv, dirty_frame)
+    stat = dirty_csv.stat()
+    os.utime(dirty_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache.get(dirty_csv) is None
+    cache.put(dirty_csv, dirty_frame)
+    with open(dirty_csv, 'a', encoding='utf-8') as f:
+        f.write("1,2.0,3.0,北京\n")
+    os.utime(dirty_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache.get(dirty_csv) is None
+
+
+def test_lru_eviction(tmp_path, cache, dirty_frame):
+    paths = []
+    for name in 'abc':
+        path = tmp_path / f'{name}.csv'
+        path.write_text(name, encoding='utf-8')
+        paths.append(path)
+    cache.put(paths[0], dirty_frame)
+    cache.put(paths[1], dirty_frame)
+    entry_size = cache.usage()[1] // 2
+    for i, entry in enumerate(sorted(cache._entries(), key=lambda p: p.stat().st_mtime)):
+        os.utime(entry, (1_000_000 + i, 1_000_000 + i))
+    # 读取a刷新其使用时间，写入c时最久未使用的b被淘汰
+    assert cache.get(paths[0]) is not None
+    cache.max_bytes = entry_size * 2
+    cache.put(paths[2], dirty_frame)
+    assert cache.usage()[0] == 2
+    assert cache.get(paths[1]) is None
+    assert cache.get(paths[0]) is not None and cache.get(paths[2]) is not None
+    assert cache.purge()[0] == 2 and cache.usage() == (0, 0)
+
+
+def test_corrupt_entry_is_a_miss(cache, dirty_csv, dirty_frame):
+    cache.put(dirty_csv, dirty_frame)
+    entry = next(cache.cache_dir.iterdir())
+    entry.write_bytes(b'not a cache file')
+    assert cache.get(dirty_csv) is None
+    assert not entry.exists()
+
+
+def test_read_data_file_uses_cache(cache, dirty_csv, monkeypatch):
+    df, info = read_data_file(dirty_csv, cache=cache)
+    assert info['cache'] == 'miss' and cache.usage()[0] == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("缓存命中时不应重新解析")
+
+    monkeypatch.setattr(pd, 'read_csv', fail)
+    cached, info = read_data_file(dirty_csv, cache=cache)
+    assert info['cache'] == 'hit'
+    # pandas 2.x的Feather把object列中的NaN读回为None，两者都是缺失值
+    pd.testing.assert_frame_equal(cached.fillna({'city': np.nan}), df)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""指纹去重: 与DataFrame.duplicated/drop_duplicates的语义一致"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datacleanpro.dedup import (NEAR_DUPLICATE_COLUMN, FingerprintDeduplicator, duplicated_rows, hash_columns,
+                                near_duplicate_clusters, near_duplicated)
+from datacleanpro.plan import clean_dataframe
+from datacleanpro.streaming import ChunkedCleaner
+
+KEEPS = ['first', 'last', False]
+
+
+@pytest.mark.parametrize('keep', KEEPS)
+@pytest.mark.parametrize('bits', [64, 128])
+@pytest.mark.parametrize('subset', [None, ['id', 'city']])
+def test_duplicated_rows_matches_pandas(dirty_frame, keep, bits, subset):
+    expected = dirty_frame.duplicated(subset, keep=keep).to_numpy()
+    np.testing.assert_array_equal(duplicated_rows(dirty_frame, subset, keep, bits), expected)
+
+
+@pytest.mark.parametrize('keep', KEEPS)
+@pytest.mark.parametrize('bits', [64, 128])
+def test_deduplicator_across_chunks_with_spill(tmp_path, dirty_frame, keep, bits):
+    """预算极小时指纹溢写为磁盘run，跨块判定结果仍与整表一致"""
+    dedup = FingerprintDeduplicator(keep=keep, bits=bits, memory_budget=1024, spill_dir=tmp_path)
+    chunks = [dirty_frame.iloc[start:start + 150] for start in range(0, len(dirty_frame), 150)]
+    if dedup.needs_scan:
+        for chunk in chunks:
+            dedup.scan(chunk)
+    mask = np.concatenate([dedup.duplicated(chunk) for chunk in chunks])
+    assert dedup.seen.spilled_runs > 0
+    np.testing.assert_array_equal(mask, dirty_frame.duplicated(keep=keep).to_numpy())
+    dedup.close()
+
+
+def test_hash_columns_without_columns_returns_one_hash_per_row():
+    hashes = hash_columns([], n_rows=3)
+    assert hashes.dtype == np.uint64
+    assert len(hashes) == 3
+
+
+@pytest.mark.parametrize('action', ["删除重复行", "标记重复行", "删除近似重复行", "标记近似重复行"])
+@pytest.mark.parametrize('keep', KEEPS)
+def test_dedup_after_dropping_every_column(action, keep):
+    """缺失值步骤删掉全部列后去重: 与drop_duplicates一样保留全部行，不报错"""
+    df = pd.DataFrame({'a': [1.0, None, 1.0], 'b': [None, 'x', 'y']})
+    result, operations, _ = clean_dataframe(df, {'missing_action': "删除含缺失值的列",
+                                                 'duplicate_action': action, 'dedup_keep': keep})
+    assert len(result) == len(df.dropna(axis=1).drop_duplicates(keep=keep)) == 3
+    assert operations[-1].split(':')[1].strip().startswith('0 行')
+
+
+@pytest.mark.parametrize('action', ["删除重复行", "标记重复行"])
+@pytest.mark.parametrize('keep', KEEPS)
+def test_streaming_dedup_after_dropping_every_column(tmp_path, action, keep):
+    src, out = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    pd.DataFrame({'a': [1, None, 1, 2], 'b': [None, 'x', 'y', 'y']}).to_csv(src, index=False)
+    config = {'missing_action': "删除含缺失值的列", 'duplicate_action': action, 'dedup_keep': keep}
+    ChunkedCleaner.from_config(config, chunksize=2).run(src, out)
+    assert len(out.read_text(encoding='utf-8-sig').splitlines()) == 5  # 表头/空行 + 4行
+
+
+NAMES = pd.Series(["北京海淀区中关村大街1号", "北京海淀区中关村大街1号 ", "ＢＥＩＪＩＮＧ  Office", "beijing office",
+                   "北京海淀区中关村大街11号", "上海浦东新区世纪大道100号", "广州天河区体育西路", None, "成都武侯区",
+                   "深圳南山区科技园"])
+
+
+def test_near_duplicate_clusters_groups_variants():
+    cluster_ids, candidates = near_duplicate_clusters([NAMES])
+    assert candidates > 0
+    # 全角/大小写/空白差异及一字之差归入同一簇，无关的键与缺失值不属于任何簇
+    assert cluster_ids[0] == cluster_ids[1] == cluster_ids[4] == 1
+    assert cluster_ids[2] == cluster_ids[3] == 2
+    assert cluster_ids[5:].tolist() == [0] * 5
+
+
+def test_near_duplicate_threshold():
+    cluster_ids, _ = near_duplicate_clusters([NAMES], threshold=1.0)
+    assert cluster_ids[:5].tolist() == [1, 1, 2, 2, 0]
+    with pytest.raises(ValueError, match="阈值"):
+        clean_dataframe(NAMES.to_frame('addr'), {'duplicate_action': "标记近似重复行", 'near_threshold': 1.5})
+
+
+def test_near_duplicate_clusters_at_scale():
+    """随机键及其单字符变体: 每个变体都与原键同簇，不同原键不合并，候选对数随行数线性增长"""
+    rng = np.random.default_rng(0)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz0123456789'))
+    originals = [''.join(rng.choice(letters, 16)) for _ in range(1500)]
+    variants = [key[:5] + '#' + key[6:] for key in originals[:500]]
+    cluster_ids, candidates = near_duplicate_clusters([pd.Series(originals + variants)])
+    np.testing.assert_array_equal(cluster_ids[1500:], cluster_ids[:500])
+    assert (cluster_ids[:500] > 0).all() and (cluster_ids[500:1500] == 0).all()
+    assert len(np.unique(cluster_ids[:500])) == 500
+    assert candidates < 100 * len(cluster_ids)
+
+
+@pytest.mark.parametrize('keep', KEEPS)
+def test_near_duplicate_actions(keep):
+    df = pd.DataFrame({'addr': NAMES, 'n': range(len(NAMES))})
+    config = {'duplicate_action': "标记近似重复行", 'dedup_keep': keep, 'dedup_subset': ['addr']}
+    marked, _, _ = clean_dataframe(df, config)
+    assert marked[NEAR_DUPLICATE_COLUMN].tolist()[:6] == [1, 1, 2, 2, 1, pd.NA]
+    dropped, operations, _ = clean_dataframe(df, {**config, 'duplicate_action': "删除近似重复行"})
+    expected = near_duplicated(marked[NEAR_DUPLICATE_COLUMN].fillna(0).to_numpy(), keep)
+    assert dropped['n'].tolist() == df['n'][~expected].tolist()
+    assert operations[-1].startswith(f"删除近似重复行: {int(expected.sum())} 行 (2 个簇")
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""编码检测: BOM、增量UTF-8校验和chardet兜底只读取有界样本"""
+
+import gzip
+
+import pandas as pd
+import pytest
+
+from datacleanpro.encoding import detect_encoding
+from datacleanpro.fileio import read_data_file
+
+TEXT = "城市,金额,备注\n北京,12.5,正常\n上海,7.0,含逗号的“引号”\n广州,3.25,测试数据\n" * 50
+
+
+@pytest.mark.parametrize('encoding, expected', [
+    ('utf-8-sig', 'utf-8-sig'),
+    ('utf-16', 'utf-16'),
+    ('utf-32', 'utf-32'),
+])
+def test_bom_fast_path(tmp_path, encoding, expected):
+    path = tmp_path / 'bom.csv'
+    path.write_bytes(TEXT.encode(encoding))
+    assert detect_encoding(path) == (expected, 1.0)
+
+
+def test_utf8_without_bom(tmp_path):
+    path = tmp_path / 'utf8.csv'
+    path.write_bytes(TEXT.encode('utf-8'))
+    # 分块边界切开多字节字符时增量解码器仍判定为合法UTF-8
+    assert detect_encoding(path, block_size=7) == ('utf-8', 1.0)
+
+
+def test_utf8_decision_stops_at_byte_budget(tmp_path):
+    path = tmp_path / 'mixed.csv'
+    head = TEXT.encode('utf-8')
+    path.write_bytes(head + "预算之外的GBK内容".encode('gbk'))
+    assert detect_encoding(path, max_bytes=len(head) - 100, block_size=1024) == ('utf-8', 0.99)
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.csv.gz'])
+def test_gbk_detected_and_parsed(tmp_path, suffix):
+    path = tmp_path / f'gbk{suffix}'
+    data = TEXT.encode('gbk')
+    path.write_bytes(gzip.compress(data) if suffix == '.csv.gz' else data)
+    encoding, _ = detect_encoding(path)
+    assert encoding == 'gb18030'
+    df, _ = read_data_file(path)
+    expected = pd.read_csv(path, encoding='gbk')
+    pd.testing.assert_frame_equal(df, expected)
+    assert df.loc[0, '城市'] == "北京"
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'utf-8-sig', 'gbk'])
+def test_read_data_file_decodes_detected_encoding(tmp_path, encoding):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(TEXT.encode(encoding))
+    df, _ = read_data_file(path)
+    assert list(df.columns) == ['城市', '金额', '备注'] and df['备注'].iloc[1] == "含逗号的“引号”"
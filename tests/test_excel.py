@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Excel: 分批读写、超过单表行数上限时拆分工作表和工作表选择"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datacleanpro import excel
+from datacleanpro.excel import (SHEET_COLUMN, SHEETS_ALL, ExcelChunkWriter, excel_header, excel_sheet_names,
+                                iter_excel_chunks, parse_sheet, read_excel_sheets, write_excel)
+
+pytest.importorskip('openpyxl')
+
+
+@pytest.fixture
+def openpyxl_reader(monkeypatch):
+    """固定使用openpyxl只读模式 (不受是否安装calamine影响)"""
+    monkeypatch.setattr(excel, 'calamine_available', lambda: False)
+
+
+def sample_frame(rows=250):
+    return pd.DataFrame({'id': np.arange(rows), 'amount': np.arange(rows) * 1.5,
+                         'city': ['北京', '上海', None, '广州', '深圳'] * (rows // 5)})
+
+
+def test_writer_splits_sheets_at_row_limit(tmp_path, openpyxl_reader):
+    df = sample_frame()
+    path = tmp_path / 'split.xlsx'
+    writer = ExcelChunkWriter(path, max_rows=101)  # 每个工作表100行数据 + 表头
+    for start in range(0, len(df), 70):
+        writer.write(df.iloc[start:start + 70])
+    writer.close()
+    assert (writer.sheets, writer.rows) == (3, 250)
+    assert excel_sheet_names(path) == ['Sheet1', 'Sheet2', 'Sheet3']
+    sizes = [sum(len(chunk) for chunk in iter_excel_chunks(path, name)) for name in ['Sheet1', 'Sheet2', 'Sheet3']]
+    assert sizes == [100, 100, 50]
+    combined = read_excel_sheets(path, SHEETS_ALL)
+    assert combined[SHEET_COLUMN].tolist() == ['Sheet1'] * 100 + ['Sheet2'] * 100 + ['Sheet3'] * 50
+    pd.testing.assert_frame_equal(combined.drop(columns=SHEET_COLUMN), df, check_dtype=False)
+
+
+def test_write_excel_in_batches(tmp_path, openpyxl_reader, monkeypatch):
+    monkeypatch.setattr(excel, 'EXCEL_BATCH_ROWS', 60)
+    df = sample_frame()
+    path = tmp_path / 'out.xlsx'
+    progress = []
+    assert write_excel(df, path, lambda percent, rows: progress.append(rows)) == 1
+    assert progress == [60, 120, 180, 240, 250]
+    pd.testing.assert_frame_equal(read_excel_sheets(path), df, check_dtype=False)
+
+
+def test_empty_frame_writes_header_only(tmp_path, openpyxl_reader):
+    path = tmp_path / 'empty.xlsx'
+    write_excel(pd.DataFrame(), path)
+    assert excel_sheet_names(path) == ['Sheet1']
+
+
+def test_chunks_skip_blank_rows(tmp_path):
+    import openpyxl
+    path = tmp_path / 'blank.xlsx'
+    book = openpyxl.Workbook()
+    sheet = book.active
+    for row in [('a', None, 'a'), (1, 2, 3), (None, None, None), (4, 5), (7, 8, 9)]:
+        sheet.append(row)
+    book.save(path)
+    chunks = list(iter_excel_chunks(path, chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    df = pd.concat(chunks)
+    assert list(df.columns) == ['a', 'Unnamed: 1', 'a.1'] and df.index.tolist() == [0, 1, 2]
+    assert df.iloc[1].tolist()[:2] == [4, 5] and pd.isna(df.iloc[1, 2])
+
+
+def test_sheet_selection(tmp_path, openpyxl_reader):
+    path = tmp_path / 'multi.xlsx'
+    with pd.ExcelWriter(path) as writer:
+        for name, start in [('一月', 0), ('二月', 10)]:
+            pd.DataFrame({'x': range(start, start + 3)}).to_excel(writer, sheet_name=name, index=False)
+    assert read_excel_sheets(path)['x'].tolist() == [0, 1, 2]
+    assert read_excel_sheets(path, '二月')['x'].tolist() == [10, 11, 12]
+    both = read_excel_sheets(path, parse_sheet("一月, 二月"))
+    assert both[SHEET_COLUMN].tolist() == ['一月'] * 3 + ['二月'] * 3
+
+
+def test_parse_sheet_and_header():
+    assert parse_sheet(None) is None and parse_sheet("  ") is None
+    assert parse_sheet(" * ") == SHEETS_ALL
+    assert parse_sheet("一月") == "一月" and parse_sheet("a,b") == ['a', 'b']
+    assert excel_header(['x', None, 'x', 'x']) == ['x', 'Unnamed: 1', 'x.1', 'x.2']
+
+
+def test_calamine_requires_module(monkeypatch):
+    monkeypatch.setattr(excel, 'python_calamine', None)
+    excel.calamine_available.cache_clear()
+    try:
+        assert not excel.calamine_available()
+    finally:
+        excel.calamine_available.cache_clear()
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""并行执行器: 按列分批和按行分片的线程池/进程池结果与串行计算一致"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datacleanpro import executors
+from datacleanpro.dataprofile import DataProfile, quality_report_text
+from datacleanpro.executors import (ColumnExecutor, column_batches, fill_missing_columns, float64_values,
+                                    frame_distinct_counts, frame_fill_values, frame_memory_usage,
+                                    frame_null_counts, frame_numeric_summary, frame_outlier_stats, row_shards,
+                                    set_column_workers, set_row_workers)
+from datacleanpro.outliers import OUTLIER_POLICIES, outlier_rows
+from datacleanpro.plan import clean_dataframe
+
+
+def make_wide_frame(rows=400, numeric=70, seed=0):
+    """多数值列 (整数/含缺失值的浮点数/离群值) 加少量文本列的宽表"""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for i in range(numeric):
+        if i % 3 == 0:
+            columns[f'n{i}'] = rng.integers(0, 20, rows)
+        else:
+            values = rng.normal(i, 5, rows).round(1)
+            values[rng.random(rows) < 0.1] = np.nan
+            values[rng.random(rows) < 0.02] = 1e5
+            columns[f'n{i}'] = values
+    for i in range(3):
+        columns[f's{i}'] = rng.choice(['a', 'b', None], rows)
+    return pd.DataFrame(columns)
+
+
+@pytest.fixture
+def wide_frame():
+    return make_wide_frame()
+
+
+@pytest.fixture(params=[False, True], ids=['threads', 'processes'])
+def column_executor(request, monkeypatch):
+    """列数阈值降为1的2路并行执行器，替换进程内共享的执行器"""
+    executor = ColumnExecutor(workers=2, processes=request.param, min_columns=1)
+    monkeypatch.setattr(executors, '_column_executor', executor)
+    yield executor
+    executor.close()
+
+
+def test_column_batches_cover_every_column():
+    for n_cols in [1, 7, 64, 1000]:
+        batches = column_batches(n_cols, 3)
+        assert [i for batch in batches for i in range(batch.start, batch.stop)] == list(range(n_cols))
+
+
+@pytest.mark.parametrize('func, args', [
+    (frame_null_counts, ()),
+    (frame_numeric_summary, ()),
+    (frame_distinct_counts, ()),
+    (frame_fill_values, ("均值填充",)),
+    (frame_fill_values, ("中位数填充",)),
+    (frame_fill_values, ("众数填充",)),
+    (frame_outlier_stats, ("IQR方法",)),
+    (frame_outlier_stats, ("Z-score方法",)),
+])
+def test_column_map_matches_serial(column_executor, wide_frame, func, args):
+    numeric = wide_frame.select_dtypes(include=[np.number])
+    expected = func(numeric, *args)
+    result = column_executor.map(func, numeric, *args)
+    assert (column_executor._pool if column_executor.processes else column_executor._threads) is not None
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    else:
+        pd.testing.assert_series_equal(result, expected, check_dtype=False)
+
+
+def test_mixed_columns_use_threads(column_executor, wide_frame):
+    """含非数值列时不写入共享内存，改由线程池计算"""
+    for func in (frame_null_counts, frame_memory_usage, frame_distinct_counts):
+        pd.testing.assert_series_equal(column_executor.map(func, wide_frame), func(wide_frame))
+    assert column_executor._pool is None
+
+
+def test_profile_matches_serial(column_executor, wide_frame):
+    parallel = DataProfile(wide_frame)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(executors, '_column_executor', ColumnExecutor(workers=1))
+        serial = DataProfile(wide_frame)
+        expected = (serial.null_counts, serial.memory_bytes, serial.numeric_summary, serial.distinct_counts)
+    pd.testing.assert_series_equal(parallel.null_counts, expected[0])
+    assert parallel.memory_bytes == expected[1]
+    pd.testing.assert_frame_equal(parallel.numeric_summary, expected[2], check_dtype=False)
+    pd.testing.assert_series_equal(parallel.distinct_counts, expected[3])
+
+
+def test_warm_profile_covers_quality_report(wide_frame, monkeypatch):
+    """后台预热后，界面线程生成质量报告不再逐列计算"""
+    profile = DataProfile(wide_frame).warm()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("质量报告不应在界面线程中逐列计算")
+
+    monkeypatch.setattr(ColumnExecutor, 'map', fail)
+    assert "唯一值≈" in quality_report_text(profile)
+
+
+@pytest.mark.parametrize('config', [
+    {'missing_action': "中位数填充", 'outlier_action': "IQR方法"},
+    {'missing_action': "众数填充", 'outlier_action': "Z-score方法", 'outlier_policy': "截断到边界"},
+    {'missing_action': "均值填充", 'duplicate_action': "删除重复行", 'outlier_action': "IQR方法",
+     'outlier_policy': "标记异常行"},
+])
+def test_clean_matches_serial(column_executor, wide_frame, config):
+    result, operations, _ = clean_dataframe(wide_frame, config)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(executors, '_column_executor', ColumnExecutor(workers=1))
+        expected, expected_ops, _ = clean_dataframe(wide_frame, config)
+    pd.testing.assert_frame_equal(result, expected)
+    assert operations == expected_ops
+
+
+def test_set_column_workers_replaces_executor(monkeypatch):
+    monkeypatch.setattr(executors, '_column_executor', None)
+    executor = set_column_workers(3, processes=True)
+    assert executors.get_column_executor() is executor
+    assert (executor.workers, executor.processes) == (3, True)
+    assert set_column_workers(1).workers == 1
+    executors.get_column_executor().close()
+
+
+@pytest.fixture(params=[False, True], ids=['threads', 'processes'])
+def row_executor(request, monkeypatch):
+    """行数阈值降为100的2路行分片执行器，替换进程内共享的执行器"""
+    monkeypatch.setattr(executors, 'ROW_PARALLEL_MIN', 100)
+    monkeypatch.setattr(executors, '_row_executor', None)
+    executor = set_row_workers(2, processes=request.param)
+    yield executor
+    executor.close()
+
+
+def serial_clean(df, config):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(executors, '_row_executor', executors.RowExecutor(workers=1))
+        return clean_dataframe(df, config)
+
+
+def test_row_shards_cover_every_row():
+    for n_rows in [1, 99, 100_001]:
+        shards = row_shards(n_rows, 3)
+        assert shards[0][0] == 0 and shards[-1][1] == n_rows
+        assert all(stop == start for (_, stop), (start, _) in zip(shards, shards[1:]))
+
+
+def test_fill_missing_columns_matches_fillna(row_executor):
+    columns = [pd.Series([1.5, np.nan] * 200, name='f'), pd.Series(pd.array([1, None] * 200, dtype='Int64')),
+               pd.Series([np.nan, 2.0] * 200, index=range(400, 800))]
+    fill_values = [0.5, 7, -1.0]
+    for result, series, value in zip(fill_missing_columns(columns, fill_values), columns, fill_values):
+        pd.testing.assert_series_equal(result, series.fillna(value))
+    pool = row_executor._pool if row_executor.processes else row_executor._threads
+    assert row_executor.enabled(400) and pool is not None
+
+
+@pytest.mark.parametrize('missing', ["均值填充", "中位数填充", "众数填充"])
+@pytest.mark.parametrize('outlier', ["IQR方法", "Z-score方法"])
+@pytest.mark.parametrize('policy', OUTLIER_POLICIES)
+def test_row_parallel_clean_matches_serial(row_executor, dirty_frame, missing, outlier, policy):
+    config = {'missing_action': missing, 'duplicate_action': "删除重复行", 'outlier_action': outlier,
+              'outlier_policy': policy}
+    result, operations, _ = clean_dataframe(dirty_frame, config)
+    assert (row_executor._pool if row_executor.processes else row_executor._threads) is not None
+    expected, expected_ops, _ = serial_clean(dirty_frame, config)
+    pd.testing.assert_frame_equal(result, expected)
+    assert operations == expected_ops
+
+
+UPCAST_DTYPES = ['float32', 'float16', 'Float64', 'Float32', 'Int64', 'UInt16', 'int32', 'uint8',
+                 'int64[pyarrow]', 'float[pyarrow]', 'double[pyarrow]']
+
+
+def make_typed_frame(rows=400, seed=1):
+    """各种非float64数值类型的列 (可含缺失值的类型约10%缺失，含离群值)"""
+    pytest.importorskip('pyarrow')
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for dtype in UPCAST_DTYPES:
+        values = pd.Series(rng.integers(10, 60, rows).astype(float))
+        values[rng.random(rows) < 0.02] = 250
+        if not dtype.startswith(('int', 'uint')) or dtype.endswith('[pyarrow]'):
+            values[rng.random(rows) < 0.1] = np.nan
+        columns[dtype] = values.astype(dtype)
+    return pd.DataFrame(columns)
+
+
+def spy_run(executor, monkeypatch):
+    """记录每次行分片调用的输入列数"""
+    calls = []
+    run = executor.run
+
+    def spy(kernel, inputs, *args):
+        calls.append(len(inputs['values']))
+        return run(kernel, inputs, *args)
+
+    monkeypatch.setattr(executor, 'run', spy)
+    return calls
+
+
+@pytest.mark.parametrize('value', [3.0, 2.5, 2.3])
+def test_fill_missing_columns_upcasts_other_dtypes(row_executor, monkeypatch, value):
+    df = make_typed_frame()
+    calls = spy_run(row_executor, monkeypatch)
+    if not value.is_integer():
+        df = df.drop(columns=['Int64', 'UInt16'])  # 可空整数列填入小数时fillna本身报错 (与串行一致)
+    columns = [df[col] for col in df.columns]
+    for result, series in zip(fill_missing_columns(columns, [value] * len(columns)), columns):
+        pd.testing.assert_series_equal(result, executors.widen_arrow_integers(series, value).fillna(value))
+    # 有缺失值且能无损填充的列都参与了分片 (NumPy整数列没有缺失值)
+    sharded = [executors._fill_target(series, value) is not None for series in columns]
+    assert calls == [sum(sharded)]
+    assert sharded[:4] == [True] * 4 and sharded[-3:] == [True] * 3
+
+
+@pytest.mark.parametrize('outlier', ["IQR方法", "Z-score方法"])
+@pytest.mark.parametrize('policy', OUTLIER_POLICIES)
+def test_row_parallel_clip_upcasts_other_dtypes(row_executor, outlier, policy):
+    df = make_typed_frame()
+    if policy == "截断到边界":
+        df = df.drop(columns=['Int64', 'UInt16'])  # 可空整数列截断到小数边界时clip本身报错
+    config = {'outlier_action': outlier, 'outlier_policy': policy}
+    result, operations, _ = clean_dataframe(df, config)
+    expected, expected_ops, _ = serial_clean(df, config)
+    pd.testing.assert_frame_equal(result, expected)
+    assert operations == expected_ops
+
+
+def test_outlier_rows_clips_other_dtypes_in_shards(row_executor):
+    df = make_typed_frame()
+    columns = [df[col] for col in df.columns]
+    lower, upper = pd.Series(5.0, index=df.columns), pd.Series(100.0, index=df.columns)
+    _, counts, clipped = outlier_rows(columns, lower, upper, "IQR方法", np.ones(len(df), dtype=bool), clip=True)
+    assert counts.tolist() == [(series > 100).sum() for series in columns]
+    for result, series in zip(clipped, columns):
+        pd.testing.assert_series_equal(result, series.clip(5.0, 100.0))
+
+
+def test_float64_values_rejects_lossy_columns():
+    assert float64_values(pd.Series([2 ** 60, 1])) is None
+    assert float64_values(pd.Series([2 ** 52, None], dtype='Int64')).tolist()[0] == 2 ** 52
+    assert float64_values(pd.Series([True, False])) is None
+    assert float64_values(pd.Series(['a', 'b'])) is None
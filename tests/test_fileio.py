@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""文件读写: 分片写出的CSV (含压缩) 和列式文件读回后与原数据一致"""
+
+import gzip
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datacleanpro import fileio
+from datacleanpro.fileio import (read_data_file, read_data_sample, resolve_csv_engine, sample_note_text, write_csv,
+                                 write_data_file)
+from datacleanpro.plan import clean_dataframe
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.csv.gz', '.csv.bz2', '.csv.xz', '.csv.zst'])
+@pytest.mark.parametrize('workers', [1, 3])
+def test_sharded_csv_round_trip(tmp_path, dirty_frame, suffix, workers):
+    if suffix == '.csv.zst':
+        pytest.importorskip('zstandard')
+    path = tmp_path / f'out{suffix}'
+    progress = []
+    write_csv(dirty_frame, path, lambda percent, **info: progress.append(info['rows']),
+              workers=workers, shard_rows=300)
+    assert progress == sorted(progress) and progress[-1] == len(dirty_frame)
+    df, _ = read_data_file(path)
+    # CSV中的空值读回为NaN
+    pd.testing.assert_frame_equal(df, dirty_frame.fillna({'city': np.nan}))
+
+
+def test_sharded_csv_writes_bom_and_header_once(tmp_path, dirty_frame):
+    path = tmp_path / 'out.csv.gz'
+    write_csv(dirty_frame, path, workers=2, shard_rows=500)
+    text = gzip.decompress(path.read_bytes()).decode('utf-8')
+    assert text.startswith('\ufeffid,') and text.count('id,amount') == 1
+
+
+def test_cancelled_write_removes_partial_file(tmp_path, dirty_frame):
+    path = tmp_path / 'out.csv.gz'
+
+    def cancel(percent, **info):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        write_csv(dirty_frame, path, cancel, workers=2, shard_rows=300)
+    assert not path.exists()
+
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.feather'])
+def test_columnar_round_trip(tmp_path, dirty_frame, suffix):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / f'out{suffix}'
+    write_data_file(dirty_frame, path, options={'row_group_rows': 500, 'column_compression': {'city': 'gzip'}})
+    df, _ = read_data_file(path)
+    pd.testing.assert_frame_equal(df, dirty_frame)
+
+
+def assert_same_values(arrow_df, pandas_df):
+    """Arrow类型与NumPy类型的列逐值比较 (缺失值位置相同，数值按浮点误差比较)"""
+    assert list(arrow_df.columns) == list(pandas_df.columns)
+    for col in pandas_df.columns:
+        left, right = arrow_df[col], pandas_df[col]
+        np.testing.assert_array_equal(left.isna().to_numpy(), right.isna().to_numpy())
+        if pd.api.types.is_numeric_dtype(right):
+            assert left.dropna().tolist() == pytest.approx(right.dropna().tolist())
+        else:
+            assert left.dropna().tolist() == right.dropna().tolist()
+
+
+@pytest.mark.parametrize('suffix, encoding', [('.csv', 'utf-8'), ('.csv', 'gbk'), ('.csv.gz', 'utf-8-sig')])
+def test_arrow_engine_matches_pandas(tmp_path, dirty_frame, suffix, encoding):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / f'data{suffix}'
+    dirty_frame.to_csv(path, index=False, encoding=encoding)
+    arrow_df, info = read_data_file(path, engine='pyarrow')
+    pandas_df, _ = read_data_file(path, engine='pandas')
+    assert info['engine'] == 'pyarrow' and all(isinstance(dtype, pd.ArrowDtype) for dtype in arrow_df.dtypes)
+    assert_same_values(arrow_df, pandas_df)
+    config = {'missing_action': "中位数填充", 'duplicate_action': "删除重复行", 'outlier_action': "IQR方法",
+              'outlier_policy': "截断到边界"}
+    arrow_clean, arrow_ops, _ = clean_dataframe(arrow_df, config)
+    pandas_clean, pandas_ops, _ = clean_dataframe(pandas_df, config)
+    assert arrow_ops == pandas_ops
+    assert_same_values(arrow_clean, pandas_clean)
+
+
+def test_arrow_engine_falls_back_to_pandas(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'ragged.csv'
+    path.write_text("a,b,c\n1,2,3\n4,5\n", encoding='utf-8')
+    df, info = read_data_file(path, engine='pyarrow')
+    assert info['engine'] == 'pandas' and info['engine_error']
+    assert df['a'].tolist() == [1, 4] and pd.isna(df.loc[1, 'c'])
+
+
+def test_resolve_csv_engine(monkeypatch):
+    with pytest.raises(ValueError, match="引擎"):
+        resolve_csv_engine('polars')
+    monkeypatch.setattr(fileio, 'pa_csv', None)
+    assert resolve_csv_engine('pyarrow') == 'pandas'
+
+
+@pytest.fixture
+def numbered_csv(tmp_path, dirty_frame):
+    """带行号列的CSV，便于核对样本取自哪些行"""
+    path = tmp_path / 'numbered.csv'
+    dirty_frame.assign(row=range(len(dirty_frame))).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('chunksize', [64, 10_000])
+def test_head_sample(numbered_csv, chunksize):
+    sample, info = read_data_sample(numbered_csv, 500, 'head', chunksize=chunksize)
+    assert sample['row'].tolist() == list(range(500))
+    assert info['rows'] == info['rows_read'] == 500 and not info['complete']
+    assert sample_note_text(info).startswith("前 500 行")
+
+
+def test_reservoir_sample(numbered_csv, tmp_path, dirty_frame):
+    sample, info = read_data_sample(numbered_csv, 300, 'reservoir', chunksize=128, seed=7)
+    rows = sample['row'].to_numpy()
+    assert len(sample) == info['rows'] == 300 and info['rows_read'] == len(dirty_frame) and not info['complete']
+    assert (np.diff(rows) > 0).all()  # 无重复且按原文件顺序排列
+    assert rows[0] < 300 < len(dirty_frame) - 300 < rows[-1]
+    assert "随机抽样 300 行 / 共 2,200 行" in sample_note_text(info)
+    # 同一种子的样本与分块大小无关，不同种子的样本不同
+    same, _ = read_data_sample(numbered_csv, 300, 'reservoir', chunksize=1000, seed=7)
+    other, _ = read_data_sample(numbered_csv, 300, 'reservoir', chunksize=128, seed=8)
+    pd.testing.assert_frame_equal(same, sample)
+    assert other['row'].tolist() != rows.tolist()
+    # 不能按块读取的格式整表读取后再抽样
+    path = tmp_path / 'numbered.parquet'
+    pd.read_csv(numbered_csv).to_parquet(path)
+    columnar, _ = read_data_sample(path, 300, 'reservoir', seed=7)
+    assert len(columnar) == 300 and (np.diff(columnar['row'].to_numpy()) > 0).all()
+
+
+@pytest.mark.parametrize('method', ['head', 'reservoir'])
+def test_sample_of_small_file_is_complete(tmp_path, method):
+    path = tmp_path / 'small.csv'
+    pd.DataFrame({'a': range(10)}).to_csv(path, index=False)
+    sample, info = read_data_sample(path, 100, method, seed=0)
+    assert sample['a'].tolist() == list(range(10)) and info['complete']
+    assert sample_note_text(info) == "样本即全部数据 (10 行)\n"
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""撤销/重做历史: 双向增量还原的数据与记录时的各个状态一致"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datacleanpro.history import SnapshotHistory, StepDelta
+from datacleanpro.plan import clean_dataframe
+
+STEPS = [
+    {'missing_action': "中位数填充"},
+    {'duplicate_action': "标记重复行"},
+    {'outlier_action': "IQR方法", 'outlier_policy': "截断到边界"},
+    {'duplicate_action': "删除重复行", 'dedup_subset': ['id', 'city']},
+    {'missing_action': "删除含缺失值的列"},
+    {'outlier_action': "Z-score方法"},
+]
+
+
+def record_states(df, history):
+    """依次执行各清洗步骤并记录历史，返回各步之后的数据 (第0个为原始数据)"""
+    states = [df]
+    for config in STEPS:
+        after, operations, _ = clean_dataframe(states[-1], config)
+        history.record(states[-1], after, operations)
+        states.append(after)
+    # 改变取值类型 (整列替换) 和行顺序 (退化为快照) 的步骤
+    for after in (states[-1].astype({'id': float}), states[-1].iloc[::-1]):
+        history.record(states[-1], after, ["自定义步骤"])
+        states.append(after)
+    return states
+
+
+@pytest.mark.parametrize('budget', [0, 512 * 1024 * 1024])
+def test_undo_and_redo_restore_every_state(tmp_path, dirty_frame, budget):
+    history = SnapshotHistory(dirty_frame, memory_budget=budget, spill_dir=tmp_path)
+    states = record_states(dirty_frame, history)
+    assert (history.spilled_steps > 0) == (budget == 0)
+    current = states[-1]
+    for expected in reversed(states[:-1]):
+        current = history.undo(current)
+        pd.testing.assert_frame_equal(current, expected)
+    assert current is dirty_frame and not history.can_undo
+    for expected in states[1:]:
+        current = history.redo(current)
+        pd.testing.assert_frame_equal(current, expected)
+    history.close()
+
+
+def test_undo_does_not_replay_from_base(dirty_frame, monkeypatch):
+    history = SnapshotHistory(dirty_frame)
+    states = record_states(dirty_frame, history)
+
+    def fail(self, df):
+        raise AssertionError("撤销不应重放增量")
+
+    monkeypatch.setattr(StepDelta, 'apply', fail)
+    pd.testing.assert_frame_equal(history.undo(states[-1]), states[-2])
+
+
+def test_delta_round_trip_keeps_index_and_dtypes():
+    before = pd.DataFrame({'a': pd.array([1, None, 3, 4], dtype='Int64'), 'b': ['x', 'y', None, 'z'],
+                           'c': [1.5, np.nan, 2.5, 1e6]}, index=[10, 20, 30, 40])
+    after = before.dropna(subset=['a']).drop(columns=['b']).assign(c=lambda df: df['c'].clip(upper=10), d=1)
+    delta = StepDelta(before, after)
+    assert delta.snapshot is None
+    pd.testing.assert_frame_equal(delta.apply(before), after)
+    pd.testing.assert_frame_equal(delta.revert(after), before)
+
+
+def test_record_precomputed_delta(dirty_frame):
+    """后台线程用diff算好的增量交给界面线程记录，与直接记录等价"""
+    after, operations, _ = clean_dataframe(dirty_frame, STEPS[0])
+    delta = SnapshotHistory.diff(dirty_frame, after)
+    history = SnapshotHistory(dirty_frame)
+    history.record(dirty_frame, after, operations, delta=delta)
+    assert history.operations() == operations
+    pd.testing.assert_frame_equal(history.undo(after), dirty_frame)
+    pd.testing.assert_frame_equal(history.redo(dirty_frame), after)
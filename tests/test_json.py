@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""JSON/JSON Lines: 按块读取、分批写出 (含压缩) 的结果与pandas整体读写一致"""
+
+import gzip
+import json
+
+import pandas as pd
+import pytest
+
+from datacleanpro import fileio
+from datacleanpro.fileio import iter_data_chunks, read_data_file, write_data_file
+from datacleanpro.formats import is_json_lines
+from datacleanpro.plan import clean_dataframe
+from datacleanpro.streaming import ChunkedCleaner
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    """读写批次降为300行，使测试数据跨越多个批次"""
+    monkeypatch.setattr(fileio, 'WRITE_CHUNK_ROWS', 300)
+    monkeypatch.setattr(fileio, 'READ_JSON_CHUNK_ROWS', 300)
+
+
+@pytest.mark.parametrize('suffix', ['.jsonl', '.ndjson', '.jsonl.gz', '.json', '.json.gz'])
+def test_batched_write_round_trip(tmp_path, dirty_frame, small_batches, suffix):
+    path = tmp_path / f'out{suffix}'
+    progress = []
+    write_data_file(dirty_frame, path, lambda percent, **info: progress.append(info['rows']))
+    assert progress[-1] == len(dirty_frame) and len(progress) == -(-len(dirty_frame) // 300)
+    df, _ = read_data_file(path)
+    pd.testing.assert_frame_equal(df, dirty_frame)
+
+
+def test_json_array_is_valid_and_keeps_unicode(tmp_path, dirty_frame, small_batches):
+    path = tmp_path / 'out.json'
+    write_data_file(dirty_frame, path)
+    text = path.read_text(encoding='utf-8')
+    assert "北京" in text
+    records = json.loads(text)
+    assert len(records) == len(dirty_frame) and list(records[0]) == list(dirty_frame.columns)
+
+
+def test_json_lines_sniffing(tmp_path, dirty_frame):
+    lines = tmp_path / 'lines.json'
+    write_data_file(dirty_frame, tmp_path / 'lines.jsonl')
+    lines.write_bytes((tmp_path / 'lines.jsonl').read_bytes())
+    array = tmp_path / 'array.json'
+    write_data_file(dirty_frame, array)
+    compressed = tmp_path / 'lines.json.gz'
+    compressed.write_bytes(gzip.compress(lines.read_bytes()))
+    assert is_json_lines(lines) and is_json_lines(compressed) and not is_json_lines(array)
+    pd.testing.assert_frame_equal(read_data_file(lines)[0], dirty_frame)
+
+
+def test_chunks_follow_chunksize(tmp_path, dirty_frame):
+    path = tmp_path / 'data.jsonl'
+    write_data_file(dirty_frame, path)
+    positions = []
+    chunks = list(iter_data_chunks(path, 500, progress=positions.append))
+    assert [len(chunk) for chunk in chunks] == [500] * 4 + [200]
+    assert positions == sorted(positions) and positions[-1] == path.stat().st_size
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), dirty_frame)
+
+
+def test_streaming_clean_json_lines(tmp_path, dirty_frame):
+    source, out = tmp_path / 'data.jsonl', tmp_path / 'out.jsonl'
+    write_data_file(dirty_frame, source)
+    config = {'missing_action': "中位数填充", 'duplicate_action': "删除重复行"}
+    ChunkedCleaner.from_config(config, chunksize=300).run(source, out)
+    expected, _, _ = clean_dataframe(dirty_frame, config)
+    pd.testing.assert_frame_equal(read_data_file(out)[0], expected.reset_index(drop=True), check_dtype=False)
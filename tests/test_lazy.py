@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""延迟导入测试: 导入程序模块不触发pandas等重量级依赖，首次访问时才导入"""
+
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+from datacleanpro import lazy
+from datacleanpro.lazy import LazyModule, optional_module, warm_up_imports
+
+HEAVY_MODULES = ['pandas', 'numpy', 'chardet', 'pyarrow']
+
+
+def test_import_defers_heavy_modules():
+    code = ("import sys, app, datacleanpro.cli, datacleanpro.batch, datacleanpro.streaming\n"
+            f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=Path(__file__).resolve().parent.parent)
+    assert result.stdout.strip() == ''
+
+
+def test_lazy_module_imports_on_first_access(monkeypatch):
+    monkeypatch.setattr(lazy, 'LAZY_MODULES', [])
+    sys.modules.pop('colorsys', None)
+    namespace = {}
+    proxy = LazyModule('colorsys', 'colorsys', namespace)
+    namespace['colorsys'] = proxy
+    assert not proxy.loaded and 'colorsys' not in sys.modules
+    assert proxy.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+    assert proxy.loaded and isinstance(namespace['colorsys'], types.ModuleType)
+    assert 'colorsys' in lazy.IMPORT_TIMES
+
+
+def test_optional_module(monkeypatch):
+    monkeypatch.setattr(lazy, 'LAZY_MODULES', [])
+    assert optional_module('datacleanpro_missing_dependency', 'missing', {}) is None
+    proxy = optional_module('json.decoder', 'decoder', {})
+    assert isinstance(proxy, LazyModule) and not proxy.loaded
+    assert lazy.LAZY_MODULES == [proxy]
+    warm_up_imports()
+    assert proxy.loaded and proxy.JSONDecodeError
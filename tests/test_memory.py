@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""内存优化: 类型压缩不改变取值，报告与实际内存一致"""
+
+import numpy as np
+import pandas as pd
+
+from datacleanpro.memory import describe_memory_report, optimize_dtypes
+from datacleanpro.plan import clean_dataframe
+
+
+def mixed_frame(rows=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    city = rng.choice(['北京', '上海', None], rows)
+    city[pd.isna(city)] = np.nan  # category转回object时缺失值为NaN
+    return pd.DataFrame({
+        'small_int': rng.integers(0, 100, rows),
+        'big_int': rng.integers(0, 2 ** 40, rows),
+        'negative': rng.integers(-1000, 1000, rows).astype(np.int64),
+        'halves': rng.integers(0, 100, rows) / 2,  # float32可精确表示
+        'precise': rng.normal(0, 1, rows),  # 转float32会损失精度
+        'city': city,
+        'unique_text': [f"id-{i}" for i in range(rows)],
+        'flag': rng.random(rows) < 0.5,
+    }, index=pd.RangeIndex(10, 10 + rows))
+
+
+def test_round_trip_preserves_values():
+    df = mixed_frame()
+    optimized, report = optimize_dtypes(df)
+    assert optimized.index.equals(df.index) and list(optimized.columns) == list(df.columns)
+    for col in df.columns:
+        pd.testing.assert_series_equal(optimized[col].astype(df[col].dtype), df[col], check_dtype=True)
+    assert optimized['small_int'].dtype == np.int8
+    assert optimized['big_int'].dtype == np.int64
+    assert optimized['negative'].dtype == np.int16
+    assert optimized['halves'].dtype == np.float32
+    assert optimized['precise'].dtype == np.float64
+    assert isinstance(optimized['city'].dtype, pd.CategoricalDtype)
+    assert optimized['unique_text'].dtype == df['unique_text'].dtype
+    assert optimized['flag'].dtype == bool
+
+
+def test_report_matches_memory_usage():
+    df = mixed_frame()
+    optimized, report = optimize_dtypes(df)
+    assert report.loc['small_int', '原类型'] == 'int64' and report.loc['small_int', '新类型'] == 'int8'
+    assert report['优化前字节'].sum() == df.memory_usage(deep=True, index=False).sum()
+    assert report['优化后字节'].sum() == optimized.memory_usage(deep=True, index=False).sum()
+    assert report['优化后字节'].sum() < report['优化前字节'].sum()
+    text = describe_memory_report(report)
+    assert "small_int: int64 → int8" in text and "precise" not in text
+
+
+def test_cleaning_results_unchanged(dirty_frame):
+    optimized, _ = optimize_dtypes(dirty_frame)
+    config = {'missing_action': "中位数填充", 'duplicate_action': "删除重复行", 'outlier_action': "IQR方法"}
+    expected, expected_ops, _ = clean_dataframe(dirty_frame, config)
+    result, operations, _ = clean_dataframe(optimized, config)
+    assert operations == expected_ops
+    pd.testing.assert_frame_equal(result, expected.fillna({'city': np.nan}), check_dtype=False,
+                                  check_categorical=False)
+
+
+def test_empty_frame():
+    optimized, report = optimize_dtypes(pd.DataFrame())
+    assert optimized.empty and report.empty
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""异常值引擎: 整表一次判定的结果与逐列循环的定义一致"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datacleanpro.outliers import (OUTLIER_FLAG_COLUMN, OUTLIER_POLICIES, apply_outlier_policy,
+                                   compute_outlier_bounds, describe_outlier_result, outlier_cell_mask,
+                                   zscore_bounds)
+
+METHODS = ["IQR方法", "Z-score方法"]
+
+
+def column_outliers(series, method):
+    """逐列定义: IQR为闭区间[Q1-1.5IQR, Q3+1.5IQR]之外，Z-score为|z|>=3，缺失值不算异常"""
+    if method == "IQR方法":
+        q1, q3 = series.quantile(0.25), series.quantile(0.75)
+        return (series < q1 - 1.5 * (q3 - q1)) | (series > q3 + 1.5 * (q3 - q1))
+    z = (series - series.mean()) / series.std()
+    return z.abs() >= 3
+
+
+@pytest.fixture
+def numeric_frame(dirty_frame):
+    return dirty_frame[['id', 'amount', 'score']]
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_cell_mask_matches_per_column_definition(numeric_frame, method):
+    cols = list(numeric_frame.columns)
+    lower, upper = compute_outlier_bounds(numeric_frame, cols, method)
+    cells = outlier_cell_mask(numeric_frame, cols, lower, upper, method)
+    for position, col in enumerate(cols):
+        expected = column_outliers(numeric_frame[col], method)
+        np.testing.assert_array_equal(cells[:, position], expected.to_numpy())
+    assert cells[:, cols.index('amount')].any()
+    assert not cells[numeric_frame['amount'].isna().to_numpy(), cols.index('amount')].any()
+
+
+def test_zero_std_column_has_no_outliers():
+    df = pd.DataFrame({'const': [5.0] * 20, 'x': [1.0] * 19 + [100.0]})
+    lower, upper = compute_outlier_bounds(df, ['const', 'x'], "Z-score方法")
+    assert np.isnan(lower['const']) and np.isnan(upper['const'])
+    cells = outlier_cell_mask(df, ['const', 'x'], lower, upper, "Z-score方法")
+    assert cells[:, 0].sum() == 0 and cells[:, 1].sum() == 1
+    assert np.isnan(zscore_bounds(1.0, 0.0)[0])
+
+
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('policy', OUTLIER_POLICIES)
+def test_policies_use_one_row_mask(dirty_frame, method, policy):
+    cols = ['amount', 'score']
+    lower, upper = compute_outlier_bounds(dirty_frame, cols, method)
+    rows = np.zeros(len(dirty_frame), dtype=bool)
+    cell_count = 0
+    for col in cols:
+        mask = column_outliers(dirty_frame[col], method).to_numpy()
+        rows |= mask
+        cell_count += mask.sum()
+    result, row_count, cells = apply_outlier_policy(dirty_frame, cols, lower, upper, method, policy)
+    assert (row_count, cells) == (rows.sum(), cell_count) and row_count > 0
+    if policy == "删除异常行":
+        pd.testing.assert_frame_equal(result, dirty_frame[~rows])
+    elif policy == "截断到边界":
+        expected = dirty_frame.assign(**{col: dirty_frame[col].clip(lower[col], upper[col]) for col in cols})
+        pd.testing.assert_frame_equal(result, expected)
+        assert result['amount'].max() <= upper['amount']
+    else:
+        np.testing.assert_array_equal(result[OUTLIER_FLAG_COLUMN].to_numpy(), rows)
+        pd.testing.assert_frame_equal(result.drop(columns=OUTLIER_FLAG_COLUMN), dirty_frame)
+    assert str(row_count) in describe_outlier_result(method, policy, row_count, cells)
+
+
+def test_no_numeric_columns_is_a_no_op(dirty_frame):
+    result, rows, cells = apply_outlier_policy(dirty_frame, [], pd.Series(dtype=float), pd.Series(dtype=float),
+                                               "IQR方法")
+    assert result is dirty_frame and (rows, cells) == (0, 0)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""清洗计划: 融合行掩码的单遍执行与逐步pandas操作的结果一致，配方可原样往返"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datacleanpro.dedup import DUPLICATE_FLAG_COLUMN
+from datacleanpro.outliers import OUTLIER_FLAG_COLUMN, OUTLIER_POLICIES
+from datacleanpro.plan import RECIPE_VERSION, CleaningPlan, clean_dataframe
+
+MISSING = ["无操作", "删除含缺失值的行", "删除含缺失值的列", "均值填充", "中位数填充", "众数填充"]
+
+
+def reference_clean(df, config):
+    """逐步复制整表的参考实现"""
+    numeric = list(df.select_dtypes(include=[np.number]).columns)
+    action = config.get('missing_action', "无操作")
+    if action == "删除含缺失值的行":
+        df = df.dropna()
+    elif action == "删除含缺失值的列":
+        df = df.dropna(axis=1)
+    elif action != "无操作":
+        df = df.copy()
+        for col in numeric:
+            values = df[col]
+            fill = {"均值填充": values.mean, "中位数填充": values.median,
+                    "众数填充": lambda: values.mode().iloc[0]}[action]()
+            df[col] = values.fillna(fill)
+
+    dup_action = config.get('duplicate_action', "无操作")
+    if dup_action != "无操作":
+        dup = df.duplicated(config.get('dedup_subset'), keep=config.get('dedup_keep', 'first'))
+        if dup_action == "删除重复行":
+            df = df[~dup]
+        else:
+            df = df.assign(**{DUPLICATE_FLAG_COLUMN: dup})
+
+    method = config.get('outlier_action', "无操作")
+    if method != "无操作":
+        cols = [col for col in numeric if col in df.columns]
+        values = df[cols].astype(float)
+        if method == "IQR方法":
+            q1, q3 = values.quantile(0.25), values.quantile(0.75)
+            lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            cells = values.lt(lower) | values.gt(upper)
+        else:
+            mean, std = values.mean(), values.std()
+            lower, upper = mean - 3 * std, mean + 3 * std
+            cells = values.le(lower) | values.ge(upper)
+        rows = cells.any(axis=1)
+        policy = config.get('outlier_policy', OUTLIER_POLICIES[0])
+        if policy == "截断到边界":
+            df = df.copy()
+            for col in cols:
+                if cells[col].any():
+                    df[col] = df[col].clip(lower[col], upper[col])
+        elif policy == "标记异常行":
+            df = df.assign(**{OUTLIER_FLAG_COLUMN: rows})
+        else:
+            df = df[~rows]
+    return df
+
+
+@pytest.mark.parametrize('missing', MISSING)
+@pytest.mark.parametrize('duplicate', ["无操作", "删除重复行", "标记重复行"])
+@pytest.mark.parametrize('outlier, policy', [("无操作", OUTLIER_POLICIES[0])]
+                         + [(method, policy) for method in ["IQR方法", "Z-score方法"]
+                            for policy in OUTLIER_POLICIES])
+def test_plan_matches_sequential_pandas(dirty_frame, missing, duplicate, outlier, policy):
+    config = {'missing_action': missing, 'duplicate_action': duplicate, 'dedup_keep': 'last',
+              'outlier_action': outlier, 'outlier_policy': policy}
+    result, _, _ = clean_dataframe(dirty_frame, config)
+    expected = reference_clean(dirty_frame, config)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_plan_does_not_modify_input(dirty_frame):
+    original = dirty_frame.copy()
+    clean_dataframe(dirty_frame, {'missing_action': "中位数填充", 'duplicate_action': "标记重复行",
+                                  'outlier_action': "IQR方法", 'outlier_policy': "截断到边界"})
+    pd.testing.assert_frame_equal(dirty_frame, original)
+
+
+@pytest.mark.parametrize('config', [
+    {},
+    {'missing_action': "众数填充", 'outlier_action': "Z-score方法", 'outlier_policy': "标记异常行"},
+    {'duplicate_action': "删除重复行", 'dedup_subset': ['id', 'city'], 'dedup_keep': False,
+     'fingerprint_bits': 128},
+    {'missing_action': "删除含缺失值的行", 'duplicate_action': "标记近似重复行", 'dedup_subset': ['city'],
+     'near_threshold': 0.9, 'outlier_action': "IQR方法"},
+])
+def test_recipe_round_trip(tmp_path, dirty_frame, config):
+    plan = CleaningPlan.from_config(config)
+    path = tmp_path / 'recipe.json'
+    plan.save(path)
+    loaded = CleaningPlan.load(path)
+    assert loaded.steps == plan.steps
+    assert json.loads(path.read_text(encoding='utf-8'))['version'] == RECIPE_VERSION
+    assert CleaningPlan.from_config(loaded.to_config()).steps == plan.steps
+    expected, expected_ops, _ = plan.execute(dirty_frame)
+    result, operations, _ = clean_dataframe(dirty_frame, loaded.to_recipe())
+    pd.testing.assert_frame_equal(result, expected)
+    assert operations == expected_ops
+
+
+@pytest.mark.parametrize('recipe, message', [
+    ({'version': RECIPE_VERSION + 1, 'steps': []}, "版本"),
+    ({'steps': [{'step': 'outlier', 'method': "IQR方法", 'policy': "不存在"}]}, "异常值策略"),
+    ({'steps': [{'step': 'duplicate', 'action': "删除重复行", 'bits': 32}]}, "指纹位数"),
+])
+def test_invalid_recipe_rejected(recipe, message):
+    with pytest.raises(ValueError, match=message):
+        CleaningPlan.from_recipe(recipe)
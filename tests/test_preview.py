@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""虚拟预览表格: 只渲染可见窗口，滚动和翻页只切片各列数组"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import VirtualTreeview, format_cell
+
+
+class FakeTree:
+    """只记录行/列状态的Treeview替身 (不需要显示器)"""
+
+    def __init__(self):
+        self.rows = {}
+        self.columns = []
+        self.headings = {}
+        self.inserted = 0
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def __setitem__(self, key, value):
+        if key == "columns":
+            self.columns = list(value)
+
+    def heading(self, col_id, text):
+        self.headings[col_id] = text
+
+    def column(self, col_id, **kwargs):
+        pass
+
+    def insert(self, parent, index):
+        self.inserted += 1
+        item = f"I{self.inserted}"
+        self.rows[item] = None
+        return item
+
+    def delete(self, item):
+        del self.rows[item]
+
+    def item(self, item, text, values):
+        self.rows[item] = (text, values)
+
+
+class FakeScrollbar:
+    def configure(self, **kwargs):
+        pass
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+@pytest.fixture
+def grid():
+    tree, scrollbar = FakeTree(), FakeScrollbar()
+    grid = VirtualTreeview(tree, scrollbar, page_cols=3)
+    grid.page_rows = 10
+    return grid
+
+
+def big_frame(rows=200_000, cols=7):
+    return pd.DataFrame({f"c{j}": np.arange(rows) * 10 + j for j in range(cols)})
+
+
+def visible(grid):
+    return [grid.tree.rows[item] for item in grid._items]
+
+
+def test_renders_only_visible_window(grid):
+    grid.set_dataframe(big_frame())
+    assert len(grid.tree.rows) == 10 and grid.tree.inserted == 10
+    assert visible(grid)[0] == ("1", ["0", "1", "2"])
+    assert grid.tree.headings == {"#0": "行号", "c0": "c0", "c1": "c1", "c2": "c2"}
+    # 只缓存可见列的数组
+    assert sorted(grid._arrays) == [0, 1, 2]
+
+
+def test_scroll_reuses_items_and_clamps(grid):
+    grid.set_dataframe(big_frame())
+    grid.scroll_to_row(150_000)
+    assert visible(grid)[0] == ("150001", ["1500000", "1500001", "1500002"])
+    assert grid.tree.inserted == 10
+    assert grid.v_scrollbar.position == (150_000 / 200_000, 150_010 / 200_000)
+    grid.scroll_to_row(10 ** 9)
+    assert grid.row_offset == 200_000 - 10 and visible(grid)[-1][0] == "200000"
+    grid.scroll_rows(-10 ** 9)
+    assert grid.row_offset == 0
+
+
+def test_page_columns(grid):
+    grid.set_dataframe(big_frame())
+    grid.page_columns(1)
+    assert grid.tree.headings["c0"] == "c3" and visible(grid)[0][1] == ["3", "4", "5"]
+    grid.page_columns(1)
+    assert grid.tree.columns == ["c0"] and visible(grid)[0][1] == ["6"]
+    grid.page_columns(1)  # 已是最后一页
+    assert grid.col_offset == 6
+
+
+def test_smaller_frame_shrinks_window(grid):
+    grid.set_dataframe(big_frame())
+    grid.scroll_to_row(1000)
+    grid.set_dataframe(big_frame(rows=4, cols=2))
+    assert grid.row_offset == 0 and len(grid.tree.rows) == 4
+    assert visible(grid)[-1] == ("4", ["30", "31"])
+    grid.set_dataframe(big_frame(rows=0, cols=0))
+    assert grid.tree.rows == {} and grid.v_scrollbar.position == (0, 1)
+
+
+def test_format_cell():
+    assert format_cell(np.nan) == format_cell(None) == format_cell(pd.NA) == "(空)"
+    assert format_cell("x" * 30) == "x" * 17 + "..."
+    assert format_cell([1, 2]) == "[1, 2]"
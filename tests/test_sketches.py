@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""近似统计: KLL分位数的秩误差、HyperLogLog的相对误差和分块合并"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datacleanpro.sketches import ColumnSketch, HyperLogLog, KLLSketch, merge_moments, moments_of
+
+QUANTILES = np.linspace(0.01, 0.99, 99)
+
+
+def rank_error(sorted_values, estimate, q):
+    """估计值在真实数据中的归一化秩与q之差"""
+    return abs(np.searchsorted(sorted_values, estimate) / len(sorted_values) - q)
+
+
+@pytest.fixture(scope='module')
+def skewed():
+    return np.random.default_rng(0).lognormal(0, 1, 200_000)
+
+
+def test_kll_exact_below_capacity():
+    values = np.random.default_rng(1).normal(size=200)
+    sketch = KLLSketch(0.01).update(values)
+    assert sketch.exact
+    for q in [0.0, 0.25, 0.5, 0.9, 1.0]:
+        assert sketch.quantile(q) == pytest.approx(pd.Series(values).quantile(q))
+
+
+@pytest.mark.parametrize('relative_error', [0.01, 0.05])
+def test_kll_rank_error_bound(skewed, relative_error):
+    sketch = KLLSketch(relative_error)
+    for chunk in np.array_split(skewed, 37):
+        sketch.update(chunk)
+    assert not sketch.exact and sketch.n == len(skewed)
+    assert sketch.nbytes < skewed.nbytes / 50
+    ordered = np.sort(skewed)
+    assert max(rank_error(ordered, sketch.quantile(q), q) for q in QUANTILES) <= relative_error
+    assert (sketch.quantile(0), sketch.quantile(1)) == (ordered[0], ordered[-1])
+
+
+def test_kll_merge_keeps_bound(skewed):
+    merged = KLLSketch(0.01)
+    for seed, chunk in enumerate(np.array_split(skewed, 8)):
+        merged.merge(KLLSketch(0.01, seed=seed).update(chunk))
+    ordered = np.sort(skewed)
+    assert merged.n == len(skewed)
+    assert max(rank_error(ordered, merged.quantile(q), q) for q in QUANTILES) <= 0.01
+
+
+def test_kll_ignores_nan():
+    sketch = KLLSketch().update([1.0, np.nan, 3.0])
+    assert sketch.n == 2 and sketch.quantile(0.5) == 2.0
+    assert np.isnan(KLLSketch().quantile(0.5))
+
+
+@pytest.mark.parametrize('n', [100, 10_000, 300_000])
+def test_hll_relative_error(n):
+    sketch = HyperLogLog(0.01)
+    # 每个值重复3次，估计的是唯一值个数
+    sketch.update(pd.Series(np.tile(np.arange(n) * 7919, 3)))
+    assert abs(sketch.estimate() / n - 1) <= 3 * sketch.relative_error
+
+
+def test_hll_merge_equals_union():
+    values = pd.Series([f"key-{i}" for i in range(50_000)])
+    whole = HyperLogLog(0.02).update(values)
+    left = HyperLogLog(0.02).update(values[:30_000])
+    right = HyperLogLog(0.02).update(values[20_000:])
+    np.testing.assert_array_equal(left.merge(right).registers, whole.registers)
+    assert HyperLogLog(0.02).update(pd.Series([None, np.nan], dtype=object)).estimate() == 0
+
+
+def test_merged_moments_match_numpy():
+    values = np.random.default_rng(2).normal(5, 2, 10_001)
+    moments = (0, 0.0, 0.0)
+    for chunk in np.array_split(values, 7):
+        moments = merge_moments(moments, moments_of(chunk))
+    n, mean, m2 = moments
+    assert n == len(values)
+    assert mean == pytest.approx(values.mean()) and m2 / (n - 1) == pytest.approx(values.var(ddof=1))
+
+
+def test_column_sketch_summary(dirty_frame):
+    # 误差0.001时KLL容量(3000)大于值个数，分位数精确
+    sketch = ColumnSketch(0.001)
+    for start in range(0, len(dirty_frame), 500):
+        part = ColumnSketch(0.001)
+        part.update(dirty_frame['amount'].iloc[start:start + 500])
+        sketch.merge(part)
+    summary = sketch.summary()
+    series = dirty_frame['amount']
+    assert (summary['non_null'], summary['missing']) == (series.count(), series.isna().sum())
+    assert summary['mean'] == pytest.approx(series.mean()) and summary['std'] == pytest.approx(series.std())
+    assert summary['max'] == series.max() and summary['quantiles_exact']
+    assert summary['median'] == pytest.approx(series.median())
+    assert abs(summary['distinct_approx'] / series.nunique() - 1) <= 0.05
+    text = ColumnSketch()
+    text.update(dirty_frame['city'])
+    assert not text.summary()['numeric'] and text.summary()['distinct_approx'] == 4
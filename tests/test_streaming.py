@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""流式清洗: 分块多遍扫描的结果与整表在内存中清洗一致"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datacleanpro.plan import clean_dataframe
+from datacleanpro.streaming import INCREMENTAL_STATE_FILE, ChunkedCleaner, IncrementalCleaner, ValueCounts
+
+CONFIGS = [
+    {'missing_action': "中位数填充", 'outlier_action': "IQR方法"},
+    {'missing_action': "众数填充", 'duplicate_action': "删除重复行", 'outlier_action': "IQR方法"},
+    {'missing_action': "均值填充", 'duplicate_action': "删除重复行", 'outlier_action': "Z-score方法",
+     'outlier_policy': "截断到边界"},
+    {'missing_action': "删除含缺失值的行", 'duplicate_action': "标记重复行", 'dedup_keep': 'last',
+     'outlier_action': "IQR方法"},
+    {'missing_action': "中位数填充", 'duplicate_action': "删除重复行", 'dedup_keep': False,
+     'dedup_subset': ['id', 'city'], 'outlier_action': "IQR方法", 'outlier_policy': "标记异常行"},
+]
+
+
+@pytest.mark.parametrize('budget', [1024, 256 * 1024 * 1024])
+def test_value_counts_match_pandas(tmp_path, budget):
+    """预算极小时计数溢写为磁盘run，分位数和众数仍与pandas一致"""
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.integers(0, 300, 5000).astype(float), rng.normal(0, 1, 3000)])
+    values[rng.random(len(values)) < 0.05] = np.nan
+    counts = ValueCounts(budget, spill_dir=tmp_path)
+    for start in range(0, len(values), 700):
+        counts.update(values[start:start + 700])
+    series = pd.Series(values)
+    qs = [0, 0.25, 0.5, 0.75, 1]
+    assert (counts.spilled_runs > 0) == (budget == 1024)
+    np.testing.assert_array_equal(counts.quantiles(qs), series.quantile(qs).to_numpy())
+    assert counts.mode() == series.mode().iloc[0]
+    counts.close()
+
+
+def test_value_counts_without_values():
+    counts = ValueCounts()
+    counts.update(np.array([np.nan]))
+    assert np.isnan(counts.quantile(0.5)) and np.isnan(counts.mode())
+
+
+@pytest.mark.parametrize('budget', [2048, 256 * 1024 * 1024])
+@pytest.mark.parametrize('config', CONFIGS)
+def test_streaming_matches_in_memory(tmp_path, dirty_frame, dirty_csv, config, budget):
+    out = tmp_path / 'out.csv'
+    cleaner = ChunkedCleaner.from_config(config, chunksize=300, counts_memory_budget=budget)
+    operations = cleaner.run(dirty_csv, out)
+    expected, _, _ = clean_dataframe(pd.read_csv(dirty_csv), config)
+    pd.testing.assert_frame_equal(pd.read_csv(out), expected.reset_index(drop=True), check_dtype=False)
+    spilled = any("溢写" in op for op in operations)
+    assert spilled == (budget == 2048 and config['missing_action'] != "均值填充")
+
+
+def test_incremental_statistics_match_full_run(tmp_path, dirty_frame):
+    """分两次增量清洗 (值计数保存到状态目录后再挂载) 后的填充值和异常值边界与一次全量清洗一致"""
+    config = {'missing_action': "中位数填充", 'outlier_action': "IQR方法"}
+    src, out = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    dirty_frame.iloc[:1200].to_csv(src, index=False)
+    IncrementalCleaner.from_config(config, chunksize=300, counts_memory_budget=2048).run(src, out)
+    dirty_frame.iloc[1200:].to_csv(src, index=False, header=False, mode='a')
+    incremental = IncrementalCleaner.from_config(config, chunksize=300, counts_memory_budget=2048)
+    assert incremental.run(src, out)[0].startswith("增量清洗")
+
+    full = ChunkedCleaner.from_config(config, chunksize=300)
+    full.run(src, tmp_path / 'full.csv')
+    assert incremental.fill_values == pytest.approx(full.fill_values)
+    for ours, theirs in zip(incremental.outlier_bounds, full.outlier_bounds):
+        pd.testing.assert_series_equal(ours, theirs)
+    assert not [name for name in incremental.state_path.iterdir() if name.name.endswith('_1_values.npy')]
+
+
+def run_incremental(config, src, out):
+    cleaner = IncrementalCleaner.from_config(config, chunksize=300)
+    return cleaner, cleaner.run(src, out)
+
+
+def test_incremental_append_matches_full_run(tmp_path, dirty_frame):
+    """追加写入 (含末尾未写完的行) 分次增量清洗: 不依赖统计量的清洗结果与一次全量清洗相同，跨次去重"""
+    config = {'missing_action': "删除含缺失值的行", 'duplicate_action': "删除重复行"}
+    src, out = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    text = dirty_frame.to_csv(index=False, lineterminator='\n')
+    split = text.index('\n', len(text) // 2) + 5  # 第二次停在某一行中间
+    src.write_text(text[:len(text) // 3], encoding='utf-8')
+    cleaner, operations = run_incremental(config, src, out)
+    assert cleaner.full_reason == "首次运行" and operations[0] == "全量清洗 (首次运行)"
+    with open(src, 'a', encoding='utf-8') as f:
+        f.write(text[len(text) // 3:split])
+    cleaner, operations = run_incremental(config, src, out)
+    assert cleaner.full_reason is None and "末尾未完成的行 (无换行符) 留待下次处理" in operations
+    with open(src, 'a', encoding='utf-8') as f:
+        f.write(text[split:])
+    cleaner, operations = run_incremental(config, src, out)
+    assert cleaner.full_reason is None and operations[0].startswith("增量清洗: 新追加")
+    _, operations = run_incremental(config, src, out)
+    assert operations == [f"增量清洗: 没有新追加的完整行 (已处理 {len(dirty_frame)} 行)"]
+
+    ChunkedCleaner.from_config(config, chunksize=300).run(src, tmp_path / 'full.csv')
+    assert out.read_bytes() == (tmp_path / 'full.csv').read_bytes()
+    expected = dirty_frame.dropna().drop_duplicates()
+    assert cleaner.rows_total == len(expected) == len(pd.read_csv(out))
+
+
+@pytest.mark.parametrize('change, reason', [
+    ('truncate', "输入文件已被改写或截断"),
+    ('rewrite', "输入文件已被改写或截断"),
+    ('output', "输出文件已被改动"),
+    ('config', "清洗配置已变化"),
+    ('state', "状态文件损坏"),
+])
+def test_incremental_detects_changes(tmp_path, dirty_frame, change, reason):
+    """已处理部分被截断/改写、输出或状态文件被改动、配置变化时改为全量清洗，结果与全量清洗一致"""
+    config = {'missing_action': "中位数填充", 'outlier_action': "IQR方法"}
+    src, out = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    dirty_frame.to_csv(src, index=False)
+    cleaner, _ = run_incremental(config, src, out)
+    if change == 'truncate':
+        dirty_frame.iloc[:1000].to_csv(src, index=False)
+    elif change == 'rewrite':
+        # 大小不变、只改动已处理部分开头的一个字符
+        data = bytearray(src.read_bytes())
+        data[data.index(b'\n') + 1] ^= 1
+        src.write_bytes(bytes(data))
+    elif change == 'output':
+        with open(out, 'a', encoding='utf-8') as f:
+            f.write('1,2,3,4\n')
+    elif change == 'config':
+        config = {**config, 'outlier_policy': "截断到边界"}
+    else:
+        (cleaner.state_path / INCREMENTAL_STATE_FILE).write_bytes(b'not a pickle')
+    cleaner, operations = run_incremental(config, src, out)
+    assert cleaner.full_reason == reason and operations[0] == f"全量清洗 ({reason})"
+    ChunkedCleaner.from_config(config, chunksize=300).run(src, tmp_path / 'full.csv')
+    assert out.read_bytes() == (tmp_path / 'full.csv').read_bytes()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""阶段计量: 嵌套阶段、计数器、线程上下文隔离和导出格式"""
+
+import json
+import threading
+
+from datacleanpro.batch import clean_file
+from datacleanpro.fileio import read_data_file, write_data_file
+from datacleanpro.plan import clean_dataframe
+from datacleanpro.tracing import Stage, StageTrace, save_traces, stage
+
+
+def test_nested_stages_and_counters():
+    with StageTrace("任务") as trace:
+        with stage('outer', rows_in=10) as outer:
+            with stage('inner') as inner:
+                inner.bytes_read = 2048
+            outer.rows_out = 7
+    names = [(s.name, s.depth) for s in trace.ordered()]
+    assert names == [("任务", 0), ('outer', 1), ('inner', 2)]
+    record = trace.to_dict()['stages'][1]
+    assert (record['rows_in'], record['rows_out']) == (10, 7)
+    assert trace.to_dict()['stages'][2]['bytes_read'] == 2048
+    assert all(s.wall_seconds >= 0 and s.cpu_seconds >= 0 for s in trace.stages)
+    assert trace.ordered()[0].wall_seconds >= trace.ordered()[1].wall_seconds
+    assert "行 10→7" in trace.describe()[1]
+
+
+def test_stage_without_trace_is_a_placeholder():
+    with stage('idle', rows_in=3) as record:
+        pass
+    assert isinstance(record, Stage) and record.wall_seconds is None
+
+
+def test_other_threads_are_not_recorded():
+    """计量按线程上下文区分: 并发任务的阶段不会混入"""
+    with StageTrace("任务") as trace:
+        worker = threading.Thread(target=lambda: stage('other').__enter__())
+        worker.start()
+        worker.join()
+    assert [s.name for s in trace.stages] == ["任务"]
+
+
+def test_load_clean_save_stages(tmp_path, dirty_csv):
+    with StageTrace("清洗") as trace:
+        df, _ = read_data_file(dirty_csv)
+        df, _, _ = clean_dataframe(df, {'missing_action': "删除含缺失值的行", 'duplicate_action': "删除重复行"})
+        write_data_file(df, tmp_path / 'out.csv')
+    names = [s.name for s in trace.ordered()]
+    for name in ['load.detect_encoding', 'load.parse.csv', 'clean.missing', 'clean.duplicate',
+                 'clean.materialize', 'save.csv']:
+        assert name in names
+    save = next(s for s in trace.stages if s.name == 'save.csv')
+    assert save.rows_in == len(df) and save.bytes_written == (tmp_path / 'out.csv').stat().st_size
+
+
+def test_deep_profile_reports():
+    with StageTrace("剖析", deep=True) as trace:
+        with stage('alloc'):
+            data = [list(range(100)) for _ in range(200)]
+    assert data and 'cumulative' in trace.profile_text
+    assert trace.allocation_text
+    assert trace.stages[0].peak_delta_mb is not None
+
+
+def test_save_json_and_chrome_trace(tmp_path):
+    with StageTrace("任务") as trace:
+        with stage('step', rows_in=5):
+            pass
+    save_traces([trace], tmp_path / 'stages.json')
+    records = json.loads((tmp_path / 'stages.json').read_text(encoding='utf-8'))
+    assert [s['name'] for s in records[0]['stages']] == ["任务", 'step']
+    save_traces(records, tmp_path / 'stages.trace.json')
+    events = json.loads((tmp_path / 'stages.trace.json').read_text(encoding='utf-8'))['traceEvents']
+    assert [(e['name'], e['ph']) for e in events] == [("任务", 'X'), ('step', 'X')]
+    assert events[1]['args']['rows_in'] == 5 and events[1]['dur'] >= 0
+
+
+def test_batch_summary_contains_trace(tmp_path, dirty_csv):
+    summary = clean_file(dirty_csv, tmp_path / 'out.csv', {'missing_action': "中位数填充"})
+    stages = [s['name'] for s in summary['trace']['stages']]
+    assert summary['status'] == 'ok' and stages[0] == dirty_csv.name and 'save.csv' in stages